@@ -0,0 +1,177 @@
+import argparse
+import json
+import os
+import time
+
+from config import Config
+from model.rag_factory import RAGFactory
+
+
+def read_questions(input_path, skip=()):
+    """
+    Girdi JSONL dosyasını satır satır okur. Her satır {"question": "...", "id": ...}
+    nesnesi ya da düz bir JSON string'i olabilir; boş satırlar atlanır.
+
+    Yields:
+        tuple: (satır numarası, kayıt kimliği, soru; satır hatalıysa None, hata mesajı)
+    """
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f):
+            if line_no in skip or not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if isinstance(record, str):
+                    record = {"question": record}
+                question = record["question"]
+                if not isinstance(question, str) or not question.strip():
+                    raise ValueError("question boş olamaz")
+                yield line_no, record.get("id", line_no), question, None
+            except (ValueError, KeyError, TypeError) as e:
+                yield line_no, None, None, f"Geçersiz satır: {str(e)}"
+
+
+def completed_lines(output_path):
+    """
+    Çıktı dosyasında tamamlanmış girdi satırlarını bulur. Çökme sırasında
+    yarım yazılmış son kayıt dosyadan kesilir, böylece o satır yeniden işlenir.
+
+    Returns:
+        set: Tamamlanmış girdi satır numaraları.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "rb+") as f:
+        offset = 0
+        for line in f:
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("yarım kayıt")
+                done.add(json.loads(line)["line"])
+            except (ValueError, KeyError):
+                f.truncate(offset)
+                break
+            offset += len(line)
+    return done
+
+
+def _batches(items, batch_size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _answer_questions(rag_system, questions, top_k, batch_size, log=print):
+    """
+    Soruları tek grup halinde cevaplar. Grup hata verirse sorular tek tek
+    yeniden denenir; böylece tek bir bozuk soru bütün grubu düşürmez.
+
+    Returns:
+        tuple: (her soru için (cevap, kaynaklar, süreler) ya da hata mesajı,
+                yapılan her çağrının aşama süreleri)
+    """
+    try:
+        answers = rag_system.answer_batch_with_sources(questions, top_k, batch_size, raise_errors=True)
+        timings = dict(rag_system.last_timings)
+        return [(answer, sources, timings) for answer, sources in answers], [timings]
+    except Exception as e:
+        if len(questions) == 1:
+            return [f"Soru cevaplanamadı: {str(e)}"], []
+        log(f"{len(questions)} soruluk grup cevaplanamadı, sorular tek tek deneniyor: {str(e)}")
+    outcomes, calls = [], []
+    for question in questions:
+        outcome, timings = _answer_questions(rag_system, [question], top_k, 1, log)
+        outcomes += outcome
+        calls += timings
+    return outcomes, calls
+
+
+def run_batch(rag_system, input_path, output_path, batch_size=32, top_k=3, log=print):
+    """
+    Girdi dosyasındaki soruları batch_size'lık gruplar halinde
+    RAGSystem.answer_batch_with_sources ile cevaplar. Her grup bittiğinde
+    cevaplar, kaynaklar ve grubun aşama süreleri çıktı dosyasına eklenir;
+    tekrar çalıştırıldığında tamamlanmış satırlar atlanır. Hata veren grupların
+    soruları tek tek yeniden denenir; yine cevaplanamayan sorular geçersiz
+    satırlar gibi "error" alanıyla yazılır, böylece çalıştırma takılmadan biter.
+
+    Returns:
+        dict: Cevaplanan, atlanan, hatalı ve başarısız satır sayıları, süreler ve saniyedeki soru sayısı.
+    """
+    done = completed_lines(output_path)
+    summary = {"answered": 0, "invalid": 0, "failed": 0, "resumed": len(done), "cache_hits": 0,
+               "retrieval_seconds": 0.0, "generation_seconds": 0.0}
+    started = time.perf_counter()
+    with open(output_path, "a", encoding="utf-8") as out:
+        for batch in _batches(read_questions(input_path, done), batch_size):
+            valid = [item[2] for item in batch if item[3] is None]
+            outcomes, calls = iter([]), []
+            if valid:
+                outcomes, calls = _answer_questions(rag_system, valid, top_k, batch_size, log)
+                outcomes = iter(outcomes)
+            for line_no, record_id, question, error in batch:
+                result = {"line": line_no, "id": record_id, "question": question}
+                if error is None:
+                    outcome = next(outcomes)
+                    if isinstance(outcome, str):
+                        log(f"{line_no}. satır cevaplanamadı: {outcome}")
+                        result["error"] = outcome
+                        summary["failed"] += 1
+                    else:
+                        answer, sources, timings = outcome
+                        result["answer"] = answer
+                        result["sources"] = [{"text": text, "score": float(score)} for text, score in sources]
+                        result["batch_timings"] = timings
+                        summary["answered"] += 1
+                else:
+                    result["error"] = error
+                    summary["invalid"] += 1
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            # Grup diske yazılmadan sonraki gruba geçilmez; çökmede en fazla bir grup kaybolur
+            out.flush()
+            os.fsync(out.fileno())
+            for timings in calls:
+                summary["cache_hits"] += timings.get("cache_hits", 0)
+                summary["retrieval_seconds"] += timings.get("retrieval", 0.0)
+                summary["generation_seconds"] += timings.get("generation", 0.0)
+            log(f"{summary['answered'] + summary['invalid'] + summary['failed']} satır işlendi "
+                f"({summary['answered'] / (time.perf_counter() - started):.2f} soru/sn)")
+
+    summary["elapsed_seconds"] = time.perf_counter() - started
+    summary["questions_per_second"] = (summary["answered"] / summary["elapsed_seconds"]
+                                       if summary["elapsed_seconds"] else 0.0)
+    return summary
+
+
+def main():
+    config = Config()
+    parser = argparse.ArgumentParser(description="JSONL dosyasındaki soruları toplu cevaplar")
+    parser.add_argument("input", help="Her satırı {\"question\": ...} olan JSONL dosyası")
+    parser.add_argument("--output", help="Sonuç dosyası (varsayılan: <girdi>.answers.jsonl)")
+    parser.add_argument("--batch-size", type=int, default=config.BATCH_QA_SIZE)
+    parser.add_argument("--top-k", type=int, default=config.TOP_K)
+    parser.add_argument("--retriever", choices=[value for _, value in config.RETRIEVER_OPTIONS],
+                        default=config.DEFAULT_RETRIEVER)
+    args = parser.parse_args()
+    config.DEFAULT_RETRIEVER = args.retriever
+    output_path = args.output or os.path.splitext(args.input)[0] + ".answers.jsonl"
+
+    rag_system = RAGFactory.create_rag_system(config)
+    summary = run_batch(rag_system, args.input, output_path, args.batch_size, args.top_k)
+
+    print(f"\nSonuçlar: {output_path}")
+    print(f"Cevaplanan: {summary['answered']}, hatalı satır: {summary['invalid']}, "
+          f"cevaplanamayan: {summary['failed']}, "
+          f"önceki çalışmadan atlanan: {summary['resumed']}, önbellekten: {summary['cache_hits']}")
+    print(f"Süre: {summary['elapsed_seconds']:.1f} sn ({summary['questions_per_second']:.2f} soru/sn; "
+          f"getirme {summary['retrieval_seconds']:.1f} sn, üretim {summary['generation_seconds']:.1f} sn)")
+
+
+if __name__ == "__main__":
+    main()
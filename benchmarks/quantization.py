@@ -0,0 +1,108 @@
+"""Memory, latency and recall of quantized FAISS indexes against the flat float index.
+
+    python -m benchmarks.quantization --vectors 100000 --dim 768
+    python -m benchmarks.quantization --embeddings chunks.npy --metric ip
+
+Without ``--embeddings`` the corpus is synthetic low-rank Gaussian data,
+which behaves more like sentence embeddings than i.i.d. noise does.
+"""
+import argparse
+import json
+import time
+from typing import Dict, List
+
+import faiss
+import numpy as np
+
+from model import ann_index
+
+
+def synthetic_vectors(n: int, dim: int, rank: int = 64, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal((n, rank)) @ rng.standard_normal((rank, dim))).astype(np.float32)
+
+
+def _timed_search(index: faiss.Index, queries: np.ndarray, k: int):
+    started = time.perf_counter()
+    distances, ids = index.search(queries, k)
+    return distances, ids, (time.perf_counter() - started) * 1000 / len(queries)
+
+
+def _recall(truth: np.ndarray, found: np.ndarray) -> float:
+    return float(np.mean([len(set(t[t >= 0]) & set(f[f >= 0])) / max(1, (t >= 0).sum())
+                          for t, f in zip(truth, found)]))
+
+
+def run(vectors: np.ndarray, queries: np.ndarray, k: int = 10,
+        rescore_factors=(0, 4), metric: int = faiss.METRIC_L2) -> List[Dict]:
+    """One result row per (index type, rescore factor)"""
+    ids = np.arange(len(vectors), dtype=np.int64)
+    flat = faiss.IndexIDMap2(faiss.IndexFlat(vectors.shape[1], metric))
+    flat.add_with_ids(vectors, ids)
+    _, truth, flat_ms = _timed_search(flat, queries, k)
+    float_bytes = vectors.nbytes
+    rows = [{
+        "index": "flat", "rescore_factor": 0, "index_bytes": int(faiss.serialize_index(flat).nbytes),
+        "float_vector_bytes": 0, "ms_per_query": flat_ms, "recall_at_k": 1.0,
+    }]
+
+    for index_type in ann_index.QUANTIZED_TYPES:
+        started = time.perf_counter()
+        index = ann_index.rebuild_index(flat, index_type, metric=metric)
+        build_s = time.perf_counter() - started
+        index_bytes = int(faiss.serialize_index(index).nbytes)
+        for factor in rescore_factors:
+            if factor:
+                started = time.perf_counter()
+                _, candidates = index.search(queries, k * factor)
+                _, found = ann_index.rescore(queries, candidates, lambda rows: vectors[rows], k, metric)
+                ms = (time.perf_counter() - started) * 1000 / len(queries)
+            else:
+                _, found, ms = _timed_search(index, queries, k)
+            rows.append({
+                "index": index_type, "rescore_factor": factor, "index_bytes": index_bytes,
+                # Rescoring reads float vectors from a memory-mapped file, not the heap
+                "float_vector_bytes": float_bytes if factor else 0,
+                "ms_per_query": ms, "recall_at_k": _recall(truth, found), "build_s": build_s,
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--embeddings", help=".npy file of float32 vectors (default: synthetic)")
+    parser.add_argument("--vectors", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rescore", type=int, nargs="+", default=[0, 4])
+    parser.add_argument("--metric", choices=["l2", "ip"], default="l2")
+    parser.add_argument("--json", help="Also write the rows to this file")
+    args = parser.parse_args()
+
+    if args.embeddings:
+        vectors = np.ascontiguousarray(np.load(args.embeddings), dtype=np.float32)
+    else:
+        vectors = synthetic_vectors(args.vectors, args.dim)
+    metric = faiss.METRIC_INNER_PRODUCT if args.metric == "ip" else faiss.METRIC_L2
+    if metric == faiss.METRIC_INNER_PRODUCT:
+        faiss.normalize_L2(vectors)
+    rng = np.random.default_rng(1)
+    rows_idx = rng.choice(len(vectors), min(args.queries, len(vectors)), replace=False)
+    queries = vectors[rows_idx] + 0.05 * rng.standard_normal((len(rows_idx), vectors.shape[1])).astype(np.float32)
+    if metric == faiss.METRIC_INNER_PRODUCT:
+        faiss.normalize_L2(queries)
+
+    rows = run(vectors, queries, args.k, args.rescore, metric)
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries, k={args.k}")
+    print(f"{'index':<8} {'rescore':>7} {'index MB':>9} {'mmap MB':>8} {'ms/query':>9} {'recall@k':>9}")
+    for row in rows:
+        print(f"{row['index']:<8} {row['rescore_factor']:>7} {row['index_bytes'] / 2**20:>9.1f} "
+              f"{row['float_vector_bytes'] / 2**20:>8.1f} {row['ms_per_query']:>9.3f} {row['recall_at_k']:>9.3f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""How the retrieval layer scales with corpus size, on synthetic embeddings.
+
+    python -m benchmarks.scaling                                   # 10k .. 160k chunks
+    python -m benchmarks.scaling --start 125000 --max-chunks 8000000 --targets retriever hyde
+    python -m benchmarks.scaling --index-types hnsw ivf_pq --dim 384
+    python -m benchmarks.scaling --max-chunks 10000000 --work-dir /mnt/scratch
+
+Chunk embeddings are low-rank Gaussian vectors generated block by block
+from a fixed seed. The corpus of size 2n therefore starts with the corpus
+of size n. The largest corpus is written once to a float32 file in
+``--work-dir`` (a temporary directory by default) and every size reads a
+prefix of it through ``np.memmap``, so the harness itself never holds the
+corpus in memory; only the structures under test do. Queries are noisy
+copies of random chunks. Three targets are measured for every corpus size:
+
+* ``retriever``: ``Retriever.build_index`` / ``retrieve`` / ``retrieve_batch``
+  for each ``--index-types`` entry. A synthetic embedding model stands in
+  for the encoder, and its time is subtracted from the build time.
+* ``langchain``: the numpy search of ``LangChainRetriever``, which has no
+  batch API.
+* ``hyde``: the HyDE index (cosine similarity, inner product on normalized
+  vectors) for each ``--hyde-index-types`` entry, built and searched
+  the way ``HyDERetriever`` does it.
+
+Memory is the size of the serialized index plus the float vectors kept
+for rescoring. Recall@k is measured on the query sample against exact
+search with the target's own metric, computed block by block over the
+memory-mapped corpus instead of through a second full index. The report is
+written as JSON and as a markdown table.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+import faiss
+import numpy as np
+
+from model import ann_index
+from model.langchain_retriever import dot_product_search
+from model.retriever import Retriever
+
+from .stages import peak_rss_mb
+
+TARGETS = ["retriever", "langchain", "hyde"]
+HYDE_INDEX_TYPES = ("flat",) + ann_index.QUANTIZED_TYPES
+DEFAULT_OUTPUT = os.path.join("benchmarks", "results", "scaling.json")
+BLOCK = 65536  # Rows generated, copied or scanned at a time
+
+
+class SyntheticCorpus:
+    """Deterministic low-rank chunk embeddings, generated in fixed-size seeded blocks"""
+
+    def __init__(self, dim: int = 768, rank: int = 64, seed: int = 0, block: int = BLOCK):
+        self.dim = dim
+        self.rank = rank
+        self.seed = seed
+        self.block = block
+        self.basis = (np.random.default_rng(seed).standard_normal((rank, dim)) / np.sqrt(rank)).astype(np.float32)
+
+    def _fill(self, out: np.ndarray):
+        for start in range(0, len(out), self.block):
+            rows = min(self.block, len(out) - start)
+            latent = np.random.default_rng([self.seed, start // self.block]).standard_normal((self.block, self.rank))
+            out[start:start + rows] = latent[:rows].astype(np.float32) @ self.basis
+
+    def vectors(self, n: int) -> np.ndarray:
+        """The first ``n`` chunk vectors in memory"""
+        out = np.empty((n, self.dim), dtype=np.float32)
+        self._fill(out)
+        return out
+
+    def write(self, path: str, n: int) -> np.ndarray:
+        """Write the first ``n`` chunk vectors to ``path``; returns a read-only memmap of them"""
+        out = np.memmap(path, dtype=np.float32, mode="w+", shape=(n, self.dim))
+        self._fill(out)
+        out.flush()
+        del out
+        return np.memmap(path, dtype=np.float32, mode="r", shape=(n, self.dim))
+
+    def queries(self, vectors: np.ndarray, count: int, noise: float = 0.1) -> np.ndarray:
+        rng = np.random.default_rng([self.seed, len(vectors), 1])
+        rows = rng.choice(len(vectors), min(count, len(vectors)), replace=False)
+        scale = float(np.sqrt((vectors[rows] ** 2).mean()))
+        noisy = vectors[rows] + noise * scale * rng.standard_normal((len(rows), self.dim)).astype(np.float32)
+        return noisy.astype(np.float32)
+
+
+class SyntheticEmbeddingModel:
+    """Stands in for EmbeddingModel: "chunk <i>" maps to row i, "query <j>" to query j"""
+
+    def __init__(self, vectors: np.ndarray, queries: np.ndarray):
+        self.vectors = vectors
+        self.queries = queries
+        self.encode_seconds = 0.0
+
+    def encode(self, texts):
+        started = time.perf_counter()
+        ids = np.fromiter((int(text[6:]) for text in texts), dtype=np.int64, count=len(texts))
+        if len(ids) and ids[-1] - ids[0] == len(ids) - 1:
+            result = self.vectors[ids[0]:ids[-1] + 1]  # Retriever encodes contiguous batches
+        else:
+            result = self.vectors[ids]
+        self.encode_seconds += time.perf_counter() - started
+        return result
+
+    def encode_queries(self, texts):
+        return self.queries[[int(text[6:]) for text in texts]]
+
+
+def normalized_copy(vectors: np.ndarray, path: str, block: int = BLOCK) -> np.ndarray:
+    """L2-normalized rows of ``vectors`` written to ``path`` block by block; returns a read-only memmap"""
+    out = np.memmap(path, dtype=np.float32, mode="w+", shape=vectors.shape)
+    for start in range(0, len(vectors), block):
+        rows = np.array(vectors[start:start + block], dtype=np.float32)
+        faiss.normalize_L2(rows)
+        out[start:start + len(rows)] = rows
+    out.flush()
+    del out
+    return np.memmap(path, dtype=np.float32, mode="r", shape=vectors.shape)
+
+
+def exact_neighbors(vectors: np.ndarray, queries: np.ndarray, k: int, metric: int = faiss.METRIC_L2,
+                    block: int = BLOCK) -> np.ndarray:
+    """Exact top-``k`` row ids of each query, scanning ``vectors`` (e.g. a memmap) one block at a time"""
+    heap = faiss.ResultHeap(len(queries), k, keep_max=metric == faiss.METRIC_INNER_PRODUCT)
+    for start in range(0, len(vectors), block):
+        rows = np.ascontiguousarray(vectors[start:start + block], dtype=np.float32)
+        distances, ids = faiss.knn(queries, rows, min(k, len(rows)), metric)
+        heap.add_result(distances, np.where(ids >= 0, ids + start, -1))
+    heap.finalize()
+    return heap.I
+
+
+def _index_bytes(index: faiss.Index) -> int:
+    # write_index instead of serialize_index so large indexes are not copied in memory
+    fd, path = tempfile.mkstemp(suffix=".faiss")
+    os.close(fd)
+    try:
+        faiss.write_index(index, path)
+        return os.path.getsize(path)
+    finally:
+        os.remove(path)
+
+
+def _recall(truth: np.ndarray, found: List[List[int]], k: int) -> float:
+    return float(np.mean([len(set(t[:k]) & set(f[:k])) / k for t, f in zip(truth, found)]))
+
+
+def _latencies(search_one: Callable[[int], object], count: int) -> Dict[str, float]:
+    search_one(0)  # warm-up
+    samples = []
+    for j in range(count):
+        started = time.perf_counter()
+        search_one(j)
+        samples.append((time.perf_counter() - started) * 1000)
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {"single_p50_ms": float(p50), "single_p95_ms": float(p95), "single_p99_ms": float(p99)}
+
+
+def _row(target: str, index_type: str, n: int, build_s: float, index_bytes: int, float_bytes: int,
+         latencies: Dict[str, float], batch_ms: Optional[float], recall: float, k: int) -> dict:
+    return {
+        "target": target, "index": index_type, "chunks": n, "build_s": build_s,
+        "index_mb": index_bytes / 2**20, "float_vector_mb": float_bytes / 2**20,
+        **latencies, "batch_ms_per_query": batch_ms, "recall_at_k": recall, "k": k,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def bench_retriever(vectors, queries, index_type, params, k, batch_size=256) -> dict:
+    n = len(vectors)
+    model = SyntheticEmbeddingModel(vectors, queries)
+    retriever = Retriever(model, index_type, params, query_cache_size=0)
+    documents = [f"chunk {i}" for i in range(n)]
+    query_texts = [f"query {j}" for j in range(len(queries))]
+
+    started = time.perf_counter()
+    retriever.build_index(documents, batch_size)
+    build_s = time.perf_counter() - started - model.encode_seconds
+
+    float_bytes = len(retriever.vectors) * vectors.shape[1] * 4 if retriever.vectors is not None else 0
+    latencies = _latencies(lambda j: retriever.retrieve(query_texts[j], k), len(queries))
+    started = time.perf_counter()
+    results = retriever.retrieve_batch(query_texts, k)
+    batch_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+    truth = exact_neighbors(vectors, queries, k, faiss.METRIC_L2)
+    found = [[int(doc[6:]) for doc, _ in result] for result in results]
+    resolved = ann_index.index_type_of(retriever.index)
+    return _row("retriever", resolved, n, build_s, _index_bytes(retriever.index), float_bytes,
+                latencies, batch_ms, _recall(truth, found, k), k)
+
+
+def bench_langchain(vectors, queries, k) -> dict:
+    started = time.perf_counter()
+    index = np.array(vectors, dtype=np.float32)  # LangChainRetriever._build_index without the encoder
+    build_s = time.perf_counter() - started
+    latencies = _latencies(lambda j: dot_product_search(index, queries[j], k), len(queries))
+    found = [dot_product_search(index, query, k)[0].tolist() for query in queries]
+    index_bytes = index.nbytes
+    del index
+
+    truth = exact_neighbors(vectors, queries, k, faiss.METRIC_INNER_PRODUCT)
+    return _row("langchain", "numpy", len(vectors), build_s, index_bytes, 0,
+                latencies, None, _recall(truth, found, k), k)
+
+
+def bench_hyde(normalized, queries, index_type, params, k) -> dict:
+    n, dim = normalized.shape
+    started = time.perf_counter()
+    index = faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+    for start in range(0, n, BLOCK):
+        rows = np.ascontiguousarray(normalized[start:start + BLOCK])
+        index.add_with_ids(rows, np.arange(start, start + len(rows), dtype=np.int64))
+    if index_type != "flat":
+        index = ann_index.rebuild_index(index, index_type, params, faiss.METRIC_INNER_PRODUCT)
+    build_s = time.perf_counter() - started
+
+    rescore_factor = {**ann_index.DEFAULT_INDEX_PARAMS, **params}["rescore_factor"] or 0
+    rescore_factor = rescore_factor if index_type in ann_index.QUANTIZED_TYPES else 0
+
+    def search(batch):
+        # HyDERetriever._search: over-fetch from a quantized index, rank by exact inner product
+        if rescore_factor:
+            _, candidates = index.search(batch, k * rescore_factor)
+            return ann_index.rescore(batch, candidates, lambda ids: normalized[ids], k,
+                                     faiss.METRIC_INNER_PRODUCT)[1]
+        return index.search(batch, k)[1]
+
+    latencies = _latencies(lambda j: search(queries[j:j + 1]), len(queries))
+    started = time.perf_counter()
+    found = search(queries)
+    batch_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+    truth = exact_neighbors(normalized, queries, k, faiss.METRIC_INNER_PRODUCT)
+    return _row("hyde", index_type, n, build_s, _index_bytes(index), n * dim * 4 if rescore_factor else 0,
+                latencies, batch_ms, _recall(truth, found.tolist(), k), k)
+
+
+def run(sizes: List[int], targets: List[str], index_types: List[str], hyde_index_types: List[str],
+        dim: int = 768, num_queries: int = 200, k: int = 10, params: Optional[dict] = None,
+        seed: int = 0, log: Callable[[str], None] = print, work_dir: Optional[str] = None) -> List[dict]:
+    """One report row per (corpus size, target, index type); corpus files go to ``work_dir``"""
+    params = params or {}
+    corpus = SyntheticCorpus(dim, seed=seed)
+    rows = []
+    with tempfile.TemporaryDirectory(dir=work_dir, prefix="scaling-") as tmp:
+        # Corpora are nested, so the largest one is written once and each size is a prefix of it
+        log(f"writing {max(sizes)} x {dim} vectors to {tmp}")
+        all_vectors = corpus.write(os.path.join(tmp, "vectors.f32"), max(sizes))
+        all_normalized = None
+        if "hyde" in targets:
+            all_normalized = normalized_copy(all_vectors, os.path.join(tmp, "normalized.f32"))
+        for n in sizes:
+            vectors = all_vectors[:n]
+            queries = corpus.queries(vectors, num_queries)
+            if "retriever" in targets:
+                for index_type in index_types:
+                    log(f"{n} chunks: retriever/{index_type}")
+                    rows.append(bench_retriever(vectors, queries, index_type, params, k))
+            if "langchain" in targets:
+                log(f"{n} chunks: langchain")
+                rows.append(bench_langchain(vectors, queries, k))
+            if "hyde" in targets:
+                normalized_queries = queries.copy()
+                faiss.normalize_L2(normalized_queries)
+                for index_type in hyde_index_types:
+                    log(f"{n} chunks: hyde/{index_type}")
+                    rows.append(bench_hyde(all_normalized[:n], normalized_queries, index_type, params, k))
+        del all_vectors, all_normalized, vectors
+    return rows
+
+
+def markdown(rows: List[dict]) -> str:
+    header = ("| target | index | chunks | build s | index MB | float MB | p50 ms | p95 ms | "
+              "batch ms/q | recall@k | peak RSS MB |")
+    lines = [header, "|" + "---|" * (header.count("|") - 1)]
+    for row in rows:
+        batch = f"{row['batch_ms_per_query']:.3f}" if row["batch_ms_per_query"] is not None else "-"
+        rss = f"{row['peak_rss_mb']:.0f}" if row["peak_rss_mb"] is not None else "-"
+        lines.append(
+            f"| {row['target']} | {row['index']} | {row['chunks']} | {row['build_s']:.2f} | "
+            f"{row['index_mb']:.1f} | {row['float_vector_mb']:.1f} | {row['single_p50_ms']:.3f} | "
+            f"{row['single_p95_ms']:.3f} | {batch} | {row['recall_at_k']:.3f} | {rss} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", type=int, default=10_000, help="Smallest corpus, doubled up to --max-chunks")
+    parser.add_argument("--max-chunks", type=int, default=160_000)
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=TARGETS)
+    parser.add_argument("--index-types", nargs="+", choices=ann_index.INDEX_TYPES,
+                        default=list(ann_index.INDEX_TYPES))
+    parser.add_argument("--hyde-index-types", nargs="+", choices=HYDE_INDEX_TYPES, default=list(HYDE_INDEX_TYPES))
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", help="Where the memory-mapped corpus is written (default: system temp dir)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON report; a .md table is written beside it")
+    args = parser.parse_args()
+
+    sizes = []
+    n = args.start
+    while n <= args.max_chunks:
+        sizes.append(n)
+        n *= 2
+    rows = run(sizes, args.targets, args.index_types, args.hyde_index_types, args.dim, args.queries,
+               args.k, seed=args.seed, work_dir=args.work_dir)
+
+    table = markdown(rows)
+    print(table)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"dim": args.dim, "queries": args.queries, "k": args.k, "seed": args.seed,
+                   "sizes": sizes, "rows": rows}, f, indent=2)
+    with open(os.path.splitext(args.output)[0] + ".md", "w", encoding="utf-8") as f:
+        f.write(table)
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
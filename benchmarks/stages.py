@@ -0,0 +1,269 @@
+"""Latency of each pipeline stage on the bundled PDF corpus.
+
+    python -m benchmarks.stages                      # run, compare with the stored baseline
+    python -m benchmarks.stages --save-baseline      # run on reference hardware, store as baseline
+    python -m benchmarks.stages --skip hyde generate --fail-on-regression
+
+Whole-corpus stages (PDF loading, chunking, embedding, index build) are
+timed ``--repeats`` times. Query stages (retrieve, HyDE generation, answer
+generation) get one sample per query and round. Every cache that would hide
+work is switched off: no text, vector, query or HyDE cache, no KV cache and
+no persisted index, so every run starts cold.
+
+Peak RSS is a process-wide high-water mark that only grows as stages run in
+order. Each row reports it as ``peak_rss_mb`` together with
+``peak_rss_growth_mb``, the part of that peak first reached during the stage.
+A stage that stays under an earlier peak shows zero growth.
+
+A stage regresses when its p50 or p95 is more than ``--tolerance`` slower
+than the baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from config import Config
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+QUERIES = [
+    "What is retrieval-augmented generation?",
+    "How are documents split into chunks before indexing?",
+    "Which embedding model is used for dense retrieval?",
+    "What datasets are used in the evaluation?",
+    "How does the proposed method compare with the baseline?",
+    "What are the limitations mentioned by the authors?",
+    "How is the language model fine-tuned?",
+    "What metrics are reported in the experiments?",
+]
+STAGES = ["load_pdfs", "chunk_text", "encode", "build_index", "retrieve", "hyde", "generate"]
+DEFAULT_BASELINE = os.path.join("benchmarks", "baselines", "stages.json")
+DEFAULT_OUTPUT = os.path.join("benchmarks", "results", "stages.json")
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, or None where unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def summarize(samples_ms: List[float], items_per_sample: float, unit: str,
+              rss_before_mb: Optional[float] = None) -> Dict[str, float]:
+    """Percentiles and throughput; ``rss_before_mb`` is the peak RSS when the stage started"""
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    peak = peak_rss_mb()
+    growth = peak - rss_before_mb if peak is not None and rss_before_mb is not None else None
+    return {
+        "runs": len(samples), "p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99),
+        "mean_ms": float(samples.mean()),
+        "throughput": items_per_sample * 1000 / float(samples.mean()) if samples.mean() else 0.0,
+        "unit": f"{unit}/s", "peak_rss_mb": peak, "peak_rss_growth_mb": growth,
+    }
+
+
+def time_calls(fn: Callable[[], object], repeats: int, warmup: int = 1) -> List[float]:
+    """Milliseconds of ``repeats`` calls to ``fn`` after ``warmup`` untimed calls"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def time_each(fn: Callable[[str], object], inputs: List[str], warmup: int = 1) -> List[float]:
+    """One sample in milliseconds per input; the first ``warmup`` inputs are also run untimed first"""
+    for value in inputs[:warmup]:
+        fn(value)
+    samples = []
+    for value in inputs:
+        started = time.perf_counter()
+        fn(value)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float = 0.2,
+            min_delta_ms: float = 1.0) -> List[dict]:
+    """Stages whose p50 or p95 is more than ``tolerance`` (relative) and ``min_delta_ms`` slower"""
+    regressions = []
+    for stage, row in results.items():
+        base = baseline.get(stage)
+        if base is None:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            delta = row[metric] - base[metric]
+            if delta > min_delta_ms and delta > tolerance * base[metric]:
+                regressions.append({"stage": stage, "metric": metric, "baseline": base[metric],
+                                    "current": row[metric], "change": delta / base[metric]})
+    return regressions
+
+
+def run(config: Config, stages: List[str], repeats: int = 3, rounds: int = 1,
+        encode_chunks: int = 256, top_k: int = 3, max_new_tokens: Optional[int] = None,
+        log: Callable[[str], None] = print) -> Dict[str, dict]:
+    """Time the selected ``stages``; returns one summary row per stage"""
+    from data_loader.pdf_loader import PDFLoader
+    from model.embedding_model import EmbeddingModel
+    from model.retriever import Retriever
+
+    results = {}
+    queries = QUERIES * rounds
+    loader = PDFLoader(config.PDF_DIRECTORY, config.PDF_WORKERS)
+
+    rss = peak_rss_mb()
+    texts = loader.load_pdfs()
+    if "load_pdfs" in stages:
+        log("load_pdfs")
+        samples = time_calls(loader.load_pdfs, repeats, warmup=0)
+        results["load_pdfs"] = summarize(samples, len(texts), "documents", rss)
+
+    rss = peak_rss_mb()
+    chunks = loader.chunk_text(texts, config.CHUNK_SIZE, config.CHUNK_OVERLAP)
+    if "chunk_text" in stages:
+        log("chunk_text")
+        samples = time_calls(lambda: loader.chunk_text(texts, config.CHUNK_SIZE, config.CHUNK_OVERLAP), repeats)
+        results["chunk_text"] = summarize(samples, len(chunks), "chunks", rss)
+
+    rss = peak_rss_mb()
+    if not {"encode", "build_index", "retrieve", "generate"} & set(stages):
+        embedding_model = None
+    else:
+        embedding_model = EmbeddingModel(config.DEFAULT_EMBEDDING_MODEL)
+    if "encode" in stages:
+        log("encode")
+        sample = chunks[:encode_chunks]
+        results["encode"] = summarize(time_calls(lambda: embedding_model.encode(sample), repeats),
+                                      len(sample), "chunks", rss)
+
+    retriever = None
+    if {"build_index", "retrieve", "generate"} & set(stages):
+        rss = peak_rss_mb()
+        retriever = Retriever(embedding_model, config.INDEX_TYPE, config.INDEX_PARAMS, query_cache_size=0)
+        if "build_index" in stages:
+            log("build_index")
+            samples = time_calls(lambda: retriever.build_index(chunks), repeats, warmup=0)
+            results["build_index"] = summarize(samples, len(chunks), "chunks", rss)
+        else:
+            retriever.build_index(chunks)
+
+    if "retrieve" in stages:
+        log("retrieve")
+        rss = peak_rss_mb()
+        samples = time_each(lambda q: retriever.retrieve(q, top_k), queries)
+        results["retrieve"] = summarize(samples, 1, "queries", rss)
+
+    if "hyde" in stages:
+        from model.hyde_retriever import HyDERetriever
+        log("hyde")
+        rss = peak_rss_mb()
+        # No index_dir, text cache or query cache: the index is built in memory from the PDFs
+        hyde = HyDERetriever(
+            files_path=config.PDF_DIRECTORY,
+            chunk_size=config.HYDE_CHUNK_SIZE,
+            chunk_overlap=config.HYDE_CHUNK_OVERLAP,
+            language_model_name=config.HYDE_SETTINGS["language_model"],
+            embedding_model_name=config.HYDE_SETTINGS["embedding_model"],
+            pdf_workers=config.PDF_WORKERS,
+            query_cache_size=0,
+        )
+        tokens = max_new_tokens or config.HYDE_TOKEN_BUDGET
+        samples = time_each(lambda q: hyde.generate_hypothetical_document(q, max_new_tokens=tokens), queries)
+        results["hyde"] = summarize(samples, 1, "documents", rss)
+        del hyde
+
+    if "generate" in stages:
+        from model.language_model import LanguageModel
+        from model.rag_system import RAGSystem
+        log("generate")
+        rss = peak_rss_mb()
+        language_model = LanguageModel(config.DEFAULT_LANGUAGE_MODEL)
+        rag_system = RAGSystem(embedding_model, retriever, language_model)
+        # Prompts are built up front so only LanguageModel.generate is timed
+        prompts = {q: rag_system._create_prompt(q, retriever.retrieve(q, top_k)) for q in queries}
+        tokens = max_new_tokens or config.MAX_NEW_TOKENS
+        samples = time_each(lambda q: language_model.generate(prompts[q], max_new_tokens=tokens), queries)
+        results["generate"] = summarize(samples, 1, "answers", rss)
+    return results
+
+
+def _environment(args) -> dict:
+    return {
+        "python": platform.python_version(), "platform": platform.platform(),
+        "processor": platform.processor(), "cpu_count": os.cpu_count(),
+        "repeats": args.repeats, "rounds": args.rounds,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--skip", nargs="+", choices=STAGES, default=[])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=1, help="Passes over the query set for query stages")
+    parser.add_argument("--encode-chunks", type=int, default=256)
+    parser.add_argument("--max-new-tokens", type=int)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    config = Config()
+    stages = [stage for stage in args.stages if stage not in args.skip]
+    results = run(config, stages, args.repeats, args.rounds, args.encode_chunks,
+                  config.TOP_K, args.max_new_tokens)
+    report = {"environment": _environment(args), "stages": results}
+
+    print(f"{'stage':<12} {'runs':>5} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'throughput':>20} "
+          f"{'process peak RSS MB':>20} {'peak growth MB':>15}")
+    for stage, row in results.items():
+        rss = f"{row['peak_rss_mb']:.0f}" if row["peak_rss_mb"] is not None else "-"
+        growth = f"{row['peak_rss_growth_mb']:+.0f}" if row["peak_rss_growth_mb"] is not None else "-"
+        print(f"{stage:<12} {row['runs']:>5} {row['p50_ms']:>10.1f} {row['p95_ms']:>10.1f} {row['p99_ms']:>10.1f} "
+              f"{row['throughput']:>11.2f} {row['unit']:<8} {rss:>20} {growth:>15}")
+
+    for path in [args.output] + ([args.baseline] if args.save_baseline else []):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        print(f"Baseline stored in {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline on reference hardware to create one")
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline["stages"], args.tolerance)
+    if not regressions:
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+        return
+    for row in regressions:
+        print(f"REGRESSION {row['stage']} {row['metric']}: {row['baseline']:.1f} -> {row['current']:.1f} ms "
+              f"({row['change']:+.0%})")
+    if args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
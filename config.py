@@ -25,10 +25,53 @@ class Config:
     # PDF Ayarları
     PDF_DIRECTORY = "data/pdfs"  # PDF'lerin bulunduğu dizin
     CHUNK_SIZE = 500  # Metin parçalama boyutu
+    CHUNK_OVERLAP = 100  # Parçalar arası örtüşme
+    # PDF metin çıkarma süreç sayısı (1 = seri). >1 süreç havuzu açar; giriş
+    # noktası `if __name__ == "__main__":` ile korunmalıdır (Windows, macOS spawn)
+    PDF_WORKERS = 1
+    PDF_PAGES_PER_TASK = 50  # Büyük PDF'ler bu kadar sayfalık parçalara bölünür
+    PDF_FILE_TIMEOUT = 300  # Tek bir PDF için, işin havuza verilmesinden itibaren saniye cinsinden zaman aşımı
+    INGEST_BATCH_SIZE = 256  # İndekslemede tek seferde encode edilen parça sayısı
+
+    # FAISS indeks tipi: "flat", "ivf_flat", "ivf_pq", "hnsw", nicemlenmiş "sq8" (int8) / "binary"
+    # veya korpus boyutuna göre "auto"
+    INDEX_TYPE = "auto"
+    INDEX_PARAMS = {
+        "nprobe": 16,  # IVF: sorgu başına taranan hücre sayısı
+        "ef_search": 64,  # HNSW: arama derinliği
+        "train_sample": 100_000,  # IVF eğitimi için örnek vektör sayısı
+        "rescore_factor": 4,  # sq8/binary: top_k * 4 aday diskteki float vektörlerle yeniden puanlanır (0 = kapalı)
+    }
+    INDEX_RECALL_CHECK = False  # Açılışta ANN indeksini flat indeksle karşılaştır (recall@k)
+    QUERY_CACHE_SIZE = 1024  # Sorgu embedding LRU önbelleğinin kapasitesi
+
+    # Hibrit arama: BM25 ve FAISS sonuçları reciprocal rank fusion ile birleştirilir
+    HYBRID_DENSE_TOP_K = None  # FAISS aday sayısı (None = TOP_K)
+    HYBRID_SPARSE_TOP_K = 10  # BM25 aday sayısı
+    RRF_K = 60  # Reciprocal rank fusion sabiti
+
+    # Cross-encoder ile yeniden sıralama: fazladan aday getirilir, en iyi TOP_K döner
+    RERANK_ENABLED = False
+    RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    RERANK_CANDIDATES = 20  # İstek başına puanlanan en fazla aday
+    RERANK_TIME_BUDGET = 1.0  # Saniye; aşılırsa kalan adaylar getirme sırasıyla kalır
+    RERANK_CACHE_SIZE = 4096  # (soru, parça) skorları için LRU kapasitesi
+
+    # Anlamsal cevap önbelleği: benzer sorulara önceki cevabı döndürür
+    ANSWER_CACHE_ENABLED = True
+    ANSWER_CACHE_THRESHOLD = 0.92  # Cevabın tekrar kullanılması için gereken kosinüs benzerliği
+    ANSWER_CACHE_CAPACITY = 256  # Saklanan en fazla cevap sayısı (LRU)
+    ANSWER_CACHE_TTL = 3600  # Cevapların saniye cinsinden geçerlilik süresi
+
+    # Önbellek Ayarları
+    EMBEDDING_CACHE_DIR = "embedding_cache"  # Parça vektörlerinin diskteki önbelleği (None ile kapatılır)
+    INDEX_DIRECTORY = "index_store"  # Kaydedilen FAISS indeksleri ve parça metinleri
+    TEXT_CACHE_DIR = "text_cache"  # PDF'lerden çıkarılan sayfa metinleri (sıkıştırılmış)
 
     # Retriever seçenekleri
     RETRIEVER_OPTIONS = [
         ("FAISS", "faiss"),
+        ("Hybrid (BM25 + FAISS)", "hybrid"),
         ("HyDE", "hyde")
     ]
 
@@ -37,7 +80,31 @@ class Config:
     DEFAULT_LANGUAGE_MODEL = "gpt2-medium"
     DEFAULT_RETRIEVER = "faiss"  # Varsayılan retriever
     TOP_K = 3  # Benzer belge sayısı
+    STREAM_ANSWERS = True  # Cevabı üretildikçe (token token) yazdır
+    KV_CACHE_MB = 256  # Prompt önekleri için KV önbelleği bellek sınırı (0 = kapalı)
+    MAX_NEW_TOKENS = 50  # Cevap için üretilecek en fazla token sayısı
+    CONTEXT_TOKEN_BUDGET = 1024  # Prompt + cevap için token bütçesi (gpt2 bağlam penceresi; None = sınırsız)
+    CONTEXT_COMPRESSION = False  # Belgelerden yalnızca soruya en yakın cümleleri prompt'a koy
+    COMPRESSION_RATIO = 0.5  # Korunacak cümle oranı
+    COMPRESSION_TOKEN_BUDGET = None  # Verilirse oran yerine bu kadar token'lık cümle korunur
 
     # HyDE Ayarları
     HYDE_CHUNK_SIZE = HYDE_SETTINGS["chunk_size"]
-    HYDE_CHUNK_OVERLAP = HYDE_SETTINGS["chunk_overlap"]
\ No newline at end of file
+    HYDE_CHUNK_OVERLAP = HYDE_SETTINGS["chunk_overlap"]
+    HYDE_CACHE_PATH = "hyde_cache/hyde_cache.sqlite3"  # Hipotetik belge önbelleği (None ile kapatılır)
+    HYDE_CACHE_SIZE = 10000  # Saklanan en fazla hipotetik belge sayısı
+    HYDE_TIME_BUDGET = 3.0  # HyDE üretimi için saniye cinsinden süre sınırı (None = sınırsız)
+    HYDE_TOKEN_BUDGET = 128  # Süre sınırlı modda üretilecek en fazla token
+    HYDE_DEADLINE_GRACE = 0.25  # Üretim durduktan sonra hipotetik belgenin encode edilmesi için ek süre (saniye)
+    HYDE_INDEX_TYPE = "flat"  # HyDE indeks tipi; "sq8" / "binary" belleği azaltır
+    HYDE_NUM_HYPOTHESES = 1  # Tek generate çağrısında üretilip ortalaması alınan hipotetik belge sayısı
+
+    # HTTP servis ayarları (serve.py)
+    SERVER_HOST = "127.0.0.1"
+    SERVER_PORT = 8000
+    SERVER_MAX_BATCH_SIZE = 8  # Tek batch'te birlikte cevaplanan en fazla istek
+    SERVER_MAX_WAIT_MS = 20  # Batch dolmadan önce ilk isteğin en fazla bekleme süresi
+    SERVER_MAX_TOP_K = 20  # /ask isteğinde kabul edilen en büyük top_k
+
+    # Toplu cevaplama ayarları (batch_qa.py)
+    BATCH_QA_SIZE = 32  # Tek answer_batch_with_sources çağrısında cevaplanan soru sayısı
@@ -0,0 +1,44 @@
+import hashlib
+import os
+from typing import Dict, List, Optional, Tuple
+
+
+def file_sha256(path: str) -> str:
+    """Hash a file's content in 1 MiB blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scan_files(pdf_directory: str, previous: Optional[Dict[str, dict]] = None) -> Dict[str, dict]:
+    """Record size, mtime and content hash of every PDF in the directory.
+
+    Files whose size and mtime match ``previous`` keep their stored hash, so
+    only new or touched files are read from disk.
+    """
+    previous = previous or {}
+    states = {}
+    for filename in sorted(os.listdir(pdf_directory)):
+        if not filename.lower().endswith(".pdf"):
+            continue
+        path = os.path.join(pdf_directory, filename)
+        stat = os.stat(path)
+        old = previous.get(filename)
+        if isinstance(old, dict) and old.get("size") == stat.st_size and old.get("mtime") == stat.st_mtime_ns:
+            sha256 = old["sha256"]
+        else:
+            sha256 = file_sha256(path)
+        states[filename] = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "sha256": sha256}
+    return states
+
+
+def diff_files(previous: Dict[str, dict],
+               current: Dict[str, dict]) -> Tuple[List[str], List[str], List[str]]:
+    """Split file names into (added, changed, removed) by content hash"""
+    added = [name for name in current if name not in previous]
+    changed = [name for name in current
+               if name in previous and previous[name]["sha256"] != current[name]["sha256"]]
+    removed = [name for name in previous if name not in current]
+    return added, changed, removed
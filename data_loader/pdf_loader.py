@@ -1,30 +1,218 @@
 import os
-from typing import List
+import time
+import multiprocessing
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from pypdf import PdfReader
 import logging
+from data_loader.corpus_manifest import file_sha256
+from data_loader.text_cache import TextCache
+
+
+def _count_pages(filepath: str) -> int:
+    return len(PdfReader(filepath).pages)
+
+
+def _extract_page_range(filepath: str, start: int, end: int) -> List[str]:
+    """Worker task: extract the text of pages [start, end) of one PDF"""
+    reader = PdfReader(filepath)
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+class _WorkerPool:
+    """Process pool shared by the file groups of one loader call.
+
+    The pool is started on first use. After a timeout it is terminated at the
+    end of the group and a fresh one is started for the next group, so a
+    worker stuck on a pathological PDF never holds a slot for long.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.timed_out = False
+        self._pool = None
+
+    def get(self):
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(self.workers)
+            self.timed_out = False
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
 
 class PDFLoader:
-    def __init__(self, pdf_directory: str = "data/pdfs"):
+    def __init__(self,
+                 pdf_directory: str = "data/pdfs",
+                 workers: int = 1,
+                 pages_per_task: int = 50,
+                 file_timeout: float = 300.0,
+                 text_cache_dir: Optional[str] = None):
         if not os.path.exists(pdf_directory):
             raise ValueError(f"PDF directory '{pdf_directory}' does not exist")
         self.pdf_directory = pdf_directory
+        # workers > 1 spreads extraction over a process pool; large PDFs are
+        # split into page ranges of pages_per_task pages
+        self.workers = workers
+        self.pages_per_task = pages_per_task
+        self.file_timeout = file_timeout
+        # Extracted page texts keyed by file content hash, shared by every loader using the same directory
+        self.text_cache = TextCache(text_cache_dir) if text_cache_dir else None
+        self._known_hashes: Dict[str, str] = {}
         self.logger = logging.getLogger(__name__)
 
+    def pdf_files(self) -> List[str]:
+        """PDF file names in the directory, in a stable order"""
+        return sorted(f for f in os.listdir(self.pdf_directory) if f.lower().endswith(".pdf"))
+
+    def set_content_hashes(self, hashes: Dict[str, str]):
+        """Reuse content hashes computed elsewhere (the corpus manifest scan) instead of rereading the files"""
+        self._known_hashes = dict(hashes)
+
+    def _content_hash(self, filename: str) -> Optional[str]:
+        if self.text_cache is None:
+            return None
+        known = self._known_hashes.get(filename)
+        return known or file_sha256(os.path.join(self.pdf_directory, filename))
+
+    def extract_pages(self, filename: str) -> List[str]:
+        """Extract the page texts of a single PDF, served from the text cache when possible"""
+        return list(self.iter_pages(filename))
+
+    def extract_text(self, filename: str) -> str:
+        """Extract the text of a single PDF, pages joined by spaces"""
+        return " ".join(self.extract_pages(filename))
+
+    def iter_pages(self, filename: str) -> Iterator[str]:
+        """Yield the text of a single PDF one page at a time"""
+        sha256 = self._content_hash(filename)
+        cached = self.text_cache.get(sha256) if sha256 else None
+        if cached is not None:
+            yield from cached
+            return
+        reader = PdfReader(os.path.join(self.pdf_directory, filename))
+        pages = []
+        for page in reader.pages:
+            text = page.extract_text() or ""
+            pages.append(text)
+            yield text
+        if sha256:
+            self.text_cache.put(sha256, pages)
+
+    def iter_documents(self, filenames: List[str]) -> Iterator[Tuple[str, Optional[Iterable[str]]]]:
+        """Yield (filename, page texts) pairs, holding at most one group of files in memory.
+
+        Serially, pages are read lazily; in parallel mode files are extracted
+        ``workers`` at a time by one process pool reused across groups. Pages
+        are None when extraction failed.
+        """
+        if self.workers <= 1:
+            for filename in filenames:
+                yield filename, self.iter_pages(filename)
+            return
+        pool = _WorkerPool(self.workers)
+        try:
+            for start in range(0, len(filenames), self.workers):
+                group = filenames[start:start + self.workers]
+                yield from zip(group, self._extract_pages_parallel(group, pool))
+        finally:
+            pool.close()
+
+    def extract_pages_many(self, filenames: List[str]) -> List[Optional[List[str]]]:
+        """Page texts of several PDFs in input order; None marks a file that failed or timed out"""
+        if self.workers > 1 and len(filenames) > 0:
+            pool = _WorkerPool(self.workers)
+            try:
+                return self._extract_pages_parallel(filenames, pool)
+            finally:
+                pool.close()
+        results = []
+        for filename in filenames:
+            try:
+                results.append(self.extract_pages(filename))
+            except Exception as e:
+                self.logger.error(f"Error processing {filename}: {str(e)}")
+                results.append(None)
+        return results
+
+    def extract_texts(self, filenames: List[str]) -> List[Optional[str]]:
+        """Extract several PDFs in input order; None marks a file that failed or timed out"""
+        return [" ".join(pages) if pages is not None else None for pages in self.extract_pages_many(filenames)]
+
+    def _wait(self, filename: str, jobs: list, deadline: float, pool: _WorkerPool) -> Optional[list]:
+        try:
+            return [job.get(timeout=max(0.0, deadline - time.monotonic())) for job in jobs]
+        except multiprocessing.TimeoutError:
+            self.logger.error(f"Timed out after {self.file_timeout}s processing {filename}")
+            pool.timed_out = True
+        except Exception as e:
+            self.logger.error(f"Error processing {filename}: {str(e)}")
+        return None
+
+    def _extract_pages_parallel(self, filenames: List[str], pool: _WorkerPool) -> List[Optional[List[str]]]:
+        hashes = {filename: self._content_hash(filename) for filename in filenames}
+        results = {}
+        for filename, sha256 in hashes.items():
+            cached = self.text_cache.get(sha256) if sha256 else None
+            if cached is not None:
+                results[filename] = cached
+        misses = [filename for filename in filenames if filename not in results]
+        if misses:
+            for filename, pages in zip(misses, self._run_pool(misses, pool)):
+                results[filename] = pages
+                if pages is not None and hashes[filename]:
+                    self.text_cache.put(hashes[filename], pages)
+        return [results[filename] for filename in filenames]
+
+    def _run_pool(self, filenames: List[str], workers: _WorkerPool) -> List[Optional[List[str]]]:
+        paths = [os.path.join(self.pdf_directory, filename) for filename in filenames]
+        pool = workers.get()
+        # file_timeout covers counting and extracting a file, from the moment it is submitted
+        deadlines = []
+        count_jobs = []
+        for path in paths:
+            deadlines.append(time.monotonic() + self.file_timeout)
+            count_jobs.append(pool.apply_async(_count_pages, (path,)))
+        range_jobs = []
+        for filename, path, count_job, deadline in zip(filenames, paths, count_jobs, deadlines):
+            counted = self._wait(filename, [count_job], deadline, workers)
+            if counted is None:
+                range_jobs.append(None)
+                continue
+            page_count = counted[0]
+            range_jobs.append([
+                pool.apply_async(_extract_page_range, (path, start, min(start + self.pages_per_task, page_count)))
+                for start in range(0, page_count, self.pages_per_task)
+            ])
+
+        results = []
+        for filename, jobs, deadline in zip(filenames, range_jobs, deadlines):
+            page_ranges = None
+            if jobs is not None:
+                page_ranges = self._wait(filename, jobs, deadline, workers)
+            if page_ranges is None:
+                results.append(None)
+            else:
+                results.append([page for pages in page_ranges for page in pages])
+        if workers.timed_out:
+            # Terminating kills any worker still stuck on a pathological PDF
+            workers.close()
+        return results
+
     def load_pdfs(self) -> List[str]:
         """Improved PDF text extraction with error handling"""
         texts = []
-        for filename in os.listdir(self.pdf_directory):
-            if filename.lower().endswith(".pdf"):
-                filepath = os.path.join(self.pdf_directory, filename)
-                try:
-                    reader = PdfReader(filepath)
-                    text = " ".join([page.extract_text() or "" for page in reader.pages])
-                    if text.strip():
-                        texts.append(text)
-                    else:
-                        self.logger.warning(f"Empty PDF file: {filename}")
-                except Exception as e:
-                    self.logger.error(f"Error processing {filename}: {str(e)}")
+        filenames = self.pdf_files()
+        for filename, text in zip(filenames, self.extract_texts(filenames)):
+            if text is None:
+                continue
+            if text.strip():
+                texts.append(text)
+            else:
+                self.logger.warning(f"Empty PDF file: {filename}")
         return texts
 
     def chunk_text(self, 
@@ -41,4 +229,35 @@ class PDFLoader:
                 if chunk:
                     chunks.append(chunk)
                 start += chunk_size - chunk_overlap
-        return chunks
\ No newline at end of file
+        return chunks
+
+    def iter_chunks(self,
+                    pages: Iterable[str],
+                    chunk_size: int = 500,
+                    chunk_overlap: int = 100) -> Iterator[str]:
+        """Streaming chunk_text over one document's pages.
+
+        Pages are joined with spaces as in extract_text, and the chunks are
+        identical to chunk_text on the joined text, but only the current
+        window is kept in memory.
+        """
+        step = chunk_size - chunk_overlap
+        buffer = ""
+        offset = 0  # position of buffer[0] in the joined text
+        start = 0
+        for page_number, page in enumerate(pages):
+            buffer += page if page_number == 0 else " " + page
+            while start + chunk_size <= offset + len(buffer):
+                chunk = buffer[start - offset:start - offset + chunk_size].strip()
+                if chunk:
+                    yield chunk
+                start += step
+            if start > offset:
+                buffer = buffer[start - offset:]
+                offset = start
+        total = offset + len(buffer)
+        while start < total:
+            chunk = buffer[start - offset:min(start + chunk_size, total) - offset].strip()
+            if chunk:
+                yield chunk
+            start += step
\ No newline at end of file
@@ -0,0 +1,38 @@
+import gzip
+import json
+import os
+from typing import List, Optional
+
+
+class TextCache:
+    """Compressed store of extracted PDF page texts, keyed by file content hash.
+
+    Each file is one gzip-compressed JSON list of page texts, so page
+    boundaries survive and re-chunking never has to re-run pypdf.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, sha256: str) -> str:
+        return os.path.join(self.directory, sha256[:2], f"{sha256}.json.gz")
+
+    def get(self, sha256: str) -> Optional[List[str]]:
+        path = self._path(sha256)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            pages = json.load(f)
+        self.hits += 1
+        return pages
+
+    def put(self, sha256: str, pages: List[str]):
+        path = self._path(sha256)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(pages, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
@@ -0,0 +1,197 @@
+import math
+import time
+from typing import Dict, Optional, Tuple
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw", "sq8", "binary")
+# Compressed flat codes; top candidates can be rescored against float vectors
+QUANTIZED_TYPES = ("sq8", "binary")
+
+DEFAULT_INDEX_PARAMS = {
+    "nlist": None,          # IVF cells; None = 4 * sqrt(n)
+    "nprobe": 16,           # IVF cells visited per query
+    "pq_m": 16,             # PQ sub-quantizers (must divide the dimension)
+    "pq_nbits": 8,          # bits per PQ code
+    "hnsw_m": 32,           # HNSW graph degree
+    "ef_construction": 200,
+    "ef_search": 64,
+    "train_sample": 100_000,
+    "rescore_factor": 4,    # sq8/binary: rescore top_k * factor candidates with float vectors (0 = off)
+    "auto_flat_max": 50_000,   # "auto" keeps an exact index up to this many vectors
+    "auto_hnsw_max": 2_000_000,  # ... HNSW up to this many, IVF-PQ beyond
+    "max_dangling": 0.2,    # HNSW: rebuild once removed-but-indexed vectors exceed this fraction
+    "max_tombstones": 0.2,  # renumber chunk ids once removed ids exceed this fraction of the id space
+}
+
+
+def resolve_index_type(index_type: str, n_vectors: int, params: Optional[Dict] = None) -> str:
+    """Map "auto" to a concrete index type based on corpus size"""
+    params = {**DEFAULT_INDEX_PARAMS, **(params or {})}
+    if index_type != "auto":
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type: {index_type}")
+        return index_type
+    if n_vectors <= params["auto_flat_max"]:
+        return "flat"
+    if n_vectors <= params["auto_hnsw_max"]:
+        return "hnsw"
+    return "ivf_pq"
+
+
+def _nlist(n_vectors: int, params: Dict) -> int:
+    nlist = params["nlist"] or int(4 * math.sqrt(n_vectors))
+    # k-means wants roughly 39 training points per centroid
+    return max(1, min(nlist, n_vectors // 39))
+
+
+def create_index(dimension: int, index_type: str, n_vectors: int,
+                 params: Optional[Dict] = None, metric: int = faiss.METRIC_L2) -> faiss.Index:
+    """Create an untrained FAISS index of the given type"""
+    params = {**DEFAULT_INDEX_PARAMS, **(params or {})}
+    if index_type == "flat":
+        description = "Flat"
+    elif index_type == "ivf_flat":
+        description = f"IVF{_nlist(n_vectors, params)},Flat"
+    elif index_type == "ivf_pq":
+        description = f"IVF{_nlist(n_vectors, params)},PQ{params['pq_m']}x{params['pq_nbits']}"
+    elif index_type == "hnsw":
+        description = f"HNSW{params['hnsw_m']},Flat"
+    elif index_type == "sq8":
+        description = "SQ8"
+    elif index_type == "binary":
+        # One bit per dimension against a learned per-dimension threshold, Hamming search
+        return faiss.IndexLSH(dimension, dimension, False, True)
+    else:
+        raise ValueError(f"Unknown index type: {index_type}")
+    index = faiss.index_factory(dimension, description, metric)
+    if index_type == "hnsw":
+        index.hnsw.efConstruction = params["ef_construction"]
+    return index
+
+
+def train_index(index: faiss.Index, vectors: np.ndarray, sample_size: int, seed: int = 0):
+    """Train on a random sample of the vectors (no-op for indexes that need no training)"""
+    if index.is_trained:
+        return
+    if len(vectors) > sample_size:
+        rows = np.random.default_rng(seed).choice(len(vectors), sample_size, replace=False)
+        vectors = vectors[np.sort(rows)]
+    index.train(np.ascontiguousarray(vectors, dtype=np.float32))
+
+
+def set_search_params(index: faiss.Index, params: Optional[Dict] = None):
+    """Apply nprobe / efSearch to an index, looking through ID-map wrappers"""
+    params = {**DEFAULT_INDEX_PARAMS, **(params or {})}
+    base = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+    if isinstance(base, faiss.IndexIVF):
+        base.nprobe = params["nprobe"]
+    elif isinstance(base, faiss.IndexHNSW):
+        base.hnsw.efSearch = params["ef_search"]
+
+
+def index_type_of(index: faiss.Index) -> str:
+    base = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+    if isinstance(base, faiss.IndexIVFPQ):
+        return "ivf_pq"
+    if isinstance(base, faiss.IndexIVF):
+        return "ivf_flat"
+    if isinstance(base, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(base, faiss.IndexScalarQuantizer):
+        return "sq8"
+    if isinstance(base, faiss.IndexLSH):
+        return "binary"
+    return "flat"
+
+
+def rebuild_index(index: faiss.Index, index_type: str, params: Optional[Dict] = None,
+                  metric: int = faiss.METRIC_L2) -> faiss.Index:
+    """Copy an ID-mapped flat index into a new ID-mapped index of ``index_type``, keeping the ids"""
+    base = faiss.downcast_index(index.index)
+    return _build(base.reconstruct_n(0, index.ntotal), faiss.vector_to_array(index.id_map),
+                  index_type, params, metric)
+
+
+def compact_index(index: faiss.Index, keep_ids: np.ndarray, params: Optional[Dict] = None) -> faiss.Index:
+    """Rebuild an ID-mapped index of the same type and metric holding only ``keep_ids``.
+
+    For indexes that cannot remove entries (HNSW), removed ids otherwise stay
+    in the graph for good.
+    """
+    keep_ids = np.asarray(keep_ids, dtype=np.int64)
+    vectors = index.reconstruct_batch(keep_ids) if len(keep_ids) else np.zeros((0, index.d), dtype=np.float32)
+    return _build(vectors, keep_ids, index_type_of(index), params, index.metric_type)
+
+
+def renumber_ids(index: faiss.Index, mapping: np.ndarray):
+    """Replace every id ``i`` of an IndexIDMap2 with ``mapping[i]`` in place, without touching the vectors"""
+    old_ids = faiss.vector_to_array(index.id_map)
+    faiss.copy_array_to_vector(np.asarray(mapping, dtype=np.int64)[old_ids], index.id_map)
+    index.construct_rev_map()
+
+
+def _build(vectors: np.ndarray, ids: np.ndarray, index_type: str, params: Optional[Dict],
+           metric: int) -> faiss.Index:
+    params = {**DEFAULT_INDEX_PARAMS, **(params or {})}
+    new_base = create_index(vectors.shape[1], index_type, len(vectors), params, metric)
+    train_index(new_base, vectors, params["train_sample"])
+    rebuilt = faiss.IndexIDMap2(new_base)
+    rebuilt.add_with_ids(vectors, ids)
+    set_search_params(rebuilt, params)
+    return rebuilt
+
+
+def rescore(queries: np.ndarray, candidates: np.ndarray, lookup, k: int,
+            metric: int = faiss.METRIC_L2) -> Tuple[np.ndarray, np.ndarray]:
+    """Re-rank candidate ids by exact distance to the queries.
+
+    ``candidates`` is the id matrix of a (quantized) search, -1 for empty
+    slots; ``lookup(ids)`` returns their float32 vectors. Returns
+    (distances, ids) shaped like ``index.search`` output: L2 distances
+    ascending or inner products descending, padded with -1 ids.
+    """
+    distances = np.full((len(queries), k), np.inf if metric == faiss.METRIC_L2 else -np.inf, dtype=np.float32)
+    ids = np.full((len(queries), k), -1, dtype=np.int64)
+    for row, query in enumerate(queries):
+        found = candidates[row][candidates[row] >= 0]
+        if len(found) == 0:
+            continue
+        vectors = lookup(found)
+        if metric == faiss.METRIC_L2:
+            exact = ((vectors - query) ** 2).sum(axis=1)
+            order = np.argsort(exact, kind="stable")[:k]
+        else:
+            exact = vectors @ query
+            order = np.argsort(-exact, kind="stable")[:k]
+        distances[row, :len(order)] = exact[order]
+        ids[row, :len(order)] = found[order]
+    return distances, ids
+
+
+def recall_at_k(index: faiss.Index, vectors: np.ndarray, ids: np.ndarray,
+                queries: np.ndarray, k: int = 10, metric: int = faiss.METRIC_L2) -> Dict[str, float]:
+    """Compare ``index`` against an exact flat index over the same vectors.
+
+    Returns recall@k and mean per-query latency (ms) of both indexes.
+    """
+    exact = faiss.IndexIDMap2(faiss.IndexFlat(vectors.shape[1], metric))
+    exact.add_with_ids(np.ascontiguousarray(vectors, dtype=np.float32), ids.astype(np.int64))
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+
+    def timed_search(target):
+        started = time.perf_counter()
+        _, found = target.search(queries, k)
+        return found, (time.perf_counter() - started) * 1000 / len(queries)
+
+    truth, exact_ms = timed_search(exact)
+    found, approx_ms = timed_search(index)
+    hits = sum(len(set(t[t >= 0]) & set(f[f >= 0])) for t, f in zip(truth, found))
+    expected = int((truth >= 0).sum())
+    return {
+        "recall_at_k": hits / expected if expected else 1.0,
+        "k": k,
+        "index_ms_per_query": approx_ms,
+        "flat_ms_per_query": exact_ms,
+    }
@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticAnswerCache:
+    """LRU + TTL cache of answers, looked up by question-embedding similarity.
+
+    A question hits when its cosine similarity to a cached question is at
+    least ``threshold`` and it asks for the same ``top_k``. Entries expire
+    after ``ttl`` seconds and the whole cache is dropped whenever the
+    retriever's index version changes.
+    """
+
+    def __init__(self, threshold: float = 0.92, capacity: int = 256, ttl: float = 3600.0):
+        self.threshold = threshold
+        self.capacity = capacity
+        self.ttl = ttl
+        self.index_version = None
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, dict]" = OrderedDict()
+        self._next_key = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        embedding = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm > 0 else embedding
+
+    def _sync(self, index_version):
+        if index_version != self.index_version:
+            self._entries.clear()
+            self.index_version = index_version
+        now = time.monotonic()
+        for key in [key for key, entry in self._entries.items() if entry["expires"] <= now]:
+            del self._entries[key]
+
+    def lookup(self, embedding: np.ndarray, top_k: int, index_version=None) -> Optional[Tuple[str, List[Tuple[str, float]]]]:
+        """Return (answer, sources) of the most similar cached question, or None"""
+        query = self._normalize(embedding)
+        with self._lock:
+            self._sync(index_version)
+            candidates = [(key, entry) for key, entry in self._entries.items() if entry["top_k"] == top_k]
+            if candidates:
+                matrix = np.stack([entry["embedding"] for _, entry in candidates])
+                similarities = matrix @ query
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    key, entry = candidates[best]
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry["answer"], entry["sources"]
+            self.misses += 1
+            return None
+
+    def put(self, embedding: np.ndarray, question: str, answer: str,
+            sources: List[Tuple[str, float]], top_k: int, index_version=None):
+        with self._lock:
+            self._sync(index_version)
+            self._entries[self._next_key] = {
+                "embedding": self._normalize(embedding),
+                "question": question,
+                "answer": answer,
+                "sources": sources,
+                "top_k": top_k,
+                "expires": time.monotonic() + self.ttl,
+            }
+            self._next_key += 1
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._entries),
+        }
@@ -0,0 +1,85 @@
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Keeps identifiers such as "gpt2-medium", "2411.19865v1" or "faiss.indexflatl2" whole
+_TOKEN = re.compile(r"\w+(?:[.\-]\w+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class BM25Index:
+    """Okapi BM25 over an in-memory inverted index.
+
+    Postings are stored CSR-style in flat numpy arrays: ``offsets[t]`` to
+    ``offsets[t + 1]`` index the documents and precomputed BM25 weights
+    (IDF x saturated term frequency) of term ``t``. Scoring a query is one
+    vectorized scatter-add per query term.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.vocabulary: Dict[str, int] = {}
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.doc_ids = np.zeros(0, dtype=np.int32)
+        self.weights = np.zeros(0, dtype=np.float32)
+        self.idf = np.zeros(0, dtype=np.float32)
+        self.num_docs = 0
+
+    def build(self, documents: Sequence[Optional[str]]):
+        """Index ``documents``; a document's id is its position, ``None`` entries are skipped"""
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        lengths = np.zeros(len(documents), dtype=np.float32)
+        for doc_id, text in enumerate(documents):
+            if text is None:
+                continue
+            counts = Counter(tokenize(text))
+            lengths[doc_id] = sum(counts.values())
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((doc_id, tf))
+
+        live = int(sum(text is not None for text in documents))
+        avg_length = float(lengths.sum() / live) if live else 0.0
+        self.num_docs = len(documents)
+        self.vocabulary = {term: i for i, term in enumerate(postings)}
+        sizes = np.array([len(entries) for entries in postings.values()], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        self.idf = np.log1p((live - sizes + 0.5) / (sizes + 0.5)).astype(np.float32)
+
+        self.doc_ids = np.empty(int(self.offsets[-1]), dtype=np.int32)
+        self.weights = np.empty(int(self.offsets[-1]), dtype=np.float32)
+        for t, entries in enumerate(postings.values()):
+            start, end = self.offsets[t], self.offsets[t + 1]
+            ids, tfs = np.array(entries, dtype=np.int64).T
+            norm = self.k1 * (1 - self.b + self.b * lengths[ids] / (avg_length or 1.0))
+            self.doc_ids[start:end] = ids
+            self.weights[start:end] = self.idf[t] * tfs * (self.k1 + 1) / (tfs + norm)
+
+    def search(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        """(document id, BM25 score) pairs, best first; documents without a query term are not returned"""
+        scores = np.zeros(self.num_docs, dtype=np.float32)
+        for term in set(tokenize(query)):
+            t = self.vocabulary.get(term)
+            if t is None:
+                continue
+            start, end = self.offsets[t], self.offsets[t + 1]
+            # A term occurs at most once per document, so plain fancy-index addition is safe
+            scores[self.doc_ids[start:end]] += self.weights[start:end]
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(i), float(scores[i])) for i in candidates]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "documents": self.num_docs,
+            "terms": len(self.vocabulary),
+            "postings": len(self.doc_ids),
+            "bytes": self.offsets.nbytes + self.doc_ids.nbytes + self.weights.nbytes + self.idf.nbytes,
+        }
@@ -0,0 +1,76 @@
+import math
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split on sentence-ending punctuation followed by whitespace"""
+    return [sentence.strip() for sentence in _SENTENCE_END.split(text) if sentence.strip()]
+
+
+class ExtractiveCompressor:
+    """Keep only the sentences of retrieved chunks that are closest to the query.
+
+    All sentences and the query are embedded in one ``encode_fn`` call and
+    ranked by cosine similarity. The best sentences are kept up to ``ratio``
+    of the sentence count, or up to ``token_budget`` tokens when given, and
+    put back together in their original order. ``encode_fn`` maps a list of
+    strings to a 2-D array, e.g. ``EmbeddingModel.encode_queries`` or
+    ``OllamaEmbeddings.embed_documents``.
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], Sequence], ratio: float = 0.5,
+                 token_budget: Optional[int] = None,
+                 count_tokens: Optional[Callable[[str], int]] = None,
+                 min_sentences: int = 1):
+        self.encode_fn = encode_fn
+        self.ratio = ratio
+        self.token_budget = token_budget
+        self.count_tokens = count_tokens or (lambda text: len(text.split()))
+        self.min_sentences = min_sentences
+        self.last_stats: Dict[str, int] = {}
+
+    def compress(self, query: str, texts: List[str]) -> Tuple[List[str], Dict[str, int]]:
+        """Compressed version of each text (empty string when nothing is kept)"""
+        sentences = [split_sentences(text) for text in texts]
+        flat = [(i, sentence) for i, group in enumerate(sentences) for sentence in group]
+        if not flat:
+            self.last_stats = {"sentences": 0, "kept": 0, "original_tokens": 0, "compressed_tokens": 0}
+            return list(texts), self.last_stats
+
+        vectors = np.asarray(self.encode_fn([query] + [sentence for _, sentence in flat]), dtype=np.float32)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        similarities = vectors[1:] @ vectors[0]
+
+        costs = [self.count_tokens(sentence) for _, sentence in flat]
+        keep = set()
+        if self.token_budget is not None:
+            used = 0
+            for j in np.argsort(-similarities):
+                if used + costs[j] <= self.token_budget or len(keep) < self.min_sentences:
+                    keep.add(int(j))
+                    used += costs[j]
+        else:
+            limit = max(self.min_sentences, math.ceil(self.ratio * len(flat)))
+            keep.update(int(j) for j in np.argsort(-similarities)[:limit])
+
+        kept: List[List[str]] = [[] for _ in texts]
+        for j, (i, sentence) in enumerate(flat):
+            if j in keep:
+                kept[i].append(sentence)
+        self.last_stats = {
+            "sentences": len(flat),
+            "kept": len(keep),
+            "original_tokens": sum(costs),
+            "compressed_tokens": sum(costs[j] for j in keep),
+        }
+        return [" ".join(group) for group in kept], self.last_stats
+
+    def compress_documents(self, query: str, documents: List[Tuple[str, float]]) -> List[Tuple[str, float]]:
+        """``compress`` for (text, score) lists; documents left empty are dropped"""
+        texts, _ = self.compress(query, [text for text, _ in documents])
+        return [(text, score) for text, (_, score) in zip(texts, documents) if text]
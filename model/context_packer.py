@@ -0,0 +1,71 @@
+from typing import Dict, List, Tuple
+
+from model.context_compressor import split_sentences
+
+
+class ContextPacker:
+    """Fit retrieved chunks into a prompt token budget.
+
+    The budget is the model's context size minus the tokens reserved for
+    generation. Chunks are taken best-first; the first chunk that does not
+    fit whole is cut at a sentence boundary and the rest are dropped.
+    """
+
+    def __init__(self, tokenizer, token_budget: int = 1024, max_new_tokens: int = 50,
+                 document_template: str = "[Document {index}]\n{text}\n"):
+        self.tokenizer = tokenizer
+        self.token_budget = token_budget
+        self.max_new_tokens = max_new_tokens
+        self.document_template = document_template
+
+    def count(self, text: str) -> int:
+        return len(self.tokenizer.encode(text, add_special_tokens=False))
+
+    def _trim(self, text: str, budget: int) -> str:
+        """Longest run of leading sentences of ``text`` within ``budget`` tokens"""
+        kept, used = [], 0
+        for sentence in split_sentences(text):
+            cost = self.count(sentence + " ")
+            if used + cost > budget:
+                break
+            kept.append(sentence)
+            used += cost
+        return " ".join(kept)
+
+    def pack(self, header: str, texts: List[str], question: str) -> Tuple[List[str], Dict[str, int]]:
+        """Formatted document segments that fit next to ``header`` and ``question``.
+
+        ``texts`` must be ordered best-first. Returns (segments, stats) where
+        stats reports the prompt size and how many context tokens were saved.
+        """
+        fixed = self.count(header) + self.count(question)
+        available = self.token_budget - self.max_new_tokens - fixed
+        segments: List[str] = []
+        original = used = trimmed = 0
+        for text in texts:
+            segment = self.document_template.format(index=len(segments) + 1, text=text)
+            cost = self.count(segment)
+            original += cost
+            if cost <= available - used:
+                segments.append(segment)
+                used += cost
+                continue
+            if used < available:
+                label_cost = cost - self.count(text)
+                shortened = self._trim(text, available - used - label_cost)
+                if shortened:
+                    segment = self.document_template.format(index=len(segments) + 1, text=shortened)
+                    segments.append(segment)
+                    used += self.count(segment)
+                    trimmed += 1
+            # Later chunks are lower ranked; once one overflows the rest are dropped
+            available = used
+        return segments, {
+            "prompt_tokens": fixed + used,
+            "context_tokens": used,
+            "original_context_tokens": original,
+            "saved_tokens": original - used,
+            "documents": len(segments),
+            "trimmed": trimmed,
+            "dropped": len(texts) - len(segments),
+        }
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+KEY_LENGTH = 64  # hex sha256
+
+
+class EmbeddingCache:
+    """Disk-backed, content-addressed store of embedding vectors.
+
+    Vectors are appended as raw float32 rows to ``vectors.f32`` and their
+    keys, the sha256 of (model name, chunk text), as one line each to the
+    append-only ``keys.log``: line i names row i. Both files are fsynced per
+    batch, vectors first, so a crash can only leave a partial key line or
+    vector rows without a key; ``_load`` truncates both away.
+    """
+
+    def __init__(self, cache_dir: str, model_name: str):
+        self.model_name = model_name
+        self.directory = os.path.join(cache_dir, model_name.replace("/", "_"))
+        self.vectors_path = os.path.join(self.directory, "vectors.f32")
+        self.keys_path = os.path.join(self.directory, "keys.log")
+        self.meta_path = os.path.join(self.directory, "meta.json")
+        self.dimension = None
+        self.hits = 0
+        self.misses = 0
+        self._rows: Dict[str, int] = {}
+        self._load()
+
+    def _load(self):
+        legacy_path = os.path.join(self.directory, "keys.json")
+        if not os.path.exists(self.meta_path) and os.path.exists(legacy_path):
+            self._convert_legacy(legacy_path)
+        if not os.path.exists(self.meta_path):
+            return
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            self.dimension = json.load(f)["dimension"]
+        keys = []
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path, "rb") as f:
+                # The last element is empty, or a key line cut short by a crash
+                keys = [line.decode("ascii") for line in f.read().split(b"\n")[:-1]]
+        row_bytes = 4 * self.dimension
+        stored_rows = os.path.getsize(self.vectors_path) // row_bytes if os.path.exists(self.vectors_path) else 0
+        keys = keys[:stored_rows]
+        # New rows are appended at len(keys), so the files must end exactly there
+        _truncate(self.keys_path, len(keys) * (KEY_LENGTH + 1))
+        _truncate(self.vectors_path, len(keys) * row_bytes)
+        self._rows = {key: row for row, key in enumerate(keys)}
+
+    def _convert_legacy(self, legacy_path: str):
+        """Move a keys.json cache (rewritten in full on every batch) to the key log"""
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self._write_meta(meta["dimension"])
+        with open(self.keys_path, "w", encoding="ascii") as f:
+            f.write("".join(key + "\n" for key in meta["keys"]))
+        os.remove(legacy_path)
+
+    def _write_meta(self, dimension: int):
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"model_name": self.model_name, "dimension": dimension}, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def _vectors(self) -> np.ndarray:
+        return np.memmap(self.vectors_path, dtype=np.float32, mode="r").reshape(-1, self.dimension)
+
+    def _append(self, keys: List[str], vectors: np.ndarray):
+        os.makedirs(self.directory, exist_ok=True)
+        if self.dimension is None:
+            self.dimension = int(vectors.shape[1])
+            self._write_meta(self.dimension)
+        with open(self.vectors_path, "ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self.keys_path, "a", encoding="ascii") as f:
+            f.write("".join(key + "\n" for key in keys))
+            f.flush()
+            os.fsync(f.fileno())
+        for key in keys:
+            self._rows[key] = len(self._rows)
+
+    def encode(self, texts: Sequence[str], encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Return embeddings for ``texts``, calling ``encode_fn`` only for cache misses."""
+        keys = [self.key(text) for text in texts]
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in self._rows and key not in missing:
+                missing[key] = text
+
+        miss_count = sum(1 for key in keys if key in missing)
+        self.misses += miss_count
+        self.hits += len(keys) - miss_count
+
+        if missing:
+            new_vectors = np.asarray(encode_fn(list(missing.values())), dtype=np.float32)
+            self._append(list(missing.keys()), new_vectors)
+
+        rows = np.fromiter((self._rows[key] for key in keys), dtype=np.int64, count=len(keys))
+        return np.array(self._vectors()[rows], dtype=np.float32)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._rows),
+        }
+
+
+def _truncate(path: str, size: int):
+    if os.path.exists(path) and os.path.getsize(path) > size:
+        os.truncate(path, size)
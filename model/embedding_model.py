@@ -1,11 +1,14 @@
 from sentence_transformers import SentenceTransformer
+from .embedding_cache import EmbeddingCache
 import os
 
 class EmbeddingModel:
-    def __init__(self, model_name):
+    def __init__(self, model_name, vector_cache_dir=None):
         self.model_name = model_name
         self.cache_path = os.path.join("model_cache", model_name.replace("/", "_"))
         self.model = self._load_model()
+        # Vektör önbelleği: aynı metin aynı model ile tekrar encode edilmez
+        self.vector_cache = EmbeddingCache(vector_cache_dir, model_name) if vector_cache_dir else None
 
     def _load_model(self):
         """
@@ -22,6 +25,22 @@ class EmbeddingModel:
 
     def encode(self, texts):
         """
-        Metinleri vektörlere dönüştürür.
+        Metinleri vektörlere dönüştürür. Vektör önbelleği açıksa yalnızca
+        önbellekte bulunmayan metinler modelden geçirilir.
         """
-        return self.model.encode(texts)
\ No newline at end of file
+        if self.vector_cache is None or isinstance(texts, str) or len(texts) == 0:
+            return self.model.encode(texts)
+        return self.vector_cache.encode(list(texts), self.model.encode)
+
+    def encode_queries(self, texts):
+        """
+        Sorguları vektörlere dönüştürür. Sorgular diskteki vektör önbelleğine
+        yazılmaz; tekrar eden sorgular retriever'daki LRU önbellekte tutulur.
+        """
+        return self.model.encode(texts)
+
+    def cache_stats(self):
+        """
+        Vektör önbelleğinin isabet/ıskalama sayılarını döndürür.
+        """
+        return self.vector_cache.stats() if self.vector_cache else {}
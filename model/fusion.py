@@ -0,0 +1,17 @@
+from typing import Dict, List, Sequence, Tuple
+
+
+def reciprocal_rank_fusion(result_lists: Sequence[List[Tuple[str, float]]],
+                           top_k: int,
+                           k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse ranked (text, score) lists with reciprocal rank fusion.
+
+    Only ranks are used, so lists with incomparable scores (L2 distance,
+    cosine similarity, BM25) can be combined. Returns (text, RRF score)
+    pairs, best first.
+    """
+    fused: Dict[str, float] = {}
+    for results in result_lists:
+        for rank, (text, _) in enumerate(results):
+            fused[text] = fused.get(text, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)[:top_k]
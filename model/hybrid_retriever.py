@@ -0,0 +1,64 @@
+from .retriever import Retriever
+from .bm25_index import BM25Index
+from .fusion import reciprocal_rank_fusion
+
+class HybridRetriever(Retriever):
+    def __init__(self, embedding_model, index_type="flat", index_params=None, query_cache_size=1024,
+                 dense_top_k=None, sparse_top_k=10, rrf_k=60):
+        """
+        FAISS (yoğun) ve BM25 (seyrek) aramayı reciprocal rank fusion ile
+        birleştiren retriever. Kısaltmalar, model adları ve arXiv kimlikleri
+        gibi tam terimler BM25 ile yakalanır.
+
+        Args:
+            dense_top_k: FAISS'ten alınacak aday sayısı (None ise top_k).
+            sparse_top_k: BM25'ten alınacak aday sayısı.
+            rrf_k: Reciprocal rank fusion sabiti.
+        """
+        super().__init__(embedding_model, index_type, index_params, query_cache_size)
+        self.dense_top_k = dense_top_k
+        self.sparse_top_k = sparse_top_k
+        self.rrf_k = rrf_k
+        self.bm25 = None  # Belgeler değişince düşürülür, ilk aramada yeniden kurulur
+
+    def reset(self):
+        super().reset()
+        self.bm25 = None
+
+    def add_documents(self, documents):
+        ids = super().add_documents(documents)
+        self.bm25 = None
+        return ids
+
+    def remove_ids(self, ids):
+        super().remove_ids(ids)
+        self.bm25 = None
+
+    def load(self, directory):
+        manifest = super().load(directory)
+        self.bm25 = None
+        return manifest
+
+    def _sparse_index(self):
+        if self.bm25 is None:
+            self.bm25 = BM25Index()
+            self.bm25.build(self.documents)
+        return self.bm25
+
+    def retrieve_batch(self, queries, top_k=2):
+        """
+        Her sorgu için yoğun ve seyrek sonuçları birleştirir.
+
+        Returns:
+            list: Her sorgu için (belge, RRF skoru) tuple'larından oluşan liste;
+            skor büyükse belge daha ilgilidir.
+        """
+        if not queries:
+            return []
+        dense = super().retrieve_batch(queries, self.dense_top_k or top_k)
+        bm25 = self._sparse_index()
+        results = []
+        for query, dense_results in zip(queries, dense):
+            sparse_results = [(self.documents[i], score) for i, score in bm25.search(query, self.sparse_top_k)]
+            results.append(reciprocal_rank_fusion([dense_results, sparse_results], top_k, self.rrf_k))
+        return results
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from model.query_cache import normalize_query
+
+
+class HypotheticalDocumentCache:
+    """Persistent (SQLite) cache of HyDE hypothetical documents and their embeddings.
+
+    Entries are keyed by (normalized query, language model, prompt template,
+    chunk size); the least recently used rows are evicted beyond ``max_entries``.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS hyde_cache ("
+            " key TEXT PRIMARY KEY, document TEXT NOT NULL, embedding BLOB NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS hyde_cache_access ON hyde_cache (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(query: str, language_model: str, prompt_template: str, chunk_size: int,
+                 max_new_tokens: Optional[int] = None, num_hypotheses: int = 1) -> str:
+        parts = [normalize_query(query), language_model, prompt_template, chunk_size]
+        if max_new_tokens is not None:
+            # Token-budgeted (shorter) documents are cached separately
+            parts.append(max_new_tokens)
+        if num_hypotheses > 1:
+            # Averaged multi-hypothesis embeddings differ from single-document ones
+            parts.append(["hypotheses", num_hypotheses])
+        payload = json.dumps(parts)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, np.ndarray]]:
+        """Return (hypothetical document, normalized embedding) or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT document, embedding FROM hyde_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE hyde_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+        return row[0], np.frombuffer(row[1], dtype=np.float32).copy()
+
+    def put(self, key: str, document: str, embedding: np.ndarray):
+        blob = np.ascontiguousarray(embedding, dtype=np.float32).tobytes()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO hyde_cache (key, document, embedding, last_access) VALUES (?, ?, ?, ?)",
+                (key, document, blob, time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM hyde_cache WHERE key IN ("
+                " SELECT key FROM hyde_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM hyde_cache").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": size,
+        }
@@ -3,9 +3,18 @@ import numpy as np
 from langchain.prompts import PromptTemplate
 from model.language_model import LanguageModel
 from model.embedding_model import EmbeddingModel
+from model import index_store
+from model import ann_index
+from model.incremental_index import open_index
+from model.ingest_pipeline import stream_index
+from model.query_cache import QueryEmbeddingCache
+from model.hyde_cache import HypotheticalDocumentCache
 from data_loader.pdf_loader import PDFLoader
-from typing import List, Tuple
+from model.fusion import reciprocal_rank_fusion
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 import os
+import time
 
 class HyDERetriever:
     def __init__(self, 
@@ -13,16 +22,61 @@ class HyDERetriever:
                  chunk_size: int = 512,
                  chunk_overlap: int = 128,
                  language_model_name: str = "gpt2-medium",
-                 embedding_model_name: str = "sentence-transformers/all-mpnet-base-v2"):
+                 embedding_model_name: str = "sentence-transformers/all-mpnet-base-v2",
+                 index_dir: Optional[str] = None,
+                 pdf_workers: int = 1,
+                 ingest_batch_size: int = 256,
+                 text_cache_dir: Optional[str] = None,
+                 query_cache_size: int = 1024,
+                 hyde_cache_path: Optional[str] = None,
+                 hyde_cache_size: int = 10000,
+                 time_budget: Optional[float] = None,
+                 token_budget: Optional[int] = None,
+                 num_hypotheses: int = 1,
+                 index_type: str = "flat",
+                 index_params: Optional[dict] = None,
+                 embedding_cache_dir: Optional[str] = None,
+                 deadline_grace: float = 0.25):
         
         # Model initialization with configurable parameters
         self.llm = LanguageModel(language_model_name)
-        self.embeddings = EmbeddingModel(embedding_model_name)
+        self.embeddings = EmbeddingModel(embedding_model_name, embedding_cache_dir)
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.pdf_workers = pdf_workers
+        self.ingest_batch_size = ingest_batch_size
+        self.text_cache_dir = text_cache_dir
+        self.query_cache = QueryEmbeddingCache(query_cache_size)
+        self.index_version = 0  # Bumped on every index change; invalidates cached answers
+        # Persistent cache of generated hypothetical documents and their embeddings
+        self.hyde_cache = HypotheticalDocumentCache(hyde_cache_path, hyde_cache_size) if hyde_cache_path else None
+        # With a time budget, retrieve() runs HyDE against a deadline with a direct-query fallback
+        self.time_budget = time_budget
+        self.token_budget = token_budget
+        # Extra seconds past time_budget for encoding the hypothetical document once generation stops
+        self.deadline_grace = deadline_grace
+        self._executor = None
+        # Several sampled hypothetical documents are generated in one call and their embeddings averaged
+        self.num_hypotheses = max(1, num_hypotheses)
+        # Index type as in Retriever; "sq8"/"binary" keep float vectors for rescoring
+        self.index_type = index_type
+        self.index_params = index_params or {}
+        self.vectors = None
+        self.dangling = 0  # Removed chunks still in an index that cannot remove entries (HNSW)
         
-        # Document processing and indexing
-        self.index, self.chunks = self._encode_pdfs(files_path)
+        # Document processing and indexing; with an index_dir only new or changed PDFs are embedded
+        if index_dir:
+            if not os.path.exists(files_path):
+                raise FileNotFoundError(f"PDF directory not found: {files_path}")
+            extra_settings = None
+            if index_type != "flat":
+                extra_settings = {"index_type": index_type}
+                if self.rescore_factor():
+                    extra_settings["rescore_factor"] = self.rescore_factor()
+            open_index(self, PDFLoader(files_path, pdf_workers, text_cache_dir=text_cache_dir), index_dir,
+                       embedding_model_name, chunk_size, chunk_overlap, ingest_batch_size, extra_settings)
+        else:
+            self.index, self.chunks = self._encode_pdfs(files_path)
         
         # Enhanced HyDE prompt template
         self.hyde_prompt = PromptTemplate(
@@ -40,48 +94,289 @@ class HyDERetriever:
         if not os.path.exists(files_path):
             raise FileNotFoundError(f"PDF directory not found: {files_path}")
             
-        pdf_loader = PDFLoader(files_path)
-        documents = pdf_loader.load_pdfs()
+        pdf_loader = PDFLoader(files_path, self.pdf_workers, text_cache_dir=self.text_cache_dir)
         
-        # Improved chunking with overlap
-        chunks = pdf_loader.chunk_text(documents, self.chunk_size, self.chunk_overlap)
+        # Streamed chunking and batched embedding keep memory bounded
+        self.reset()
+        stream_index(self, pdf_loader, pdf_loader.pdf_files(), self.chunk_size, self.chunk_overlap,
+                     self.ingest_batch_size)
+        self.optimize_index()
         
-        # Enhanced embedding processing
-        embeddings = self.embeddings.encode(chunks)
-        dimension = embeddings.shape[1]
-        
-        # FAISS index configuration
-        index = faiss.IndexFlatIP(dimension)  # Using inner product for similarity
-        faiss.normalize_L2(embeddings)  # Normalize for cosine similarity
-        index.add(embeddings.astype(np.float32))
-        
-        return index, chunks
+        return self.index, self.chunks
+
+    def reset(self):
+        """Drop the current index and chunk store"""
+        self.index = None
+        self.chunks = []
+        self.vectors = None
+        self.dangling = 0
+        self.index_version += 1
+
+    def rescore_factor(self) -> int:
+        """How many times top_k candidates are rescored with float vectors (0 = off)"""
+        if self.index_type not in ann_index.QUANTIZED_TYPES:
+            return 0
+        return {**ann_index.DEFAULT_INDEX_PARAMS, **self.index_params}["rescore_factor"] or 0
+
+    def optimize_index(self):
+        """Convert the flat index built during ingestion to the configured index type"""
+        if self.index is None or self.index.ntotal == 0:
+            return
+        if ann_index.index_type_of(self.index) != "flat":
+            ann_index.set_search_params(self.index, self.index_params)
+            return
+        target = ann_index.resolve_index_type(self.index_type, self.index.ntotal, self.index_params)
+        if target == "flat":
+            return
+        self.index = ann_index.rebuild_index(self.index, target, self.index_params, faiss.METRIC_INNER_PRODUCT)
+        self.index_version += 1
+
+    def add_documents(self, chunks: List[str]) -> List[int]:
+        """Embed and append chunks, returning their stable IDs (positions in self.chunks)"""
+        if not chunks:
+            return []
+        embeddings = self.embeddings.encode(chunks).astype(np.float32)
+        faiss.normalize_L2(embeddings)
+        if self.index is None:
+            self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(embeddings.shape[1]))
+        ids = np.arange(len(self.chunks), len(self.chunks) + len(chunks), dtype=np.int64)
+        self.index.add_with_ids(embeddings, ids)
+        if self.rescore_factor():
+            # Row number == chunk ID; never start a vector file behind an index that has none
+            if self.vectors is None and not self.chunks:
+                self.vectors = index_store.FloatVectors(embeddings.shape[1])
+            if self.vectors is not None:
+                self.vectors.append(embeddings)
+        self.chunks.extend(chunks)
+        self.index_version += 1
+        return ids.tolist()
+
+    def remove_ids(self, ids: List[int]):
+        """Remove chunks by ID without rebuilding the index.
+
+        As in Retriever, indexes that cannot remove entries (HNSW) only drop
+        the chunk text; such dangling vectors are filtered out of results and
+        the index is rebuilt from live chunks beyond ``max_dangling``.
+        """
+        try:
+            self.index.remove_ids(np.asarray(ids, dtype=np.int64))
+        except RuntimeError:
+            self.dangling += len(ids)
+        for i in ids:
+            self.chunks[i] = None
+        params = {**ann_index.DEFAULT_INDEX_PARAMS, **self.index_params}
+        if self.dangling > params["max_dangling"] * self.index.ntotal:
+            live = np.array([i for i, chunk in enumerate(self.chunks) if chunk is not None], dtype=np.int64)
+            self.index = ann_index.compact_index(self.index, live, self.index_params)
+            self.dangling = 0
+        self.index_version += 1
+
+    def compact_ids(self) -> Optional[np.ndarray]:
+        """Renumber chunk IDs once removed chunks exceed ``max_tombstones`` of the ID space.
+
+        As in Retriever; returns the old -> new ID mapping (-1 for removed
+        chunks) or None when nothing was compacted.
+        """
+        removed = sum(chunk is None for chunk in self.chunks)
+        params = {**ann_index.DEFAULT_INDEX_PARAMS, **self.index_params}
+        if not removed or removed <= params["max_tombstones"] * len(self.chunks):
+            return None
+        self.index, self.chunks, self.vectors, mapping = index_store.compact_tombstones(
+            self.index, self.chunks, self.vectors, self.index_params
+        )
+        self.dangling = 0
+        self.index_version += 1
+        return mapping
 
-    def generate_hypothetical_document(self, query: str) -> str:
+    def save(self, directory: str, manifest: dict):
+        """Persist the FAISS index, chunk texts and manifest to a directory"""
+        index_store.save_snapshot(directory, self.index, self.chunks, manifest, self.vectors)
+
+    def load(self, directory: str) -> dict:
+        """Memory-map a previously saved index and restore its chunks"""
+        self.index, self.chunks, manifest = index_store.load_snapshot(directory)
+        ann_index.set_search_params(self.index, self.index_params)
+        self.vectors = index_store.load_vectors(directory, self.index.d) if self.rescore_factor() else None
+        self.dangling = self.index.ntotal - sum(chunk is not None for chunk in self.chunks)
+        self.index_version += 1
+        return manifest
+
+    def generate_hypothetical_document(self, query: str,
+                                       max_new_tokens: Optional[int] = None,
+                                       max_time: Optional[float] = None) -> str:
         """Generate hypothetical document with error handling"""
         try:
             input_variables = {"query": query, "chunk_size": self.chunk_size}
             prompt = self.hyde_prompt.format(**input_variables)
-            return self.llm.generate(prompt, max_new_tokens=self.chunk_size)
+            return self.llm.generate(prompt, max_new_tokens=max_new_tokens or self.chunk_size, max_time=max_time)
         except Exception as e:
             raise RuntimeError(f"Hypothetical document generation failed: {str(e)}")
 
-    def retrieve(self, query: str, k: int = 3) -> Tuple[List[Tuple[str, float]], str]:
-        """Enhanced retrieval with similarity scoring"""
-        hypothetical_doc = self.generate_hypothetical_document(query)
-        hypothetical_embedding = self.embeddings.encode([hypothetical_doc])
-        faiss.normalize_L2(hypothetical_embedding)
-        
-        # Perform similarity search
-        scores, indices = self.index.search(hypothetical_embedding.astype(np.float32), k)
+    def generate_hypothetical_documents(self, query: str, num_hypotheses: int,
+                                        max_new_tokens: Optional[int] = None,
+                                        max_time: Optional[float] = None) -> List[str]:
+        """Generate several sampled hypothetical documents in one batched generate call"""
+        if num_hypotheses == 1:
+            return [self.generate_hypothetical_document(query, max_new_tokens, max_time)]
+        try:
+            input_variables = {"query": query, "chunk_size": self.chunk_size}
+            prompt = self.hyde_prompt.format(**input_variables)
+            return self.llm.generate_many(prompt, num_hypotheses,
+                                          max_new_tokens=max_new_tokens or self.chunk_size, max_time=max_time)
+        except Exception as e:
+            raise RuntimeError(f"Hypothetical document generation failed: {str(e)}")
+
+    def _generate_many_queries(self, queries: List[str],
+                               max_new_tokens: Optional[int] = None,
+                               max_time: Optional[float] = None) -> List[List[str]]:
+        """Hypothetical documents for several queries, one list of ``num_hypotheses`` per query.
+
+        Single hypotheses are generated for all queries together with
+        LanguageModel.generate_batch; several sampled hypotheses use one
+        generate_many call per query.
+        """
+        prompts = [self.hyde_prompt.format(query=query, chunk_size=self.chunk_size) for query in queries]
+        tokens = max_new_tokens or self.chunk_size
+        try:
+            if self.num_hypotheses == 1:
+                return [[doc] for doc in self.llm.generate_batch(prompts, max_new_tokens=tokens, max_time=max_time)]
+            return [self.llm.generate_many(prompt, self.num_hypotheses, max_new_tokens=tokens, max_time=max_time)
+                    for prompt in prompts]
+        except Exception as e:
+            raise RuntimeError(f"Hypothetical document generation failed: {str(e)}")
+
+    def _hyde_cache_keys(self, queries: List[str], max_new_tokens: Optional[int] = None) -> List[Optional[str]]:
+        if not self.hyde_cache:
+            return [None] * len(queries)
+        return [
+            HypotheticalDocumentCache.make_key(
+                query, self.llm.model_name, self.hyde_prompt.template, self.chunk_size,
+                max_new_tokens, self.num_hypotheses
+            )
+            for query in queries
+        ]
+
+    def _hypothetical_embeddings(self, queries: List[str],
+                                 max_new_tokens: Optional[int] = None,
+                                 max_time: Optional[float] = None) -> Tuple[List[str], np.ndarray]:
+        """Hypothetical documents and normalized embeddings for the queries.
+
+        Cached queries skip both generation and encoding; the rest are
+        generated, encoded in one call and written back to the cache.
+        With ``num_hypotheses`` > 1 each query's embedding is the normalized
+        mean of its hypotheses and the returned document joins them.
+        Documents cut short by ``max_time`` are not cached.
+        """
+        keys = self._hyde_cache_keys(queries, max_new_tokens)
+        docs: List[Optional[str]] = [None] * len(queries)
+        embeddings: List[Optional[np.ndarray]] = [None] * len(queries)
+        missing = []
+        for i, key in enumerate(keys):
+            cached = self.hyde_cache.get(key) if key else None
+            if cached is None:
+                missing.append(i)
+            else:
+                docs[i], embeddings[i] = cached
+
+        if missing:
+            started = time.perf_counter()
+            hypotheses = self._generate_many_queries([queries[i] for i in missing], max_new_tokens, max_time)
+            # Conservative: when the whole call took longer than max_time some documents may be cut short
+            complete = max_time is None or time.perf_counter() - started < max_time
+
+            # All hypotheses of all queries go through the embedding model in one call.
+            # Generated documents rarely repeat, so they bypass the query LRU.
+            flat = [doc for group in hypotheses for doc in group]
+            flat_embeddings = np.array(self.embeddings.encode_queries(flat), dtype=np.float32)
+            faiss.normalize_L2(flat_embeddings)
+
+            offset = 0
+            for i, group in zip(missing, hypotheses):
+                embedding = flat_embeddings[offset:offset + len(group)].mean(axis=0, keepdims=True)
+                offset += len(group)
+                faiss.normalize_L2(embedding)
+                doc, embedding = "\n\n".join(group), embedding[0]
+                docs[i], embeddings[i] = doc, embedding
+                if keys[i] and complete:
+                    self.hyde_cache.put(keys[i], doc, embedding)
+        return docs, np.stack(embeddings)
+
+    def _search(self, embeddings: np.ndarray, k: int) -> List[List[Tuple[str, float]]]:
+        """Search normalized embeddings in one FAISS call, one result list per row"""
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        faiss.normalize_L2(embeddings)
+        # Over-fetch so that k results remain after dropping removed (dangling) chunks
+        fetch = k + self.dangling
+        rescore_factor = self.rescore_factor() if self.vectors is not None else 0
+        if rescore_factor:
+            # Over-fetch from the quantized index and rank by exact inner product
+            _, candidates = self.index.search(embeddings, k * rescore_factor + self.dangling)
+            scores, indices = ann_index.rescore(embeddings, candidates, self.vectors.get, fetch,
+                                                faiss.METRIC_INNER_PRODUCT)
+        else:
+            scores, indices = self.index.search(embeddings, fetch)
         
         # Convert to cosine similarity scores
         cosine_similarities = (scores + 1) / 2  # Convert from [-1, 1] to [0, 1]
         
-        similar_docs = [
-            (self.chunks[i], float(cosine_similarities[0][j]))
-            for j, i in enumerate(indices[0])
+        return [
+            [(self.chunks[i], float(cosine_similarities[row][j]))
+             for j, i in enumerate(indices[row]) if i >= 0 and self.chunks[i] is not None][:k]
+            for row in range(len(indices))
         ]
+
+    def retrieve(self, query: str, k: int = 3) -> Tuple[List[Tuple[str, float]], str]:
+        """Enhanced retrieval with similarity scoring"""
+        if self.time_budget is not None:
+            return self.retrieve_with_deadline(query, k, self.time_budget, self.token_budget)
+        return self.retrieve_batch([query], k)[0]
+
+    def retrieve_with_deadline(self, query: str, k: int = 3,
+                               time_budget: float = 2.0,
+                               token_budget: Optional[int] = None) -> Tuple[List[Tuple[str, float]], str]:
+        """Latency-bounded HyDE retrieval.
+
+        Hypothetical-document generation (capped at ``token_budget`` tokens and
+        ``time_budget`` seconds) runs in a worker thread while the plain query
+        embedding is searched. If the HyDE side misses the deadline or fails the
+        direct results are returned with an empty hypothetical document;
+        otherwise the two rankings are fused with reciprocal rank fusion.
+        """
+        started = time.perf_counter()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hyde")
+        hyde_future = self._executor.submit(self._hypothetical_embeddings, [query], token_budget, time_budget)
+
+        query_embedding = self.query_cache.encode([query], self.embeddings.encode_queries)
+        direct_results = self._search(query_embedding, k)[0]
+
+        try:
+            remaining = time_budget - (time.perf_counter() - started)
+            # Generation itself stops at time_budget; the grace covers encoding the result
+            hypothetical_docs, hypothetical_embeddings = hyde_future.result(
+                timeout=max(0.0, remaining) + self.deadline_grace
+            )
+        except Exception:
+            # A missed deadline (futures TimeoutError) or a failed generation
+            # degrades to plain dense retrieval
+            return direct_results, ""
+
+        hyde_results = self._search(hypothetical_embeddings, k)[0]
+        # Rank by RRF but keep the cosine similarity as the reported score
+        similarities = dict(direct_results)
+        for text, score in hyde_results:
+            similarities[text] = max(score, similarities.get(text, score))
+        fused = reciprocal_rank_fusion([hyde_results, direct_results], k)
+        return [(text, similarities[text]) for text, _ in fused], hypothetical_docs[0]
+
+    def retrieve_batch(self, queries: List[str], k: int = 3) -> List[Tuple[List[Tuple[str, float]], str]]:
+        """Retrieve for several queries: hypothetical documents are generated
+        in batched generate calls, encoded in one model call and searched in
+        one FAISS call"""
+        if not queries:
+            return []
+        hypothetical_docs, hypothetical_embeddings = self._hypothetical_embeddings(queries)
         
-        return similar_docs, hypothetical_doc
-    
+        # Perform similarity search
+        results = self._search(hypothetical_embeddings, k)
+        return list(zip(results, hypothetical_docs))
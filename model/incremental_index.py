@@ -0,0 +1,110 @@
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from data_loader.corpus_manifest import diff_files
+from data_loader.pdf_loader import PDFLoader
+from model import index_store
+from model.ingest_pipeline import stream_index
+
+
+def sync_index(owner,
+               pdf_loader: PDFLoader,
+               previous_files: Dict[str, dict],
+               current_files: Dict[str, dict],
+               chunk_size: int,
+               chunk_overlap: int,
+               batch_size: int = 256) -> Tuple[Dict[str, dict], dict]:
+    """Bring ``owner``'s index in line with ``current_files``.
+
+    ``owner`` is any retriever exposing ``add_documents`` and ``remove_ids``.
+    Chunks of changed and deleted files are removed by ID, then only added
+    and changed files are streamed through extraction, chunking and batched
+    embedding (see ``stream_index``). Owners with ``compact_ids`` then drop
+    accumulated removed IDs and the files' chunk IDs are renumbered to match.
+    Returns the new per-file state (including chunk IDs) and a summary of
+    the work done.
+    """
+    added, changed, removed = diff_files(previous_files, current_files)
+    # The manifest scan already hashed every file; the text cache reuses those digests
+    pdf_loader.set_content_hashes({name: state["sha256"] for name, state in current_files.items()})
+
+    stale_ids = [chunk_id
+                 for name in changed + removed
+                 for chunk_id in previous_files[name].get("chunk_ids", [])]
+    if stale_ids:
+        owner.remove_ids(stale_ids)
+
+    to_extract = [name for name in current_files if name in added or name in changed]
+    new_ids, failed, ingest_stats = stream_index(
+        owner, pdf_loader, to_extract, chunk_size, chunk_overlap, batch_size
+    )
+
+    files = {}
+    for name, state in current_files.items():
+        if name in new_ids:
+            files[name] = dict(state, chunk_ids=new_ids[name])
+        elif name not in failed:
+            files[name] = dict(state, chunk_ids=previous_files[name]["chunk_ids"])
+        # Failed or timed-out files stay out of the manifest so the next run retries them
+
+    compact = getattr(owner, "compact_ids", None)
+    mapping = compact() if compact is not None else None
+    if mapping is not None:
+        for state in files.values():
+            state["chunk_ids"] = mapping[np.asarray(state["chunk_ids"], dtype=np.int64)].tolist()
+
+    stats = {
+        "added": len(added),
+        "changed": len(changed),
+        "removed": len(removed),
+        "failed": len(failed),
+        "new_chunks": ingest_stats["chunks"],
+        "chunks_per_sec": ingest_stats["chunks_per_sec"],
+        "removed_chunks": len(stale_ids),
+        "compacted": mapping is not None,
+    }
+    return files, stats
+
+
+def _can_update(stored: Optional[dict], manifest: dict, index_dir: str) -> bool:
+    if not index_store.settings_match(stored, manifest) or not index_store.snapshot_exists(index_dir):
+        return False
+    return all(isinstance(state, dict) and "chunk_ids" in state for state in stored["files"].values())
+
+
+def open_index(owner,
+               pdf_loader: PDFLoader,
+               index_dir: str,
+               embedding_model_name: str,
+               chunk_size: int,
+               chunk_overlap: int,
+               batch_size: int = 256,
+               extra_settings: Optional[dict] = None) -> dict:
+    """Load ``owner``'s snapshot from ``index_dir`` and apply only the corpus changes.
+
+    Falls back to a build from scratch when there is no compatible snapshot
+    (first run, or different model, chunking or ``extra_settings``).
+    """
+    stored = index_store.read_manifest(index_dir)
+    manifest = index_store.build_manifest(
+        embedding_model_name, chunk_size, chunk_overlap, pdf_loader.pdf_directory,
+        stored["files"] if stored else None, extra_settings
+    )
+    previous_files = stored["files"] if _can_update(stored, manifest, index_dir) else {}
+
+    if previous_files:
+        owner.load(index_dir)
+    else:
+        owner.reset()
+
+    manifest["files"], stats = sync_index(
+        owner, pdf_loader, previous_files, manifest["files"], chunk_size, chunk_overlap, batch_size
+    )
+    if not previous_files or manifest["files"] != previous_files:
+        # Retrievers with approximate indexes train them once the corpus size is known
+        optimize = getattr(owner, "optimize_index", None)
+        if optimize is not None:
+            optimize()
+        owner.save(index_dir, manifest)
+    return stats
@@ -0,0 +1,199 @@
+import json
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+from data_loader.corpus_manifest import scan_files
+from . import ann_index
+
+INDEX_FILE = "index.faiss"
+CHUNKS_FILE = "chunks.json"
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.f32"
+# FAISS file tags of the IVF ("Iw..") and HNSW ("IH..") families. Only flat
+# and quantized indexes still accept add_with_ids/remove_ids when memory-mapped;
+# IVF inverted lists become read-only OnDiskInvertedLists when mapped
+_UNMAPPED_FOURCCS = (b"Iw", b"IH")
+
+
+def build_manifest(embedding_model_name: str,
+                   chunk_size: int,
+                   chunk_overlap: int,
+                   pdf_directory: str,
+                   previous_files: Optional[Dict[str, dict]] = None,
+                   extra_settings: Optional[dict] = None) -> dict:
+    """Describe everything an index snapshot depends on"""
+    return {
+        "embedding_model": embedding_model_name,
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        **(extra_settings or {}),
+        "files": scan_files(pdf_directory, previous_files),
+    }
+
+
+def read_manifest(directory: str) -> Optional[dict]:
+    path = os.path.join(directory, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def settings_match(stored: Optional[dict], manifest: dict) -> bool:
+    """True if ``stored`` was built with the same settings (everything but the file list)"""
+    return stored is not None and all(stored.get(key) == value for key, value in manifest.items() if key != "files")
+
+
+def _file_hashes(files: Dict[str, dict]) -> Dict[str, str]:
+    return {name: state.get("sha256") if isinstance(state, dict) else state for name, state in files.items()}
+
+
+def manifest_matches(directory: str, manifest: dict) -> bool:
+    """True if a complete snapshot built from the same inputs exists in ``directory``"""
+    stored = read_manifest(directory)
+    if not settings_match(stored, manifest) or not snapshot_exists(directory):
+        return False
+    return _file_hashes(stored["files"]) == _file_hashes(manifest["files"])
+
+
+def snapshot_exists(directory: str) -> bool:
+    return all(os.path.exists(os.path.join(directory, name))
+               for name in (INDEX_FILE, CHUNKS_FILE, MANIFEST_FILE))
+
+
+def _replace_file(path: str, write):
+    # Write next to the target and swap it in, so a memory-mapped index that
+    # is still open keeps reading the old file instead of a truncated one.
+    tmp_path = path + ".tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _write_json(data):
+    def write(path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+    return write
+
+
+def save_snapshot(directory: str, index: faiss.Index, chunks: List[Optional[str]], manifest: dict,
+                  vectors: Optional["FloatVectors"] = None):
+    """Write index, chunk texts, optional float vectors and manifest; the manifest goes last so it marks a complete snapshot"""
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    _replace_file(os.path.join(directory, INDEX_FILE), lambda path: faiss.write_index(index, path))
+    _replace_file(os.path.join(directory, CHUNKS_FILE), _write_json(chunks))
+    if vectors is not None:
+        vectors.save(os.path.join(directory, VECTORS_FILE))
+    _replace_file(manifest_path, _write_json(manifest))
+
+
+def _stored_fourcc(path: str) -> bytes:
+    """File tag of the index inside a saved IndexIDMap, read from the header without loading the index"""
+    with open(path, "rb") as f:
+        header = f.read(45)
+    if header[:4] not in (b"IxMp", b"IxM2"):
+        return header[:4]
+    # fourcc, d, ntotal, two unused int64s and is_trained, then the metric
+    # type, which is followed by a float argument for metrics other than L2/IP
+    metric_type = struct.unpack_from("<i", header, 33)[0]
+    offset = 41 if metric_type > faiss.METRIC_L2 else 37
+    return header[offset:offset + 4]
+
+
+def load_snapshot(directory: str) -> Tuple[faiss.Index, List[Optional[str]], dict]:
+    """Load a snapshot, memory-mapping flat and quantized FAISS indexes instead of reading them into RAM"""
+    path = os.path.join(directory, INDEX_FILE)
+    if _stored_fourcc(path).startswith(_UNMAPPED_FOURCCS):
+        # IVF and HNSW are read into RAM so incremental syncs can still add and remove chunks
+        index = faiss.read_index(path)
+    else:
+        index = faiss.read_index(path, faiss.IO_FLAG_MMAP)
+    with open(os.path.join(directory, CHUNKS_FILE), "r", encoding="utf-8") as f:
+        chunks = json.load(f)
+    return index, chunks, read_manifest(directory)
+
+
+def compact_tombstones(index: faiss.Index, chunks: List[Optional[str]], vectors: Optional["FloatVectors"],
+                       params: Optional[dict] = None):
+    """Drop removed (None) chunks and renumber the rest 0..n-1, keeping their order.
+
+    Removed vectors still held by an index that cannot remove entries (HNSW)
+    are dropped by rebuilding it; otherwise only the ID map is rewritten.
+    Returns (index, chunks, vectors, mapping) where ``mapping[old_id]`` is the
+    new id, or -1 for a removed chunk.
+    """
+    live = np.array([i for i, chunk in enumerate(chunks) if chunk is not None], dtype=np.int64)
+    if index.ntotal > len(live):
+        index = ann_index.compact_index(index, live, params)
+    mapping = np.full(len(chunks), -1, dtype=np.int64)
+    mapping[live] = np.arange(len(live))
+    ann_index.renumber_ids(index, mapping)
+    if vectors is not None:
+        compacted = FloatVectors(vectors.dimension)
+        if len(live):
+            compacted.append(vectors.get(live))
+        vectors = compacted
+    return index, [chunks[i] for i in live], vectors, mapping
+
+
+def load_vectors(directory: str, dimension: int) -> Optional["FloatVectors"]:
+    """Memory-map the float vectors saved next to a quantized index, if any"""
+    path = os.path.join(directory, VECTORS_FILE)
+    if not os.path.exists(path):
+        return None
+    vectors = FloatVectors(dimension)
+    vectors.load(path)
+    return vectors
+
+
+class FloatVectors:
+    """Full-precision vectors by id (row), kept for rescoring quantized search results.
+
+    Rows saved to disk are memory-mapped read-only; rows added since are held
+    in memory until the next ``save``.
+    """
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+        self.mapped = np.zeros((0, dimension), dtype=np.float32)
+        self.pending: List[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return len(self.mapped) + sum(len(part) for part in self.pending)
+
+    def append(self, vectors: np.ndarray):
+        self.pending.append(np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, self.dimension))
+
+    def get(self, ids: np.ndarray) -> np.ndarray:
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(self.pending) > 1:
+            self.pending = [np.concatenate(self.pending)]
+        vectors = np.empty((len(ids), self.dimension), dtype=np.float32)
+        on_disk = ids < len(self.mapped)
+        vectors[on_disk] = self.mapped[ids[on_disk]]
+        if not on_disk.all():
+            vectors[~on_disk] = self.pending[0][ids[~on_disk] - len(self.mapped)]
+        return vectors
+
+    def save(self, path: str):
+        def write(tmp_path):
+            with open(tmp_path, "wb") as f:
+                for start in range(0, len(self.mapped), 65536):
+                    f.write(np.ascontiguousarray(self.mapped[start:start + 65536]).tobytes())
+                for part in self.pending:
+                    f.write(part.tobytes())
+        _replace_file(path, write)
+        self.load(path)
+
+    def load(self, path: str):
+        size = os.path.getsize(path) // (4 * self.dimension)
+        self.mapped = (np.memmap(path, dtype=np.float32, mode="r", shape=(size, self.dimension))
+                       if size else np.zeros((0, self.dimension), dtype=np.float32))
+        self.pending = []
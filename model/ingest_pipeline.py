@@ -0,0 +1,63 @@
+import logging
+import time
+from typing import Dict, List, Tuple
+
+from tqdm import tqdm
+
+from data_loader.pdf_loader import PDFLoader
+
+logger = logging.getLogger(__name__)
+
+
+def stream_index(owner,
+                 pdf_loader: PDFLoader,
+                 filenames: List[str],
+                 chunk_size: int,
+                 chunk_overlap: int,
+                 batch_size: int = 256) -> Tuple[Dict[str, List[int]], List[str], dict]:
+    """Stream pages -> chunks -> fixed-size embedding batches -> ``owner.add_documents``.
+
+    Only one batch of chunks (plus the current chunk window) is held at a
+    time, so peak memory does not grow with the corpus. Returns the chunk IDs
+    added per file, the files that failed, and throughput stats.
+    """
+    chunk_ids: Dict[str, List[int]] = {name: [] for name in filenames}
+    failed: List[str] = []
+    pending: List[Tuple[str, str]] = []
+    started = time.perf_counter()
+    progress = tqdm(total=None, unit="chunk", desc="Indexing", disable=not filenames)
+
+    def flush():
+        ids = owner.add_documents([chunk for _, chunk in pending])
+        for (name, _), chunk_id in zip(pending, ids):
+            chunk_ids[name].append(chunk_id)
+        progress.update(len(pending))
+        pending.clear()
+
+    for filename, pages in pdf_loader.iter_documents(filenames):
+        if pages is None:
+            failed.append(filename)
+            continue
+        try:
+            for chunk in pdf_loader.iter_chunks(pages, chunk_size, chunk_overlap):
+                pending.append((filename, chunk))
+                if len(pending) >= batch_size:
+                    flush()
+        except Exception as e:
+            logger.error(f"Error processing {filename}: {str(e)}")
+            failed.append(filename)
+            pending[:] = [(name, chunk) for name, chunk in pending if name != filename]
+    if pending:
+        flush()
+    progress.close()
+
+    # Drop whatever a failed file managed to add before it broke
+    stale_ids = [chunk_id for name in failed for chunk_id in chunk_ids.pop(name)]
+    if stale_ids:
+        owner.remove_ids(stale_ids)
+
+    elapsed = time.perf_counter() - started
+    total = sum(len(ids) for ids in chunk_ids.values())
+    stats = {"chunks": total, "seconds": elapsed, "chunks_per_sec": total / elapsed if elapsed > 0 else 0.0}
+    logger.info(f"Indexed {total} chunks in {elapsed:.1f}s ({stats['chunks_per_sec']:.1f} chunks/s)")
+    return chunk_ids, failed, stats
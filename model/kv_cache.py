@@ -0,0 +1,106 @@
+import copy
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+
+
+def cache_nbytes(past_key_values) -> int:
+    """Memory held by a ``past_key_values`` object (DynamicCache or legacy tuples)"""
+    layers = getattr(past_key_values, "layers", None)
+    if layers is not None:
+        tensors = [t for layer in layers for t in (layer.keys, layer.values) if t is not None]
+    else:
+        tensors = [t for layer in past_key_values for t in layer]
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+def share_cache(past_key_values):
+    """A new cache object over the same key/value tensors.
+
+    DynamicCache layers grow by ``torch.cat``, which allocates new tensors,
+    so extending the returned cache never modifies the shared ones. Legacy
+    tuples are immutable and returned as they are.
+    """
+    layers = getattr(past_key_values, "layers", None)
+    if layers is None:
+        return past_key_values
+    shared = copy.copy(past_key_values)
+    shared.layers = [copy.copy(layer) for layer in layers]
+    return shared
+
+
+class PrefixKVCache:
+    """LRU of attention KV states for prompt prefixes, bounded by ``max_bytes``.
+
+    Prompts are built from segments (static instruction header, then one
+    segment per retrieved chunk, then the question). KV states are stored
+    for token prefixes that end on segment boundaries. A chunk's KV state
+    depends on everything before it, so only exact prefixes can be shared.
+    Entries hold references to the KV tensors instead of deep copies, so
+    storing and looking up a prefix costs no tensor copy. Entries put with ``pinned=True`` (the shared header) are not evicted by
+    the byte LRU; beyond ``max_pinned`` the oldest pinned entry becomes a
+    normal one.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, max_pinned: int = 4):
+        self.max_bytes = max_bytes
+        self.max_pinned = max_pinned
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.reused_tokens = 0
+        # prefix -> (KV state, bytes, pinned)
+        self._entries: "OrderedDict[Tuple[int, ...], tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, token_ids: Sequence[int], boundaries: Sequence[int]) -> Tuple[int, Optional[object]]:
+        """Longest cached prefix of ``token_ids`` ending on one of ``boundaries``.
+
+        Returns (prefix length, private cache object over its KV tensors) or
+        (0, None). The cache object may be extended by the caller.
+        """
+        with self._lock:
+            for boundary in sorted(boundaries, reverse=True):
+                key = tuple(token_ids[:boundary])
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    self.reused_tokens += boundary
+                    return boundary, share_cache(self._entries[key][0])
+            self.misses += 1
+            return 0, None
+
+    def put(self, token_ids: Sequence[int], past_key_values, pinned: bool = False):
+        """Store the KV state for the prefix ``token_ids``; later extensions by the caller do not affect it"""
+        key = tuple(token_ids)
+        nbytes = cache_nbytes(past_key_values)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                state, size, was_pinned = self._entries[key]
+                self._entries[key] = (state, size, was_pinned or pinned)
+                self._entries.move_to_end(key)
+            else:
+                self._entries[key] = (share_cache(past_key_values), nbytes, pinned)
+                self.nbytes += nbytes
+            pinned_keys = [k for k, entry in self._entries.items() if entry[2]]
+            for old in pinned_keys[:max(0, len(pinned_keys) - self.max_pinned)]:
+                self._entries[old] = self._entries[old][:2] + (False,)
+            while self.nbytes > self.max_bytes:
+                victim = next((k for k, entry in self._entries.items() if not entry[2]), None)
+                if victim is None:
+                    break
+                self.nbytes -= self._entries.pop(victim)[1]
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "reused_tokens": self.reused_tokens,
+            "entries": len(self._entries),
+            "pinned": sum(entry[2] for entry in self._entries.values()),
+            "bytes": self.nbytes,
+        }
@@ -1,32 +1,48 @@
 from langchain_core.retrievers import BaseRetriever
 from langchain_core.documents import Document
 from langchain_community.embeddings import HuggingFaceEmbeddings
-from typing import List
+from typing import List, Tuple
 import numpy as np
 from pydantic import Field, model_validator
+from .query_cache import QueryEmbeddingCache
+
+def dot_product_search(index: np.ndarray, query_embedding, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Row ids and scores of the top_k rows of index with the largest dot product, best first"""
+    similarities = index @ np.asarray(query_embedding, dtype=index.dtype)
+    top_k = min(top_k, len(similarities))
+    if top_k <= 0:
+        return np.zeros(0, dtype=np.int64), similarities[:0]
+    # argpartition selects the top_k in O(n); only those are sorted
+    indices = np.argpartition(-similarities, top_k - 1)[:top_k]
+    indices = indices[np.argsort(-similarities[indices], kind="stable")]
+    return indices, similarities[indices]
 
 class LangChainRetriever(BaseRetriever):
     embeddings: HuggingFaceEmbeddings = Field(default=None, exclude=True)
     documents: List[str] = Field(default_factory=list)
     index: np.ndarray = Field(default=None, exclude=True)
+    query_cache: QueryEmbeddingCache = Field(default=None, exclude=True)
 
-    def __init__(self, embedding_model_name: str, documents: List[str]):
+    def __init__(self, embedding_model_name: str, documents: List[str], query_cache_size: int = 1024):
         super().__init__()
         self.embeddings = HuggingFaceEmbeddings(model_name=embedding_model_name)
+        self.query_cache = QueryEmbeddingCache(query_cache_size)
         self.documents = documents
         self.index = self._build_index()
 
     def _build_index(self):
         doc_embeddings = self.embeddings.embed_documents(self.documents)
-        return np.array(doc_embeddings)
+        # float32 halves the memory of the default float64 conversion
+        return np.array(doc_embeddings, dtype=np.float32)
 
     def _get_relevant_documents(self, query: str) -> List[Document]:
-        query_embedding = self.embeddings.embed_query(query)
-        similarities = np.dot(self.index, query_embedding)
-        indices = np.argsort(similarities)[::-1][:5]
+        query_embedding = self.query_cache.encode(
+            [query], lambda queries: [self.embeddings.embed_query(q) for q in queries]
+        )[0]
+        indices, similarities = dot_product_search(self.index, query_embedding, 5)
         return [
             Document(
                 page_content=self.documents[i],
-                metadata={"similarity": float(similarities[i])}
-            ) for i in indices
+                metadata={"similarity": float(similarity)}
+            ) for i, similarity in zip(indices, similarities)
         ]
\ No newline at end of file
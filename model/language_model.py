@@ -1,11 +1,23 @@
-from transformers import AutoModelForCausalLM, AutoTokenizer
+from transformers import AutoModelForCausalLM, AutoTokenizer, TextIteratorStreamer
+from threading import Thread
+from bisect import bisect_right
+from itertools import accumulate
+from .kv_cache import PrefixKVCache
+import torch
 import os
 
 class LanguageModel:
-    def __init__(self, model_name):
+    def __init__(self, model_name, kv_cache_bytes=0):
         self.model_name = model_name
         self.cache_path = os.path.join("model_cache", model_name.replace("/", "_"))
         self.tokenizer, self.model = self._load_model()
+        # GPT-2 gibi modellerde pad token yoktur; toplu üretim için EOS kullanılır.
+        # Decoder-only modellerde üretim sağa doğru devam ettiği için dolgu sola yapılır.
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        self.tokenizer.padding_side = "left"
+        # Parçalı prompt'larda sabit önek ve sık gelen belgelerin KV durumları tekrar kullanılır
+        self.kv_cache = PrefixKVCache(kv_cache_bytes) if kv_cache_bytes else None
 
     def _load_model(self):
         """
@@ -23,16 +35,174 @@ class LanguageModel:
             model.save_pretrained(self.cache_path)
         return tokenizer, model
 
-    def generate(self, prompt, max_new_tokens=50):
+    def generate(self, prompt, max_new_tokens=50, max_time=None):
         """
-        Verilen prompt'a göre cevap üretir.
+        Verilen prompt'a göre cevap üretir. generate_stream ile aynı şekilde
+        prompt tekrar edilmez, yalnızca üretilen metin döner.
+
+        Args:
+            prompt: Girdi metni ya da sabit önekle başlayan metin parçaları listesi.
+            max_new_tokens: Üretilecek en fazla token sayısı.
+            max_time: Saniye cinsinden üretim süresi sınırı; dolduğunda o ana kadar üretilen metin döner.
         """
-        inputs = self.tokenizer(prompt, return_tensors="pt")
+        inputs = self._encode_prompt(prompt)
         outputs = self.model.generate(
             inputs["input_ids"],
             attention_mask=inputs["attention_mask"],
+            past_key_values=inputs["past_key_values"],
             pad_token_id=self.tokenizer.pad_token_id,
             max_new_tokens=max_new_tokens,
+            max_time=max_time,
             num_return_sequences=1
         )
-        return self.tokenizer.decode(outputs[0], skip_special_tokens=True)
\ No newline at end of file
+        return self.tokenizer.decode(outputs[0][inputs["input_ids"].shape[1]:], skip_special_tokens=True)
+
+    def _encode_prompt(self, prompt):
+        """
+        Prompt'u token'lara çevirir. Parça listeleri birleştirilip tek metin
+        olarak token'lanır; böylece token'lar generate_batch'teki düz metinle
+        aynıdır. KV önbelleği açıksa son parça hariç her parça sınırında biten
+        öneklerin KV durumları önbellekten alınır ya da hesaplanıp önbelleğe
+        yazılır; model yalnızca kalan token'ları işler.
+        """
+        text = prompt if isinstance(prompt, str) else "".join(prompt)
+        if self.kv_cache is None or isinstance(prompt, str) or not self.tokenizer.is_fast:
+            inputs = self.tokenizer(text, return_tensors="pt")
+            return {"input_ids": inputs["input_ids"], "attention_mask": inputs["attention_mask"], "past_key_values": None}
+
+        encoded = self.tokenizer(text, return_offsets_mapping=True)
+        token_ids = encoded["input_ids"]
+        # Parça sınırı, o karakterden önce biten token sayısıdır; sınırı aşan
+        # bir token (ör. "\n" + "\n" -> "\n\n") sonraki parçaya sayılır
+        token_ends = [end for _, end in encoded["offset_mapping"]]
+        boundaries = [bisect_right(token_ends, end) for end in accumulate(len(segment) for segment in prompt[:-1])]
+        header = boundaries[0] if boundaries else 0
+        # Son parça (soru) her zaman modelden geçmeli
+        boundaries = sorted({b for b in boundaries if 0 < b < len(token_ids)})
+
+        past_key_values = None
+        if boundaries:
+            # Tüm prompt'ların paylaştığı başlık sabitlenir, LRU ile silinmez;
+            # başlık + belge 1, başlık + belge 1 + belge 2, ... önekleri normal kayıtlardır
+            cached_length, past_key_values = self.kv_cache.lookup(token_ids, boundaries)
+            with torch.no_grad():
+                for boundary in boundaries:
+                    if boundary <= cached_length:
+                        continue
+                    past_key_values = self.model(
+                        input_ids=torch.tensor([token_ids[cached_length:boundary]]),
+                        past_key_values=past_key_values,
+                        use_cache=True
+                    ).past_key_values
+                    self.kv_cache.put(token_ids[:boundary], past_key_values, pinned=boundary == header)
+                    cached_length = boundary
+
+        input_ids = torch.tensor([token_ids])
+        return {"input_ids": input_ids, "attention_mask": torch.ones_like(input_ids), "past_key_values": past_key_values}
+
+    def generate_batch(self, prompts, max_new_tokens=50, batch_size=8, max_time=None):
+        """
+        Birden fazla prompt için toplu cevap üretir. Prompt'lar token
+        uzunluğuna göre sıralanıp küçük gruplar halinde işlenir; böylece
+        dolgu (padding) en aza iner. Cevaplar girdi sırasıyla döner.
+        Parça listeleri generate'teki gibi birleştirilip token'lanır. Toplu
+        üretim KV önbelleğini kullanmaz: gruptaki her prompt'un önbellekteki
+        öneki farklı uzunlukta olduğundan tek bir dolgulu KV durumu kurulamaz.
+
+        Args:
+            prompts: Girdi metinleri ya da metin parçası listeleri.
+            max_new_tokens: Her cevap için üretilecek en fazla token sayısı.
+            batch_size: Tek generate çağrısında işlenecek prompt sayısı.
+            max_time: Her grup için saniye cinsinden üretim süresi sınırı.
+
+        Returns:
+            list: Her prompt için üretilen cevap (prompt'suz).
+        """
+        texts = [prompt if isinstance(prompt, str) else "".join(prompt) for prompt in prompts]
+        encoded = self.tokenizer(texts)["input_ids"]
+        order = sorted(range(len(encoded)), key=lambda i: len(encoded[i]))
+        answers = [None] * len(encoded)
+        for start in range(0, len(order), batch_size):
+            group = order[start:start + batch_size]
+            inputs = self.tokenizer.pad({"input_ids": [encoded[i] for i in group]}, return_tensors="pt")
+            outputs = self.model.generate(
+                inputs["input_ids"],
+                attention_mask=inputs["attention_mask"],
+                pad_token_id=self.tokenizer.pad_token_id,
+                max_new_tokens=max_new_tokens,
+                max_time=max_time,
+                num_return_sequences=1
+            )
+            # Sola dolgu sayesinde tüm prompt'lar aynı konumda biter
+            new_tokens = outputs[:, inputs["input_ids"].shape[1]:]
+            for i, text in zip(group, self.tokenizer.batch_decode(new_tokens, skip_special_tokens=True)):
+                answers[i] = text
+        return answers
+
+    def generate_stream(self, prompt, max_new_tokens=50, max_time=None):
+        """
+        Cevabı üretildikçe parça parça döndürür. Üretim ayrı bir thread'de
+        çalışır; prompt tekrar edilmez, yalnızca yeni üretilen metin döner.
+
+        Args:
+            prompt: Girdi metni ya da sabit önekle başlayan metin parçaları listesi.
+            max_new_tokens: Üretilecek en fazla token sayısı.
+            max_time: Saniye cinsinden üretim süresi sınırı.
+
+        Yields:
+            str: Çözülmüş (decode edilmiş) metin parçaları.
+        """
+        inputs = self._encode_prompt(prompt)
+        streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        errors = []
+
+        def run():
+            try:
+                self.model.generate(
+                    inputs["input_ids"],
+                    attention_mask=inputs["attention_mask"],
+                    past_key_values=inputs["past_key_values"],
+                    pad_token_id=self.tokenizer.pad_token_id,
+                    max_new_tokens=max_new_tokens,
+                    max_time=max_time,
+                    num_return_sequences=1,
+                    streamer=streamer
+                )
+            except Exception as e:
+                # Tüketicinin sonsuza kadar beklememesi için akışı kapat
+                errors.append(e)
+                streamer.end()
+
+        thread = Thread(target=run, daemon=True)
+        thread.start()
+        for text in streamer:
+            if text:
+                yield text
+        thread.join()
+        if errors:
+            raise errors[0]
+
+    def generate_many(self, prompt, num_sequences, max_new_tokens=50, max_time=None, temperature=0.8):
+        """
+        Aynı prompt için tek bir generate çağrısında birden fazla örneklenmiş cevap
+        üretir; generate gibi yalnızca üretilen metinler döner.
+
+        Args:
+            prompt: Girdi metni.
+            num_sequences: Üretilecek cevap sayısı (num_return_sequences).
+            max_new_tokens: Her cevap için üretilecek en fazla token sayısı.
+            max_time: Saniye cinsinden üretim süresi sınırı.
+            temperature: Örnekleme sıcaklığı; cevapların birbirinden farklı olmasını sağlar.
+        """
+        inputs = self.tokenizer(prompt, return_tensors="pt")
+        outputs = self.model.generate(
+            inputs["input_ids"],
+            attention_mask=inputs["attention_mask"],
+            pad_token_id=self.tokenizer.pad_token_id,
+            max_new_tokens=max_new_tokens,
+            max_time=max_time,
+            do_sample=num_sequences > 1,
+            temperature=temperature if num_sequences > 1 else None,
+            num_return_sequences=num_sequences
+        )
+        return self.tokenizer.batch_decode(outputs[:, inputs["input_ids"].shape[1]:], skip_special_tokens=True)
\ No newline at end of file
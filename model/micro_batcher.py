@@ -0,0 +1,90 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+
+class MicroBatcher:
+    """Collect concurrent asyncio requests into batches for a blocking batch function.
+
+    A batch is closed when it reaches ``max_batch_size`` or ``max_wait``
+    seconds after its first request arrived, then ``process_batch`` runs in a
+    worker thread so the event loop keeps accepting requests. While a batch is
+    being processed the next one fills up, so batches grow with load.
+    ``process_batch`` receives a list of items and returns one result per item.
+    """
+
+    def __init__(self, process_batch: Callable[[List[Any]], List[Any]], max_batch_size: int = 8,
+                 max_wait: float = 0.02, workers: int = 1):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.workers = workers
+        self.requests = 0
+        self.batches = 0
+        self.failed_requests = 0
+        self.busy_seconds = 0.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch")
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, item: Any) -> Any:
+        """Queue ``item`` and wait for its result"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            items = [item for item, _ in batch]
+            started = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self._executor, self.process_batch, items)
+            except Exception as e:
+                self.failed_requests += len(batch)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            self.busy_seconds += time.perf_counter() - started
+            self.requests += len(batch)
+            self.batches += 1
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "failed_requests": self.failed_requests,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "busy_seconds": self.busy_seconds,
+        }
@@ -16,6 +16,12 @@ import requests
 from io import BytesIO
 import arxiv
 
+try:
+    from model.context_compressor import ExtractiveCompressor
+except ImportError:
+    # streamlit run model/ollama_rag_local.py: yalnızca bu dizin sys.path'te
+    from context_compressor import ExtractiveCompressor
+
 # ---------------------------
 # Logging configuration
 # ---------------------------
@@ -124,7 +130,9 @@ with st.sidebar:
         top_k = st.slider("Number of Contexts", 1, 10, 4,
                           help="Cevap üretirken kullanılacak ilgili belge parçalarının sayısı.")
         use_compression = st.checkbox("Use Context Compression", True,
-                                      help="Bağlam sıkıştırması için LLM tabanlı özetleme kullanır (şimdilik uygulanmıyor).")
+                                      help="Bağlamdan yalnızca soruya en yakın cümleleri (embedding benzerliği ile) LLM'e gönderir.")
+        compression_ratio = st.slider("Compression Ratio", 0.1, 1.0, 0.5, 0.1,
+                                      help="Sıkıştırmada korunacak cümle oranı.")
 
     if st.button("💾 Save Settings", use_container_width=True):
         st.success("Settings saved!")
@@ -190,10 +198,7 @@ def create_vector_store(texts, embeddings):
         st.error(f"Error creating vector store: {str(e)}")
         return None
 
-def create_qa_chain(llm, retriever):
-    try:
-        logger.info("Creating QA chain")
-        template = """[INST] <<SYS>>
+QA_TEMPLATE = """[INST] <<SYS>>
 Answer the question using the provided context. Cite your sources.
 If you don't know the answer, say "I don't know."
 <</SYS>>
@@ -203,9 +208,12 @@ Context: {context}
 Question: {question} 
 
 Detailed Answer: [/INST]"""
-        
+
+def create_qa_chain(llm, retriever):
+    try:
+        logger.info("Creating QA chain")
         prompt = PromptTemplate(
-            template=template,
+            template=QA_TEMPLATE,
             input_variables=["context", "question"],
         )
         
@@ -222,6 +230,21 @@ Detailed Answer: [/INST]"""
         st.error(f"Error creating QA chain: {str(e)}")
         return None
 
+def run_qa(qa_chain, llm, retriever, query, compressor=None):
+    """
+    Soruyu cevaplar. Sıkıştırma açıksa getirilen parçalardan yalnızca soruya
+    en yakın cümleler prompt'a konur; sonuç QA zinciriyle aynı biçimde döner.
+    """
+    if compressor is None:
+        return qa_chain({"query": query})
+
+    documents = retriever.invoke(query)
+    texts, stats = compressor.compress(query, [doc.page_content for doc in documents])
+    logger.info(f"Context compressed: {stats['compressed_tokens']}/{stats['original_tokens']} words kept")
+    context = "\n\n".join(text for text in texts if text)
+    answer = llm.invoke(QA_TEMPLATE.format(context=context, question=query))
+    return {"result": getattr(answer, "content", answer), "source_documents": documents}
+
 # ---------------------------
 # Session State Initialization
 # ---------------------------
@@ -289,7 +312,8 @@ with tab_upload:
                     start_time = time.time()
                     with st.spinner("Generating answer..."):
                         try:
-                            result = qa_chain({"query": query})
+                            compressor = ExtractiveCompressor(embeddings.embed_documents, ratio=compression_ratio) if use_compression else None
+                            result = run_qa(qa_chain, llm, retriever, query, compressor)
                             elapsed_time = time.time() - start_time
                             st.markdown("#### 📝 Answer:")
                             st.markdown(f"<div style='background-color:#f0f8ff;padding:1rem;border-radius:0.5rem;'>{result['result']}</div>", unsafe_allow_html=True)
@@ -399,7 +423,8 @@ with tab_arxiv:
                     start_time = time.time()
                     with st.spinner("Generating answer..."):
                         try:
-                            result = qa_chain({"query": query})
+                            compressor = ExtractiveCompressor(embeddings.embed_documents, ratio=compression_ratio) if use_compression else None
+                            result = run_qa(qa_chain, llm, retriever, query, compressor)
                             elapsed_time = time.time() - start_time
                             st.markdown("#### 📝 Answer:")
                             st.markdown(f"<div style='background-color:#f0f8ff;padding:1rem;border-radius:0.5rem;'>{result['result']}</div>", unsafe_allow_html=True)
@@ -0,0 +1,59 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+
+def normalize_query(text: str) -> str:
+    """Collapse whitespace and drop trailing punctuation; case is kept, since it can change the meaning"""
+    return " ".join(text.split()).rstrip("?!. ")
+
+
+class QueryEmbeddingCache:
+    """Bounded LRU of normalized query text -> embedding vector"""
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def encode(self, queries: Sequence[str], encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Embeddings for ``queries``; misses are encoded together in one ``encode_fn`` call"""
+        keys = [normalize_query(query) for query in queries]
+        found = {}
+        missing: Dict[str, str] = {}
+        with self._lock:
+            for key, query in zip(keys, queries):
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+                    self.hits += 1
+                else:
+                    missing.setdefault(key, query)
+                    self.misses += 1
+
+        if missing:
+            vectors = np.asarray(encode_fn(list(missing.values())), dtype=np.float32)
+            with self._lock:
+                for key, vector in zip(missing, vectors):
+                    found[key] = vector
+                    if self.capacity > 0:
+                        self._entries[key] = vector
+                        self._entries.move_to_end(key)
+                while len(self._entries) > self.capacity:
+                    self._entries.popitem(last=False)
+
+        return np.stack([found[key] for key in keys])
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._entries),
+            "capacity": self.capacity,
+        }
@@ -0,0 +1,83 @@
+from .embedding_model import EmbeddingModel
+from .retriever_factory import RetrieverFactory
+from .language_model import LanguageModel
+from .rag_system import RAGSystem
+from .answer_cache import SemanticAnswerCache
+from .context_packer import ContextPacker
+from .context_compressor import ExtractiveCompressor
+from .reranker import CrossEncoderReranker, RerankingRetriever
+from .hyde_retriever import HyDERetriever
+import os
+
+class RAGFactory:
+    @staticmethod
+    def create_rag_system(config):
+        """
+        Config'e göre embedding modeli, retriever (config.DEFAULT_RETRIEVER),
+        dil modeli ve önbellekleri kurup RAGSystem döndürür.
+        """
+        # Sistem bileşenlerini yükle
+        embedding_model = EmbeddingModel(config.DEFAULT_EMBEDDING_MODEL, config.EMBEDDING_CACHE_DIR)
+
+        if config.DEFAULT_RETRIEVER in ("faiss", "hybrid"):
+            # PDF'ler yalnızca kayıtlı indeks geçersizse yüklenip parçalanır
+            retriever = RetrieverFactory.create_retriever(
+                config, 
+                config.DEFAULT_EMBEDDING_MODEL
+            )
+        elif config.DEFAULT_RETRIEVER == "hyde":
+            # HyDE retriever'ı kullan
+            retriever = HyDERetriever(
+                files_path=config.PDF_DIRECTORY,
+                chunk_size=config.HYDE_CHUNK_SIZE,
+                chunk_overlap=config.HYDE_CHUNK_OVERLAP,
+                language_model_name=config.HYDE_SETTINGS["language_model"],
+                embedding_model_name=config.HYDE_SETTINGS["embedding_model"],
+                index_dir=os.path.join(config.INDEX_DIRECTORY, "hyde"),
+                pdf_workers=config.PDF_WORKERS,
+                ingest_batch_size=config.INGEST_BATCH_SIZE,
+                text_cache_dir=config.TEXT_CACHE_DIR,
+                query_cache_size=config.QUERY_CACHE_SIZE,
+                hyde_cache_path=config.HYDE_CACHE_PATH,
+                hyde_cache_size=config.HYDE_CACHE_SIZE,
+                time_budget=config.HYDE_TIME_BUDGET,
+                token_budget=config.HYDE_TOKEN_BUDGET,
+                deadline_grace=config.HYDE_DEADLINE_GRACE,
+                num_hypotheses=config.HYDE_NUM_HYPOTHESES,
+                index_type=config.HYDE_INDEX_TYPE,
+                index_params=config.INDEX_PARAMS,
+                embedding_cache_dir=config.EMBEDDING_CACHE_DIR
+            )
+        else:
+            raise ValueError("Geçersiz retriever seçeneği!")
+    
+        if config.RERANK_ENABLED:
+            reranker = CrossEncoderReranker(
+                config.RERANK_MODEL,
+                max_candidates=config.RERANK_CANDIDATES,
+                time_budget=config.RERANK_TIME_BUDGET,
+                cache_size=config.RERANK_CACHE_SIZE
+            )
+            retriever = RerankingRetriever(retriever, reranker)
+
+        language_model = LanguageModel(config.DEFAULT_LANGUAGE_MODEL, kv_cache_bytes=config.KV_CACHE_MB * 1024 * 1024)
+        answer_cache = None
+        if config.ANSWER_CACHE_ENABLED:
+            answer_cache = SemanticAnswerCache(
+                config.ANSWER_CACHE_THRESHOLD,
+                config.ANSWER_CACHE_CAPACITY,
+                config.ANSWER_CACHE_TTL
+            )
+        context_packer = None
+        if config.CONTEXT_TOKEN_BUDGET:
+            context_packer = ContextPacker(language_model.tokenizer, config.CONTEXT_TOKEN_BUDGET, config.MAX_NEW_TOKENS)
+        compressor = None
+        if config.CONTEXT_COMPRESSION:
+            compressor = ExtractiveCompressor(
+                embedding_model.encode_queries,
+                ratio=config.COMPRESSION_RATIO,
+                token_budget=config.COMPRESSION_TOKEN_BUDGET,
+                count_tokens=lambda text: len(language_model.tokenizer.encode(text))
+            )
+        return RAGSystem(embedding_model, retriever, language_model, answer_cache,
+                         context_packer, config.MAX_NEW_TOKENS, compressor)
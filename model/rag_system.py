@@ -1,5 +1,8 @@
+import time
+
 class RAGSystem:
-    def __init__(self, embedding_model, retriever, language_model):
+    def __init__(self, embedding_model, retriever, language_model, answer_cache=None,
+                 context_packer=None, max_new_tokens=50, compressor=None):
         """
         RAG sistemini başlatır.
 
@@ -7,10 +10,20 @@ class RAGSystem:
             embedding_model: Metinleri vektörlere dönüştürmek için kullanılan embedding modeli.
             retriever: Belge getirme işlemini gerçekleştiren retriever.
             language_model: Sorulara cevap üretmek için kullanılan dil modeli.
+            answer_cache: Benzer sorulara önceki cevabı döndüren SemanticAnswerCache (opsiyonel).
+            context_packer: Belgeleri token bütçesine sığdıran ContextPacker (opsiyonel).
+            max_new_tokens: Cevap için üretilecek en fazla token sayısı.
+            compressor: Belgelerden yalnızca soruyla ilgili cümleleri bırakan ExtractiveCompressor (opsiyonel).
         """
         self.embedding_model = embedding_model
         self.retriever = retriever
         self.language_model = language_model
+        self.answer_cache = answer_cache
+        self.context_packer = context_packer
+        self.max_new_tokens = max_new_tokens
+        self.compressor = compressor
+        self.last_timings = {}  # Son toplu cevaplamanın aşama süreleri (saniye)
+        self.last_context_stats = {}  # Son prompt'un token sayıları ve bütçeyle kazanılan token
     
     def answer_question(self, query: str, top_k: int = 2) -> str:
         """
@@ -23,20 +36,182 @@ class RAGSystem:
         Returns:
             str: Sorunun cevabı.
         """
+        answer, _ = self.answer_with_sources(query, top_k)
+        return answer
+
+    def answer_with_sources(self, query: str, top_k: int = 2) -> tuple:
+        """
+        Verilen bir soruya cevap üretir ve cevabın dayandığı belgeleri de döndürür.
+        Cevap önbelleği açıksa, anlamca yeterince benzer bir soru daha önce
+        cevaplandıysa getirme ve üretim adımları atlanır.
+
+        Args:
+            query: Soru metni.
+            top_k: Getirilecek en benzer belge sayısı.
+
+        Returns:
+            tuple: (cevap, [(belge metni, skor), ...])
+        """
+        self.last_context_stats = {}
         try:
-            # Retriever'dan benzer belgeleri ve hipotetik belgeyi al
-            similar_docs, hypothetical_doc = self.retriever.retrieve(query, top_k)
+            index_version = getattr(self.retriever, "index_version", None)
+            if self.answer_cache is not None:
+                query_embedding = self.embedding_model.encode_queries([query])[0]
+                cached = self.answer_cache.lookup(query_embedding, top_k, index_version)
+                if cached is not None:
+                    return cached
+
+            # Retriever'dan benzer belgeleri al
+            similar_docs = self._retrieve(query, top_k)
             
             # Benzer belgeleri kullanarak prompt oluştur
-            prompt = self._create_prompt(query, similar_docs)
+            prompt = self._create_prompt_segments(query, similar_docs)
             
             # Dil modeli ile cevap üret
-            answer = self.language_model.generate(prompt)
-            return answer
+            answer = self.language_model.generate(prompt, max_new_tokens=self.max_new_tokens)
+
+            if self.answer_cache is not None:
+                self.answer_cache.put(query_embedding, query, answer, similar_docs, top_k, index_version)
+            return answer, similar_docs
         except Exception as e:
             # Hata durumunda kullanıcıya bilgi ver
             print(f"Soru cevaplanırken bir hata oluştu: {str(e)}")
-            return "Üzgünüm, bu soruyu cevaplayamadım."
+            return "Üzgünüm, bu soruyu cevaplayamadım.", []
+
+    def answer_batch(self, queries: list, top_k: int = 2, batch_size: int = 8) -> list:
+        """
+        Birden fazla soruya toplu cevap üretir.
+
+        Args:
+            queries: Soru metinleri.
+            top_k: Her soru için getirilecek en benzer belge sayısı.
+            batch_size: Tek generate çağrısında işlenecek soru sayısı.
+
+        Returns:
+            list: Soruların cevapları (girdi sırasıyla).
+        """
+        return [answer for answer, _ in self.answer_batch_with_sources(queries, top_k, batch_size)]
+
+    def answer_batch_with_sources(self, queries: list, top_k: int = 2, batch_size: int = 8,
+                                  raise_errors: bool = False) -> list:
+        """
+        Birden fazla soruya toplu cevap üretir: önbellekte olmayan sorular için
+        belgeler tek seferde getirilir, cevaplar uzunluğa göre gruplanmış
+        toplu generate çağrılarıyla üretilir. Prompt'lar answer_with_sources
+        ile aynı token'lara çevrilir, ancak toplu üretim KV önbelleğini kullanmaz.
+
+        Args:
+            queries: Soru metinleri.
+            top_k: Her soru için getirilecek en benzer belge sayısı.
+            batch_size: Tek generate çağrısında işlenecek soru sayısı.
+            raise_errors: True ise hata özür cevabıyla gizlenmez, çağırana iletilir;
+                böylece başarısız sorular cevaplanmış sayılmaz ve tekrar denenebilir.
+
+        Returns:
+            list: Her soru için (cevap, [(belge metni, skor), ...])
+        """
+        queries = list(queries)
+        results = [None] * len(queries)
+        timings = {"queries": len(queries), "cache_hits": 0, "retrieval": 0.0, "generation": 0.0}
+        try:
+            index_version = getattr(self.retriever, "index_version", None)
+            pending = list(range(len(queries)))
+            if self.answer_cache is not None and queries:
+                query_embeddings = self.embedding_model.encode_queries(queries)
+                pending = []
+                for i, embedding in enumerate(query_embeddings):
+                    cached = self.answer_cache.lookup(embedding, top_k, index_version)
+                    if cached is not None:
+                        results[i] = cached
+                    else:
+                        pending.append(i)
+                timings["cache_hits"] = len(queries) - len(pending)
+
+            if pending:
+                started = time.perf_counter()
+                similar_docs = self._retrieve_batch([queries[i] for i in pending], top_k)
+                timings["retrieval"] = time.perf_counter() - started
+
+                started = time.perf_counter()
+                prompts = [self._create_prompt_segments(queries[i], docs) for i, docs in zip(pending, similar_docs)]
+                answers = self.language_model.generate_batch(
+                    prompts, max_new_tokens=self.max_new_tokens, batch_size=batch_size
+                )
+                timings["generation"] = time.perf_counter() - started
+
+                for i, answer, docs in zip(pending, answers, similar_docs):
+                    results[i] = (answer, docs)
+                    if self.answer_cache is not None:
+                        self.answer_cache.put(query_embeddings[i], queries[i], answer, docs, top_k, index_version)
+            return results
+        except Exception as e:
+            if raise_errors:
+                raise
+            print(f"Sorular cevaplanırken bir hata oluştu: {str(e)}")
+            return [result or ("Üzgünüm, bu soruyu cevaplayamadım.", []) for result in results]
+        finally:
+            self.last_timings = timings
+
+    def answer_question_stream(self, query: str, top_k: int = 2):
+        """
+        Verilen bir soruya cevabı üretildikçe parça parça döndürür; kullanıcı
+        ilk token'ı tüm cevap bitmeden görür. Önbellekte bulunan cevaplar tek
+        parça halinde döner.
+
+        Args:
+            query: Soru metni.
+            top_k: Getirilecek en benzer belge sayısı.
+
+        Yields:
+            str: Cevap metninin parçaları.
+        """
+        self.last_context_stats = {}
+        try:
+            index_version = getattr(self.retriever, "index_version", None)
+            if self.answer_cache is not None:
+                query_embedding = self.embedding_model.encode_queries([query])[0]
+                cached = self.answer_cache.lookup(query_embedding, top_k, index_version)
+                if cached is not None:
+                    yield cached[0]
+                    return
+
+            similar_docs = self._retrieve(query, top_k)
+            prompt = self._create_prompt_segments(query, similar_docs)
+
+            # Dil modelinin ürettiği parçaları hemen ilet
+            parts = []
+            for text in self.language_model.generate_stream(prompt, max_new_tokens=self.max_new_tokens):
+                parts.append(text)
+                yield text
+
+            if self.answer_cache is not None:
+                self.answer_cache.put(query_embedding, query, "".join(parts), similar_docs, top_k, index_version)
+        except Exception as e:
+            print(f"Soru cevaplanırken bir hata oluştu: {str(e)}")
+            yield "Üzgünüm, bu soruyu cevaplayamadım."
+
+    def _retrieve(self, query: str, top_k: int) -> list:
+        """
+        Retriever'dan benzer belgeleri getirir. HyDE (belgeler, hipotetik belge)
+        döndürürken FAISS retriever yalnızca belge listesini döndürür.
+        """
+        result = self.retriever.retrieve(query, top_k)
+        if isinstance(result, tuple):
+            similar_docs, _hypothetical_doc = result
+            return similar_docs
+        return result
+    
+    def _retrieve_batch(self, queries: list, top_k: int) -> list:
+        """
+        Birden fazla soru için benzer belgeleri getirir. retrieve_batch
+        desteklemeyen retriever'larda sorular tek tek işlenir.
+        """
+        if not hasattr(self.retriever, "retrieve_batch"):
+            return [self._retrieve(query, top_k) for query in queries]
+        return [
+            result[0] if isinstance(result, tuple) else result
+            for result in self.retriever.retrieve_batch(queries, top_k)
+        ]
     
     def _create_prompt(self, query: str, similar_docs: list) -> str:
         """
@@ -49,29 +224,46 @@ class RAGSystem:
         Returns:
             str: Dil modeli için hazırlanmış prompt.
         """
+        return "".join(self._create_prompt_segments(query, similar_docs))
+
+    def _create_prompt_segments(self, query: str, similar_docs: list) -> list:
+        """
+        Prompt'u parçalar halinde oluşturur: sabit talimat başlığı, her belge
+        için bir parça ve en sonda soru. Soruya bağlı her şey sona
+        konduğundan dil modeli başlığın ve sık gelen belgelerin KV
+        durumlarını sorular arasında tekrar kullanabilir. ContextPacker
+        verilmişse belgeler skor sırasıyla token bütçesine sığdırılır;
+        ExtractiveCompressor verilmişse önce soruyla ilgisiz cümleler atılır.
+
+        Args:
+            query: Soru metni.
+            similar_docs: Benzer belgeler listesi (belge metni ve benzerlik skoru içeren tuple'lar).
+
+        Returns:
+            list: Birleştirildiğinde prompt'u veren metin parçaları.
+        """
         try:
-            # Benzer belgeleri formatla
-            context = "\n".join(
-                f"[Document {i+1} - Confidence: {score:.2f}]\n{text}"
-                for i, (text, score) in enumerate(similar_docs)
-            )
-            
-            # Prompt oluştur
-            prompt = f"""Answer the following question based on the documents:
-            
+            header = "Answer the following question based on the documents:\n\nRelevant Documents:\n"
+            question = f"""
 Question: {query}
 
-Relevant Documents:
-{context}
-
 Reasoning Process:
 1. Analyze each document's relevance to the question.
 2. Identify key information from the most relevant documents.
 3. Synthesize information into a coherent answer.
 
 Answer:"""
-            return prompt
+            if self.compressor is not None:
+                similar_docs = self.compressor.compress_documents(query, similar_docs)
+            texts = [text for text, _score in similar_docs]
+            if self.context_packer is not None:
+                # Belgeler en iyiden başlayarak bütçeye sığdırılır, taşan belge cümle sınırında kesilir
+                documents, self.last_context_stats = self.context_packer.pack(header, texts, question)
+            else:
+                # Skor soruya göre değiştiğinden belge parçalarına yazılmaz
+                documents = [f"[Document {i+1}]\n{text}\n" for i, text in enumerate(texts)]
+            return [header] + documents + [question]
         except Exception as e:
             # Hata durumunda basit bir prompt döndür
             print(f"Prompt oluşturulurken bir hata oluştu: {str(e)}")
-            return f"Answer the following question: {query}"
\ No newline at end of file
+            return [f"Answer the following question: {query}"]
\ No newline at end of file
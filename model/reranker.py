@@ -0,0 +1,149 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from .query_cache import normalize_query
+
+# With a time budget the first batch is this small, to measure the cost per candidate
+_PROBE_BATCH = 4
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class CrossEncoderReranker:
+    """Re-score (query, chunk) pairs with a CPU cross-encoder.
+
+    At most ``max_candidates`` candidates are scored per request, in batches
+    of ``batch_size``. With a ``time_budget`` a small probe batch is scored
+    first, and every later batch holds only as many candidates as the
+    measured time per candidate allows in the time left; when not even one
+    fits, scoring stops and unscored candidates keep their retrieval order
+    behind the scored ones, with scores below the lowest cross-encoder score
+    (retrieval scores are not comparable with cross-encoder logits). Scores are cached in an LRU keyed by (query hash,
+    chunk hash). Retrievers return chunk texts, so a chunk's id is its
+    content hash.
+    """
+
+    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+                 max_candidates: int = 20, batch_size: int = 32,
+                 time_budget: Optional[float] = None, cache_size: int = 4096, model=None):
+        self.model_name = model_name
+        self.max_candidates = max_candidates
+        self.batch_size = batch_size
+        self.time_budget = time_budget
+        self.cache_size = cache_size
+        self.model = model if model is not None else self._load_model()
+        self.hits = 0
+        self.misses = 0
+        self.timeouts = 0
+        self._scores: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load_model(self):
+        """Load from model_cache, downloading and saving the model on first use"""
+        from sentence_transformers import CrossEncoder
+        cache_path = os.path.join("model_cache", self.model_name.replace("/", "_"))
+        if os.path.exists(cache_path):
+            print(f"Model önbellekten yükleniyor: {self.model_name}")
+            return CrossEncoder(cache_path, device="cpu")
+        print(f"Model indiriliyor ve önbelleğe kaydediliyor: {self.model_name}")
+        model = CrossEncoder(self.model_name, device="cpu")
+        model.save(cache_path)
+        return model
+
+    def rerank(self, query: str, candidates: List[Tuple[str, float]], top_k: int) -> List[Tuple[str, float]]:
+        """Top ``top_k`` of ``candidates`` (best-first (text, score) pairs) by cross-encoder score"""
+        started = time.perf_counter()
+        candidates = candidates[:self.max_candidates]
+        query_key = _digest(normalize_query(query))
+        keys = [(query_key, _digest(text)) for text, _ in candidates]
+
+        scores: Dict[int, float] = {}
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key in self._scores:
+                    self._scores.move_to_end(key)
+                    scores[i] = self._scores[key]
+                    self.hits += 1
+                else:
+                    missing.append(i)
+                    self.misses += 1
+
+        per_item = None
+        while missing:
+            size = self.batch_size
+            if self.time_budget is not None:
+                left = self.time_budget - (time.perf_counter() - started)
+                if left <= 0 or (per_item is not None and left < per_item):
+                    self.timeouts += 1
+                    break
+                size = min(size, _PROBE_BATCH if per_item is None else max(1, int(left / per_item)))
+            batch, missing = missing[:size], missing[size:]
+            batch_started = time.perf_counter()
+            predicted = self.model.predict([(query, candidates[i][0]) for i in batch], batch_size=self.batch_size)
+            per_item = (time.perf_counter() - batch_started) / len(batch)
+            with self._lock:
+                for i, score in zip(batch, predicted):
+                    scores[i] = float(score)
+                    self._scores[keys[i]] = float(score)
+                while len(self._scores) > self.cache_size:
+                    self._scores.popitem(last=False)
+
+        scored = sorted(scores, key=lambda i: scores[i], reverse=True)
+        unscored = [i for i in range(len(candidates)) if i not in scores]
+        if scored:
+            lowest = scores[scored[-1]]
+            for rank, i in enumerate(unscored, 1):
+                scores[i] = lowest - rank
+        return [(candidates[i][0], scores.get(i, candidates[i][1])) for i in scored + unscored][:top_k]
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "timeouts": self.timeouts,
+            "size": len(self._scores),
+        }
+
+
+class RerankingRetriever:
+    """Wrap a retriever: over-fetch candidates, then rerank them down to top_k.
+
+    Works with both return shapes, the plain result list of ``Retriever`` and
+    the (results, hypothetical document) tuple of ``HyDERetriever``. Other
+    attributes (``index_version`` and so on) are forwarded to the wrapped
+    retriever.
+    """
+
+    def __init__(self, retriever, reranker: CrossEncoderReranker, candidates: Optional[int] = None):
+        self.retriever = retriever
+        self.reranker = reranker
+        self.candidates = candidates or reranker.max_candidates
+
+    def __getattr__(self, name):
+        return getattr(self.retriever, name)
+
+    def _rerank(self, query, result, top_k):
+        if isinstance(result, tuple):
+            docs, hypothetical_doc = result
+            return self.reranker.rerank(query, docs, top_k), hypothetical_doc
+        return self.reranker.rerank(query, result, top_k)
+
+    def retrieve(self, query, top_k=2):
+        return self._rerank(query, self.retriever.retrieve(query, max(top_k, self.candidates)), top_k)
+
+    def retrieve_batch(self, queries, top_k=2):
+        fetch = max(top_k, self.candidates)
+        if hasattr(self.retriever, "retrieve_batch"):
+            results = self.retriever.retrieve_batch(queries, fetch)
+        else:
+            results = [self.retriever.retrieve(query, fetch) for query in queries]
+        return [self._rerank(query, result, top_k) for query, result in zip(queries, results)]
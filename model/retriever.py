@@ -1,23 +1,178 @@
 import faiss
 import numpy as np
 from .embedding_model import EmbeddingModel
+from . import ann_index
+from .query_cache import QueryEmbeddingCache
+from . import index_store
 
 class Retriever:
-    def __init__(self, embedding_model):
+    def __init__(self, embedding_model, index_type="flat", index_params=None, query_cache_size=1024):
+        """
+        Args:
+            embedding_model: Belgeleri ve sorguları encode eden model.
+            index_type: "flat", "ivf_flat", "ivf_pq", "hnsw", nicemlenmiş "sq8" / "binary"
+                veya korpus boyutuna göre seçen "auto".
+            index_params: nlist, nprobe, ef_search, rescore_factor gibi indeks ayarları (bkz. ann_index.DEFAULT_INDEX_PARAMS).
+            query_cache_size: Sorgu embedding'leri için LRU önbellek kapasitesi (0 ile kapatılır).
+        """
         self.embedding_model = embedding_model
+        self.index_type = index_type
+        self.index_params = index_params or {}
+        self.query_cache = QueryEmbeddingCache(query_cache_size)
         self.index = None
         self.documents = None
+        self.dangling = 0  # İndekste kalan ama silinmiş parça sayısı (HNSW)
+        self.index_version = 0  # İndeks her değiştiğinde artar; cevap önbelleği bununla geçersizleşir
+        self.vectors = None  # Nicemlenmiş indekslerde sonuçları yeniden puanlamak için float vektörler
     
-    def build_index(self, documents):
-        self.documents = documents
-        embeddings = self.embedding_model.encode(documents)
-        dimension = embeddings.shape[1]
-        self.index = faiss.IndexFlatL2(dimension)
-        self.index.add(embeddings.astype(np.float32))
+    def rescore_factor(self):
+        """Nicemlenmiş indeks tiplerinde adayların kaç katının float vektörlerle yeniden puanlanacağı (0 = kapalı)"""
+        if self.index_type not in ann_index.QUANTIZED_TYPES:
+            return 0
+        return {**ann_index.DEFAULT_INDEX_PARAMS, **self.index_params}["rescore_factor"] or 0
+    
+    def reset(self):
+        self.index = None
+        self.documents = []
+        self.dangling = 0
+        self.vectors = None
+        self.index_version += 1
+    
+    def build_index(self, documents, batch_size=256):
+        self.reset()
+        # Sabit boyutlu gruplar halinde encode ederek bellek kullanımını sınırla
+        for start in range(0, len(documents), batch_size):
+            self.add_documents(documents[start:start + batch_size])
+        self.optimize_index()
+    
+    def add_documents(self, documents):
+        """
+        Belgeleri indekse ekler ve atanan kimlikleri döndürür. Kimlikler
+        self.documents içindeki konumlardır ve silmelerden sonra da değişmez.
+        """
+        if not documents:
+            return []
+        embeddings = self.embedding_model.encode(documents).astype(np.float32)
+        if self.index is None:
+            # Yeni indeksler önce tam (flat) olarak doldurulur, optimize_index ANN'e çevirir
+            self.index = faiss.IndexIDMap2(faiss.IndexFlatL2(embeddings.shape[1]))
+        ids = np.arange(len(self.documents), len(self.documents) + len(documents), dtype=np.int64)
+        self.index.add_with_ids(embeddings, ids)
+        if self.rescore_factor():
+            # Satır numarası parça kimliğiyle aynıdır; float vektörü olmayan eski indekse eklenmez
+            if self.vectors is None and not self.documents:
+                self.vectors = index_store.FloatVectors(embeddings.shape[1])
+            if self.vectors is not None:
+                self.vectors.append(embeddings)
+        self.documents.extend(documents)
+        self.index_version += 1
+        return ids.tolist()
+    
+    def optimize_index(self):
+        """
+        Flat indeksi seçilen ANN tipine çevirir: vektörlerden bir örnek üzerinde
+        eğitir ve tüm vektörleri aynı kimliklerle yeni indekse ekler.
+        """
+        if self.index is None or self.index.ntotal == 0:
+            return
+        if ann_index.index_type_of(self.index) != "flat":
+            ann_index.set_search_params(self.index, self.index_params)
+            return
+        target = ann_index.resolve_index_type(self.index_type, self.index.ntotal, self.index_params)
+        if target == "flat":
+            return
+        self.index = ann_index.rebuild_index(self.index, target, self.index_params)
+        self.index_version += 1
+    
+    def remove_ids(self, ids):
+        """
+        Verilen kimlikli parçaları indeksi yeniden oluşturmadan siler. Silmeyi
+        desteklemeyen indekslerde (HNSW) parça yalnızca belge deposundan
+        düşürülür ve arama sonuçlarından elenir; böyle parçalar indeksin
+        max_dangling oranını aşınca indeks canlı parçalarla yeniden kurulur.
+        """
+        try:
+            self.index.remove_ids(np.asarray(ids, dtype=np.int64))
+        except RuntimeError:
+            self.dangling += len(ids)
+        for i in ids:
+            self.documents[i] = None
+        params = {**ann_index.DEFAULT_INDEX_PARAMS, **self.index_params}
+        if self.dangling > params["max_dangling"] * self.index.ntotal:
+            # Silinmiş parçalar çoğalınca indeksi yalnızca canlı parçalarla yeniden kur
+            live = np.array([i for i, doc in enumerate(self.documents) if doc is not None], dtype=np.int64)
+            self.index = ann_index.compact_index(self.index, live, self.index_params)
+            self.dangling = 0
+        self.index_version += 1
+    
+    def compact_ids(self):
+        """
+        Silinmiş parçalar (None) kimlik alanının max_tombstones oranını aşınca
+        onları belge deposundan atar ve kalan parçaları sırası korunarak
+        0..n-1 olarak yeniden numaralandırır.
+
+        Returns:
+            Eski kimliği yeni kimliğe eşleyen dizi (silinenler -1) ya da sıkıştırma gerekmediyse None.
+        """
+        removed = sum(doc is None for doc in self.documents)
+        params = {**ann_index.DEFAULT_INDEX_PARAMS, **self.index_params}
+        if not removed or removed <= params["max_tombstones"] * len(self.documents):
+            return None
+        self.index, self.documents, self.vectors, mapping = index_store.compact_tombstones(
+            self.index, self.documents, self.vectors, self.index_params
+        )
+        self.dangling = 0
+        self.index_version += 1
+        return mapping
+    
+    def save(self, directory, manifest):
+        index_store.save_snapshot(directory, self.index, self.documents, manifest, self.vectors)
+    
+    def load(self, directory):
+        self.index, self.documents, manifest = index_store.load_snapshot(directory)
+        ann_index.set_search_params(self.index, self.index_params)
+        self.dangling = self.index.ntotal - sum(doc is not None for doc in self.documents)
+        self.vectors = index_store.load_vectors(directory, self.index.d) if self.rescore_factor() else None
+        self.index_version += 1
+        return manifest
+    
+    def recall_check(self, k=10, num_queries=100, seed=0):
+        """
+        İndeksi aynı vektörler üzerindeki tam (flat) aramayla karşılaştırır;
+        recall@k ve sorgu başına gecikmeyi döndürür. Sorgular rastgele seçilen parçalardır.
+        """
+        ids = np.array([i for i, doc in enumerate(self.documents) if doc is not None], dtype=np.int64)
+        vectors = self.embedding_model.encode([self.documents[i] for i in ids]).astype(np.float32)
+        rows = np.random.default_rng(seed).choice(len(ids), min(num_queries, len(ids)), replace=False)
+        result = ann_index.recall_at_k(self.index, vectors, ids, vectors[rows], k)
+        result["index_type"] = ann_index.index_type_of(self.index)
+        return result
     
     def retrieve(self, query, top_k=2):
-        query_embedding = self.embedding_model.encode([query])
-        query_embedding = query_embedding.astype(np.float32)
-        distances, indices = self.index.search(query_embedding, top_k)
-        return [(self.documents[i], float(distances[0][j])) 
-                for j, i in enumerate(indices[0])]
\ No newline at end of file
+        return self.retrieve_batch([query], top_k)[0]
+    
+    def retrieve_batch(self, queries, top_k=2):
+        """
+        Birden çok sorguyu tek encode ve tek FAISS araması ile işler.
+        
+        Returns:
+            list: Her sorgu için (belge, mesafe) tuple'larından oluşan liste.
+        """
+        if not queries:
+            return []
+        query_embeddings = self.query_cache.encode(queries, self.embedding_model.encode_queries)
+        query_embeddings = query_embeddings.astype(np.float32)
+        # Silinmiş ama indekste kalan parçalar elendiğinde top_k'nın dolması için fazladan getir
+        fetch = top_k + self.dangling
+        rescore_factor = self.rescore_factor() if self.vectors is not None else 0
+        if rescore_factor:
+            # Nicemlenmiş indeksten fazladan aday al, float vektörlerle tam mesafeye göre sırala
+            fetch = top_k * rescore_factor + self.dangling
+        distances, indices = self.index.search(query_embeddings, fetch)
+        if rescore_factor:
+            distances, indices = ann_index.rescore(query_embeddings, indices, self.vectors.get, fetch)
+        return [
+            [(self.documents[i], float(distances[row][j]))
+             for j, i in enumerate(indices[row]) if i >= 0 and self.documents[i] is not None][:top_k]
+            for row in range(len(queries))
+        ]
\ No newline at end of file
@@ -1,13 +1,52 @@
 from .retriever import Retriever
+from .hybrid_retriever import HybridRetriever
 from .embedding_model import EmbeddingModel
+from .incremental_index import open_index
+from data_loader.pdf_loader import PDFLoader
+import os
 
 class RetrieverFactory:
     @staticmethod
-    def create_retriever(config, embedding_model_name: str, documents: list):
-        if config.DEFAULT_RETRIEVER == "faiss":
-            embedding_model = EmbeddingModel(embedding_model_name)
-            retriever = Retriever(embedding_model)
-            retriever.build_index(documents)
+    def create_retriever(config, embedding_model_name: str, documents: list = None):
+        if config.DEFAULT_RETRIEVER in ("faiss", "hybrid"):
+            embedding_model = EmbeddingModel(embedding_model_name, config.EMBEDDING_CACHE_DIR)
+            if config.DEFAULT_RETRIEVER == "hybrid":
+                # BM25 indeksi FAISS ile aynı parçalardan kurulur; kayıtlı FAISS indeksi ortaktır
+                retriever = HybridRetriever(
+                    embedding_model, config.INDEX_TYPE, config.INDEX_PARAMS, config.QUERY_CACHE_SIZE,
+                    config.HYBRID_DENSE_TOP_K, config.HYBRID_SPARSE_TOP_K, config.RRF_K
+                )
+            else:
+                retriever = Retriever(embedding_model, config.INDEX_TYPE, config.INDEX_PARAMS, config.QUERY_CACHE_SIZE)
+            if documents is not None:
+                retriever.build_index(documents)
+                print(f"Vektör önbelleği: {embedding_model.cache_stats()}")
+                return retriever
+
+            # Belgeler verilmediyse kayıtlı indeksi yükle; yalnızca eklenen/değişen PDF'ler işlenir
+            index_dir = os.path.join(config.INDEX_DIRECTORY, "faiss")
+            stats = open_index(
+                retriever,
+                PDFLoader(
+                    config.PDF_DIRECTORY,
+                    config.PDF_WORKERS,
+                    config.PDF_PAGES_PER_TASK,
+                    config.PDF_FILE_TIMEOUT,
+                    text_cache_dir=config.TEXT_CACHE_DIR
+                ),
+                index_dir,
+                embedding_model_name,
+                config.CHUNK_SIZE,
+                config.CHUNK_OVERLAP,
+                config.INGEST_BATCH_SIZE,
+                # Float vektörleri olmayan eski nicemlenmiş indeksler yeniden kurulur
+                extra_settings={"index_type": config.INDEX_TYPE,
+                                **({"rescore_factor": retriever.rescore_factor()} if retriever.rescore_factor() else {})}
+            )
+            print(f"İndeks güncellendi: {stats}")
+            if config.INDEX_RECALL_CHECK:
+                print(f"İndeks doğruluğu: {retriever.recall_check(k=config.TOP_K)}")
+            print(f"Vektör önbelleği: {embedding_model.cache_stats()}")
             return retriever
         else:
             raise ValueError(f"Geçersiz retriever: {config.DEFAULT_RETRIEVER}")
\ No newline at end of file
@@ -0,0 +1,161 @@
+import argparse
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from config import Config
+from model.micro_batcher import MicroBatcher
+from model.rag_factory import RAGFactory
+
+MAX_BODY_BYTES = 1024 * 1024
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class RAGServer:
+    """
+    RAGSystem'i yerel bir HTTP servisi olarak sunar (yalnızca standart kütüphane).
+    Eşzamanlı /ask istekleri MicroBatcher ile toplanır ve
+    RAGSystem.answer_batch_with_sources ile birlikte cevaplanır; modeller
+    event loop dışında, worker thread'de çalışır.
+
+    Uç noktalar:
+        GET  /health  Süreç ayakta mı (modeller yüklenirken de 200).
+        GET  /ready   Modeller yüklendi mi (yüklenene kadar 503).
+        GET  /stats   Batch istatistikleri ve son batch'in aşama süreleri.
+        POST /ask     {"question": "...", "top_k": 3} -> {"answer": ..., "sources": [...]}
+                      top_k 1 ile SERVER_MAX_TOP_K arasında olmalı (değilse 400);
+                      cevaplama hata verirse 500 döner.
+    """
+
+    def __init__(self, config, rag_system=None):
+        self.config = config
+        self.rag_system = rag_system
+        self.load_error = None
+        self.batcher = MicroBatcher(
+            self._answer_batch,
+            max_batch_size=config.SERVER_MAX_BATCH_SIZE,
+            max_wait=config.SERVER_MAX_WAIT_MS / 1000
+        )
+
+    def load(self):
+        """Modelleri yükler; sunucu bu sırada /health isteklerine cevap verir."""
+        try:
+            self.rag_system = RAGFactory.create_rag_system(self.config)
+        except Exception as e:
+            self.load_error = str(e)
+            print(f"RAG sistemi yüklenemedi: {self.load_error}")
+
+    def _answer_batch(self, items):
+        # Aynı top_k'lı sorular tek çağrıda cevaplanır
+        groups = defaultdict(list)
+        for position, (question, top_k) in enumerate(items):
+            groups[top_k].append(position)
+        results = [None] * len(items)
+        for top_k, positions in groups.items():
+            # Hata özür cevabına dönüşmez; MicroBatcher onu isteklere iletir
+            answers = self.rag_system.answer_batch_with_sources(
+                [items[i][0] for i in positions], top_k, batch_size=len(positions), raise_errors=True
+            )
+            for i, (answer, sources) in zip(positions, answers):
+                results[i] = {
+                    "answer": answer,
+                    "sources": [{"text": text, "score": float(score)} for text, score in sources],
+                }
+        return results
+
+    async def _route(self, method, path, body):
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path == "/ready":
+            if self.rag_system is None:
+                return 503, {"ready": False, "error": self.load_error}
+            return 200, {"ready": True}
+        if path == "/stats":
+            timings = getattr(self.rag_system, "last_timings", {}) if self.rag_system else {}
+            return 200, {"batcher": self.batcher.stats(), "last_batch": timings}
+        if path == "/ask":
+            if method != "POST":
+                return 405, {"error": "POST bekleniyor"}
+            if self.rag_system is None:
+                return 503, {"error": "Modeller henüz yüklenmedi"}
+            try:
+                request = json.loads(body or b"{}")
+                question = request["question"]
+                top_k = int(request.get("top_k", self.config.TOP_K))
+            except (ValueError, KeyError, TypeError):
+                return 400, {"error": "Gövde {\"question\": str, \"top_k\": int} olmalı"}
+            if not isinstance(question, str) or not question.strip():
+                return 400, {"error": "question boş olamaz"}
+            if not 1 <= top_k <= self.config.SERVER_MAX_TOP_K:
+                return 400, {"error": f"top_k 1 ile {self.config.SERVER_MAX_TOP_K} arasında olmalı"}
+            try:
+                return 200, await self.batcher.submit((question, top_k))
+            except Exception as e:
+                print(f"Soru cevaplanırken bir hata oluştu: {str(e)}")
+                return 500, {"error": f"Soru cevaplanamadı: {str(e)}"}
+        return 404, {"error": "Bulunamadı"}
+
+    async def handle(self, reader, writer):
+        status, payload = 500, {"error": "Sunucu hatası"}
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", 0))
+            if len(request_line) < 2:
+                status, payload = 400, {"error": "Geçersiz istek"}
+            elif length > MAX_BODY_BYTES:
+                status, payload = 413, {"error": "İstek gövdesi çok büyük"}
+            else:
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await self._route(request_line[0].upper(), request_line[1].split("?")[0], body)
+        except Exception as e:
+            print(f"İstek işlenirken bir hata oluştu: {str(e)}")
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: close\r\n\r\n".encode("latin-1") + data
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def start(self, host, port):
+        await self.batcher.start()
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def serve(self, host, port):
+        server = await self.start(host, port)
+        print(f"RAG servisi dinleniyor: http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    config = Config()
+    parser = argparse.ArgumentParser(description="RAG HTTP servisi")
+    parser.add_argument("--host", default=config.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVER_PORT)
+    parser.add_argument("--retriever", choices=[value for _, value in config.RETRIEVER_OPTIONS],
+                        default=config.DEFAULT_RETRIEVER)
+    args = parser.parse_args()
+    config.DEFAULT_RETRIEVER = args.retriever
+
+    server = RAGServer(config)
+    # Modeller arka planda yüklenir; bu sırada /health 200, /ready 503 döner
+    threading.Thread(target=server.load, daemon=True).start()
+    asyncio.run(server.serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
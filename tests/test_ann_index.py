@@ -0,0 +1,48 @@
+import faiss
+import numpy as np
+from model import ann_index
+
+def test_ann_index_auto_selection():
+    # Korpus boyutuna göre indeks tipi seçimini test et
+    assert ann_index.resolve_index_type("auto", 1_000) == "flat", "Küçük korpus için flat seçilmedi!"
+    assert ann_index.resolve_index_type("auto", 500_000) == "hnsw", "Orta korpus için HNSW seçilmedi!"
+    assert ann_index.resolve_index_type("auto", 5_000_000) == "ivf_pq", "Büyük korpus için IVF-PQ seçilmedi!"
+    assert ann_index.resolve_index_type("ivf_flat", 10) == "ivf_flat", "Açık seçim korunmadı!"
+
+def test_ann_index_recall_against_flat():
+    # IVF ve HNSW indekslerinin flat indekse göre recall değerini test et
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((4000, 32)).astype(np.float32)
+    ids = np.arange(len(vectors), dtype=np.int64)
+    for index_type in ("ivf_flat", "hnsw"):
+        base = ann_index.create_index(32, index_type, len(vectors), {"nlist": 32})
+        ann_index.train_index(base, vectors, sample_size=2000)
+        index = faiss.IndexIDMap2(base)
+        index.add_with_ids(vectors, ids)
+        ann_index.set_search_params(index, {"nprobe": 32, "ef_search": 128})
+        result = ann_index.recall_at_k(index, vectors, ids, vectors[:50], k=10)
+        assert ann_index.index_type_of(index) == index_type, "İndeks tipi hatalı!"
+        assert result["recall_at_k"] > 0.9, f"{index_type} recall değeri düşük!"
+
+def test_quantized_index_with_rescoring():
+    # sq8/binary indekslerin daha az bellek kullandığını ve yeniden puanlamanın recall'u artırdığını test et
+    rng = np.random.default_rng(0)
+    # Gerçek embedding'ler gibi düşük içsel boyutlu veri
+    vectors = (rng.standard_normal((2000, 8)) @ rng.standard_normal((8, 64))).astype(np.float32)
+    ids = np.arange(len(vectors), dtype=np.int64)
+    queries = vectors[:50] + 0.1 * rng.standard_normal((50, 64)).astype(np.float32)
+    flat = faiss.IndexIDMap2(faiss.IndexFlatL2(64))
+    flat.add_with_ids(vectors, ids)
+    _, truth = flat.search(queries, 10)
+
+    def recall(found):
+        return np.mean([len(set(t) & set(f)) / 10 for t, f in zip(truth, found)])
+
+    for index_type, expected in (("sq8", 0.95), ("binary", 0.75)):
+        index = ann_index.rebuild_index(flat, index_type)
+        assert ann_index.index_type_of(index) == index_type, "İndeks tipi hatalı!"
+        assert faiss.downcast_index(index.index).code_size < 64 * 4, "Nicemlenmiş kod boyutu küçülmedi!"
+        _, direct = index.search(queries, 10)
+        _, candidates = index.search(queries, 40)
+        _, rescored = ann_index.rescore(queries, candidates, lambda found: vectors[found], 10)
+        assert recall(rescored) >= max(expected, recall(direct)), f"{index_type} yeniden puanlanmış recall değeri düşük!"
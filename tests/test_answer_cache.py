@@ -0,0 +1,23 @@
+import numpy as np
+from model.answer_cache import SemanticAnswerCache
+
+def test_answer_cache_returns_similar_question():
+    # Benzer soru için önbellekteki cevabın döndüğünü test et
+    cache = SemanticAnswerCache(threshold=0.95, capacity=4, ttl=60)
+    sources = [("Paris is the capital of France.", 0.9)]
+    cache.put(np.array([1.0, 0.0, 0.0]), "capital of France?", "Paris", sources, top_k=2, index_version=1)
+
+    assert cache.lookup(np.array([0.99, 0.05, 0.0]), top_k=2, index_version=1) == ("Paris", sources), "Benzer soru bulunamadı!"
+    assert cache.lookup(np.array([0.0, 1.0, 0.0]), top_k=2, index_version=1) is None, "Farklı soru önbellekten döndü!"
+    assert cache.lookup(np.array([1.0, 0.0, 0.0]), top_k=3, index_version=1) is None, "Farklı top_k önbellekten döndü!"
+    assert cache.stats()["hits"] == 1, "İsabet sayısı hatalı!"
+
+def test_answer_cache_invalidation():
+    # İndeks sürümü değişince ve süre dolunca önbelleğin temizlendiğini test et
+    cache = SemanticAnswerCache(threshold=0.9, capacity=4, ttl=60)
+    cache.put(np.array([1.0, 0.0]), "q", "a", [], top_k=2, index_version=1)
+    assert cache.lookup(np.array([1.0, 0.0]), top_k=2, index_version=2) is None, "İndeks değişince önbellek temizlenmedi!"
+
+    expired = SemanticAnswerCache(threshold=0.9, capacity=4, ttl=0)
+    expired.put(np.array([1.0, 0.0]), "q", "a", [], top_k=2)
+    assert expired.lookup(np.array([1.0, 0.0]), top_k=2) is None, "Süresi dolan cevap döndü!"
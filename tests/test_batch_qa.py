@@ -0,0 +1,72 @@
+import json
+
+from batch_qa import run_batch
+
+class CountingRAGSystem:
+    # Soruyu cevap olarak döndüren ve cevaplanan soruları kaydeden sahte RAG sistemi
+    def __init__(self, fail_on=None):
+        self.answered = []
+        self.last_timings = {}
+        self.fail_on = fail_on
+
+    def answer_batch_with_sources(self, queries, top_k=2, batch_size=8, raise_errors=False):
+        if self.fail_on in queries:
+            raise RuntimeError("model hatası")
+        self.answered.extend(queries)
+        self.last_timings = {"queries": len(queries), "cache_hits": 0, "retrieval": 0.1, "generation": 0.2}
+        return [(f"cevap: {query}", [("kaynak", 0.5)]) for query in queries]
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_run_batch_writes_answers_and_skips_invalid_lines(tmp_path):
+    # Cevapların, kaynakların ve süre bilgisinin yazıldığını, hatalı satırların işaretlendiğini test et
+    input_path = tmp_path / "questions.jsonl"
+    input_path.write_text('{"id": "a", "question": "bir"}\n\n"iki"\n{"soru": "yanlış"}\n', encoding="utf-8")
+    output_path = tmp_path / "answers.jsonl"
+    summary = run_batch(CountingRAGSystem(), str(input_path), str(output_path), batch_size=2, log=lambda _: None)
+
+    results = _read(output_path)
+    assert [result["line"] for result in results] == [0, 2, 3], "Satırlar eksik ya da sırasız yazıldı!"
+    assert results[0]["id"] == "a" and results[0]["answer"] == "cevap: bir", "Cevap yazılmadı!"
+    assert results[0]["sources"] == [{"text": "kaynak", "score": 0.5}], "Kaynaklar yazılmadı!"
+    assert results[1]["batch_timings"]["generation"] == 0.2, "Süreler yazılmadı!"
+    assert "error" in results[2], "Hatalı satır işaretlenmedi!"
+    assert summary["answered"] == 2 and summary["invalid"] == 1, "Özet hatalı!"
+
+def test_run_batch_resumes_after_crash(tmp_path):
+    # Yarım kalan çıktıda tamamlanmış satırların atlandığını, yarım kaydın tekrar işlendiğini test et
+    input_path = tmp_path / "questions.jsonl"
+    input_path.write_text("".join(json.dumps({"question": f"soru {i}"}) + "\n" for i in range(5)), encoding="utf-8")
+    output_path = tmp_path / "answers.jsonl"
+    run_batch(CountingRAGSystem(), str(input_path), str(output_path), batch_size=2, log=lambda _: None)
+
+    lines = output_path.read_text(encoding="utf-8").splitlines(keepends=True)
+    output_path.write_text("".join(lines[:2]) + lines[2][:10], encoding="utf-8")  # Çökme: üçüncü kayıt yarım
+    rag_system = CountingRAGSystem()
+    summary = run_batch(rag_system, str(input_path), str(output_path), batch_size=2, log=lambda _: None)
+
+    assert rag_system.answered == ["soru 2", "soru 3", "soru 4"], "Tamamlanmış satırlar tekrar işlendi!"
+    assert summary["resumed"] == 2, "Devam edilen satır sayısı hatalı!"
+    assert [result["line"] for result in _read(output_path)] == [0, 1, 2, 3, 4], "Çıktı dosyası bozuk!"
+
+def test_run_batch_retries_failed_batches_one_by_one(tmp_path):
+    # Hata veren grubun sorularının tek tek denendiğini, sürekli hata veren sorunun işaretlenip atlandığını test et
+    input_path = tmp_path / "questions.jsonl"
+    input_path.write_text("".join(json.dumps({"question": f"soru {i}"}) + "\n" for i in range(4)), encoding="utf-8")
+    output_path = tmp_path / "answers.jsonl"
+    rag_system = CountingRAGSystem(fail_on="soru 2")
+    summary = run_batch(rag_system, str(input_path), str(output_path), batch_size=2, log=lambda _: None)
+
+    results = _read(output_path)
+    assert rag_system.answered == ["soru 0", "soru 1", "soru 3"], "Gruptaki diğer soru cevaplanmadı!"
+    assert summary["failed"] == 1 and summary["answered"] == 3, "Başarısız soru özete yansımadı!"
+    assert [result["line"] for result in results] == [0, 1, 2, 3], "Çıktı dosyası eksik!"
+    assert "error" in results[2] and "answer" not in results[2], "Başarısız soru işaretlenmedi!"
+    assert results[3]["batch_timings"]["queries"] == 1, "Tek tek denenen sorunun süreleri yazılmadı!"
+    assert summary["generation_seconds"] == 0.2 * 2, "Özet süreleri hatalı!"
+
+    rag_system = CountingRAGSystem()
+    run_batch(rag_system, str(input_path), str(output_path), batch_size=2, log=lambda _: None)
+    assert rag_system.answered == [], "İşaretlenen soru tekrar denendi!"
@@ -0,0 +1,45 @@
+import numpy as np
+
+import faiss
+
+from benchmarks.scaling import SyntheticCorpus, exact_neighbors, markdown, run
+from model.langchain_retriever import dot_product_search
+
+def test_synthetic_corpus_is_nested_and_deterministic():
+    # Aynı tohumla büyük korpusun küçüğünü önek olarak içerdiğini test et
+    small = SyntheticCorpus(dim=16, block=100).vectors(250)
+    large = SyntheticCorpus(dim=16, block=100).vectors(500)
+    assert np.array_equal(small, large[:250]), "Korpuslar iç içe değil!"
+
+def test_exact_neighbors_scans_memmap_in_blocks(tmp_path):
+    # Bloklar halinde hesaplanan gerçek komşuların tam sıralamayla aynı olduğunu test et
+    corpus = SyntheticCorpus(dim=16, block=100)
+    vectors = corpus.write(str(tmp_path / "vectors.f32"), 250)
+    assert isinstance(vectors, np.memmap) and np.array_equal(vectors, corpus.vectors(250)), "Dosyaya yazılan korpus farklı!"
+    queries = corpus.queries(vectors, 10)
+    distances = ((queries[:, None, :] - vectors[None, :, :]) ** 2).sum(-1)
+    truth = exact_neighbors(vectors, queries, 5, faiss.METRIC_L2, block=64)
+    assert truth.tolist() == np.argsort(distances, axis=1)[:, :5].tolist(), "L2 komşuları hatalı!"
+    truth = exact_neighbors(vectors, queries, 5, faiss.METRIC_INNER_PRODUCT, block=64)
+    assert truth.tolist() == np.argsort(-(queries @ vectors.T), axis=1)[:, :5].tolist(), "İç çarpım komşuları hatalı!"
+
+def test_dot_product_search_matches_full_sort():
+    # argpartition ile seçilen sonuçların tam sıralamayla aynı olduğunu test et
+    rng = np.random.default_rng(0)
+    index = rng.standard_normal((300, 8)).astype(np.float32)
+    query = rng.standard_normal(8).astype(np.float32)
+    indices, scores = dot_product_search(index, query, 5)
+    assert indices.tolist() == np.argsort(-(index @ query))[:5].tolist(), "En benzer satırlar hatalı!"
+    assert np.all(np.diff(scores) <= 0), "Skorlar azalan sırada değil!"
+    assert len(dot_product_search(index[:3], query, 5)[0]) == 3, "Küçük indekste top_k sınırlanmadı!"
+
+def test_scaling_run_reports_every_target(tmp_path):
+    # Her boyut, hedef ve indeks tipi için bir satır üretildiğini ve korpus dosyalarının silindiğini test et
+    rows = run([1000, 2000], ["retriever", "langchain", "hyde"], ["flat", "sq8"], ["flat", "sq8"],
+               dim=32, num_queries=20, k=5, log=lambda _: None, work_dir=str(tmp_path))
+    assert list(tmp_path.iterdir()) == [], "Korpus dosyaları silinmedi!"
+    assert len(rows) == 2 * 5, "Satır sayısı hatalı!"
+    exact = [row for row in rows if row["index"] in ("flat", "numpy")]
+    assert all(row["recall_at_k"] == 1.0 for row in exact), "Tam aramanın recall'u 1 değil!"
+    assert all(row["index_mb"] > 0 for row in rows), "İndeks boyutu ölçülmedi!"
+    assert markdown(rows).count("\n") == len(rows) + 2, "Rapor tablosu hatalı!"
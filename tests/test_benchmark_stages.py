@@ -0,0 +1,38 @@
+from benchmarks.stages import compare, summarize, time_each
+
+def test_summarize_reports_percentiles_and_throughput():
+    # Yüzdeliklerin ve saniyedeki iş miktarının hesaplandığını test et
+    row = summarize([10.0] * 99 + [1000.0], items_per_sample=2, unit="chunks")
+    assert row["runs"] == 100 and row["p50_ms"] == 10.0, "p50 hatalı!"
+    assert row["p99_ms"] > row["p95_ms"] >= 10.0, "Kuyruk yüzdelikleri hatalı!"
+    assert abs(row["throughput"] - 2 * 1000 / row["mean_ms"]) < 1e-9, "Throughput hatalı!"
+    assert row["unit"] == "chunks/s", "Birim hatalı!"
+
+def test_time_each_takes_one_sample_per_input():
+    # Her girdi için bir ölçüm alındığını ve ısınma çağrısının ölçülmediğini test et
+    calls = []
+    samples = time_each(calls.append, ["a", "b", "c"], warmup=1)
+    assert len(samples) == 3, "Ölçüm sayısı hatalı!"
+    assert calls == ["a", "a", "b", "c"], "Isınma çağrısı yapılmadı!"
+
+def test_compare_flags_only_real_regressions():
+    # Tolerans ve en küçük fark eşiğini aşan yavaşlamaların işaretlendiğini test et
+    baseline = {"retrieve": {"p50_ms": 10.0, "p95_ms": 20.0}, "chunk_text": {"p50_ms": 0.5, "p95_ms": 0.6}}
+    results = {
+        "retrieve": {"p50_ms": 11.0, "p95_ms": 30.0},
+        "chunk_text": {"p50_ms": 1.0, "p95_ms": 1.2},
+        "generate": {"p50_ms": 500.0, "p95_ms": 900.0},
+    }
+    regressions = compare(results, baseline, tolerance=0.2)
+    assert [(row["stage"], row["metric"]) for row in regressions] == [("retrieve", "p95_ms")], \
+        "Yavaşlamalar yanlış işaretlendi!"
+    assert abs(regressions[0]["change"] - 0.5) < 1e-9, "Değişim oranı hatalı!"
+
+def test_summarize_reports_peak_rss_growth():
+    # Aşama başındaki tepe bellek verildiğinde büyümenin ayrıca raporlandığını test et
+    row = summarize([1.0], items_per_sample=1, unit="queries", rss_before_mb=0.0)
+    if row["peak_rss_mb"] is None:  # resource modülü olmayan platformlar
+        assert row["peak_rss_growth_mb"] is None, "Bellek büyümesi hatalı!"
+    else:
+        assert row["peak_rss_growth_mb"] == row["peak_rss_mb"], "Bellek büyümesi hatalı!"
+    assert summarize([1.0], 1, "queries")["peak_rss_growth_mb"] is None, "Başlangıç olmadan büyüme hesaplandı!"
@@ -0,0 +1,27 @@
+from model.bm25_index import BM25Index, tokenize
+
+def test_tokenize_keeps_identifiers():
+    # arXiv kimlikleri ve model adlarının bölünmediğini test et
+    assert tokenize("See arXiv 2411.19865v1 and GPT2-Medium.") == ["see", "arxiv", "2411.19865v1", "and", "gpt2-medium"], "Tokenizasyon hatalı!"
+
+def test_bm25_ranks_exact_terms_first():
+    # Tam terim eşleşmesinin öne çıktığını ve silinen belgelerin atlandığını test et
+    documents = [
+        "Dense retrieval uses embeddings for semantic search.",
+        "HyDE generates hypothetical documents for retrieval.",
+        None,
+        "BM25 scores exact terms such as HyDE and FAISS.",
+    ]
+    index = BM25Index()
+    index.build(documents)
+    results = index.search("What is HyDE?", top_k=5)
+    assert [doc_id for doc_id, _ in results] == [1, 3], "BM25 sıralaması hatalı!"
+    assert results[0][1] > results[1][1] > 0, "BM25 skorları hatalı!"
+    assert index.search("unknown words", top_k=5) == [], "Eşleşmeyen sorgu sonuç döndürdü!"
+    assert index.stats()["documents"] == 4, "Belge sayısı hatalı!"
+
+def test_bm25_top_k_limit():
+    # top_k sınırının uygulandığını test et
+    index = BM25Index()
+    index.build([f"common term {i}" for i in range(20)])
+    assert len(index.search("common", top_k=3)) == 3, "top_k uygulanmadı!"
@@ -0,0 +1,28 @@
+import numpy as np
+from model.context_compressor import ExtractiveCompressor, split_sentences
+
+KEYWORDS = ["paris", "london", "rain"]
+
+def keyword_encode(texts):
+    # Anahtar kelime sayılarını vektör olarak kullanan sahte embedding
+    return np.array([[text.lower().count(word) + 0.01 for word in KEYWORDS] for text in texts], dtype=np.float32)
+
+def test_split_sentences():
+    # Cümle bölmenin noktalama işaretlerine göre yapıldığını test et
+    assert split_sentences("One. Two? Three!  Four") == ["One.", "Two?", "Three!", "Four"], "Cümle bölme hatalı!"
+
+def test_compressor_keeps_most_similar_sentences_in_order():
+    # Soruya en yakın cümlelerin orijinal sırasıyla korunduğunu test et
+    compressor = ExtractiveCompressor(keyword_encode, ratio=0.5)
+    texts = ["Paris is in France. It rains in London.", "London has a river. Paris has museums."]
+    compressed, stats = compressor.compress("Tell me about Paris", texts)
+    assert compressed == ["Paris is in France.", "Paris has museums."], "Yanlış cümleler korundu!"
+    assert stats["sentences"] == 4 and stats["kept"] == 2, "Cümle sayıları hatalı!"
+    assert stats["compressed_tokens"] < stats["original_tokens"], "Sıkıştırma token azaltmadı!"
+
+def test_compressor_token_budget_and_documents():
+    # Token bütçesinin uygulandığını ve boş kalan belgelerin atıldığını test et
+    compressor = ExtractiveCompressor(keyword_encode, token_budget=5)
+    documents = [("It rains in London today.", 0.9), ("Paris is lovely.", 0.8)]
+    compressed = compressor.compress_documents("Paris", documents)
+    assert compressed == [("Paris is lovely.", 0.8)], "Bütçe ya da belge atma hatalı!"
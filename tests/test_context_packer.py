@@ -0,0 +1,25 @@
+from model.context_packer import ContextPacker
+
+class WordTokenizer:
+    # Her kelimeyi bir token sayan basit tokenizer
+    def encode(self, text, add_special_tokens=False):
+        return text.split()
+
+def test_context_packer_keeps_documents_within_budget():
+    # Sığan belgelerin aynen, taşanın cümle sınırında kesildiğini test et
+    packer = ContextPacker(WordTokenizer(), token_budget=30, max_new_tokens=10)
+    texts = ["one two three four five.", "Six seven eight. Nine ten eleven twelve thirteen.", "Fourteen fifteen."]
+    segments, stats = packer.pack("Header text", texts, "Question here")
+    assert segments[0] == "[Document 1]\none two three four five.\n", "İlk belge değişmemeli!"
+    assert segments[1] == "[Document 2]\nSix seven eight.\n", "Belge cümle sınırında kesilmedi!"
+    assert len(segments) == 2, "Taşan belgeden sonraki belgeler atılmalı!"
+    assert stats["prompt_tokens"] <= 30 - 10, "Token bütçesi aşıldı!"
+    assert stats["saved_tokens"] == stats["original_context_tokens"] - stats["context_tokens"] > 0, "Tasarruf hesabı hatalı!"
+    assert stats["trimmed"] == 1 and stats["dropped"] == 1, "Kesilen/atılan belge sayısı hatalı!"
+
+def test_context_packer_leaves_small_context_untouched():
+    # Bütçeye sığan bağlamın değişmediğini test et
+    packer = ContextPacker(WordTokenizer(), token_budget=1024, max_new_tokens=50)
+    segments, stats = packer.pack("Header", ["a b c.", "d e f."], "Question")
+    assert segments == ["[Document 1]\na b c.\n", "[Document 2]\nd e f.\n"], "Belgeler değişmemeli!"
+    assert stats["saved_tokens"] == 0, "Tasarruf sıfır olmalı!"
@@ -0,0 +1,45 @@
+import numpy as np
+from model.embedding_cache import EmbeddingCache
+
+def fake_encode(texts):
+    # Metin uzunluğuna göre deterministik vektör üret
+    return np.array([[len(t), len(t) * 2.0, 1.0] for t in texts], dtype=np.float32)
+
+def test_embedding_cache_hits_and_misses(tmp_path):
+    # Yalnızca önbellekte olmayan metinlerin encode edildiğini test et
+    calls = []
+    def encode(texts):
+        calls.append(list(texts))
+        return fake_encode(texts)
+
+    cache = EmbeddingCache(str(tmp_path), "test/model")
+    first = cache.encode(["a", "bb", "a"], encode)
+    second = cache.encode(["bb", "ccc"], encode)
+    assert calls == [["a", "bb"], ["ccc"]], "Önbellekteki metinler tekrar encode edildi!"
+    assert first.shape == (3, 3) and first.dtype == np.float32, "Vektör boyutu hatalı!"
+    assert np.allclose(second, fake_encode(["bb", "ccc"])), "Önbellekten dönen vektörler hatalı!"
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 4, "İsabet sayıları hatalı!"
+
+def test_embedding_cache_persists_on_disk(tmp_path):
+    # Önbelleğin yeni bir örnekte diskten okunduğunu test et
+    EmbeddingCache(str(tmp_path), "test/model").encode(["persist me"], fake_encode)
+    cache = EmbeddingCache(str(tmp_path), "test/model")
+    result = cache.encode(["persist me"], lambda texts: (_ for _ in ()).throw(AssertionError("encode çağrılmamalı")))
+    assert np.allclose(result, fake_encode(["persist me"])), "Diskteki vektör hatalı!"
+    assert cache.stats()["hit_rate"] == 1.0, "Diskteki önbellek kullanılmadı!"
+
+def test_embedding_cache_recovers_from_partial_write(tmp_path):
+    # Çökmeden kalan anahtarsız vektörlerin ve yarım anahtar satırının atıldığını test et
+    cache = EmbeddingCache(str(tmp_path), "test/model")
+    cache.encode(["a"], fake_encode)
+    with open(cache.vectors_path, "ab") as f:
+        f.write(np.full((1, 3), 99, dtype=np.float32).tobytes())
+    with open(cache.keys_path, "a", encoding="ascii") as f:
+        f.write(cache.key("yarım")[:10])
+
+    recovered = EmbeddingCache(str(tmp_path), "test/model")
+    assert recovered.stats()["entries"] == 1, "Yarım kayıt önbellekte kaldı!"
+    result = recovered.encode(["hello", "a"], fake_encode)
+    assert np.allclose(result, fake_encode(["hello", "a"])), "Çökmeden sonra yanlış vektör döndü!"
+    again = EmbeddingCache(str(tmp_path), "test/model")
+    assert np.allclose(again.encode(["hello"], fake_encode), fake_encode(["hello"])), "Kurtarılan önbellek bozuk!"
@@ -0,0 +1,14 @@
+from model.fusion import reciprocal_rank_fusion
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    # İki listede de üst sıralarda olan belgenin öne çıktığını test et
+    dense = [("a", 0.9), ("b", 0.8), ("c", 0.7)]
+    sparse = [("b", 12.0), ("d", 10.0), ("a", 3.0)]
+    fused = reciprocal_rank_fusion([dense, sparse], top_k=3)
+    assert [text for text, _ in fused] == ["b", "a", "d"], "Birleştirilmiş sıralama hatalı!"
+    assert fused[0][1] == 1 / 62 + 1 / 61, "RRF skoru hatalı!"
+
+def test_reciprocal_rank_fusion_handles_empty_lists():
+    # Boş sonuç listelerinin sorun çıkarmadığını test et
+    assert reciprocal_rank_fusion([[], []], top_k=5) == [], "Boş listeler boş sonuç vermeli!"
+    assert reciprocal_rank_fusion([[("a", 1.0)], []], top_k=5) == [("a", 1 / 61)], "Tek liste birleştirmesi hatalı!"
@@ -0,0 +1,33 @@
+import numpy as np
+from model.hyde_cache import HypotheticalDocumentCache
+
+def test_hyde_cache_persists_documents(tmp_path):
+    # Hipotetik belgenin ve embedding'in diskten geri okunduğunu test et
+    path = str(tmp_path / "hyde.sqlite3")
+    key = HypotheticalDocumentCache.make_key("What is AI?", "gpt2", "template", 512)
+    HypotheticalDocumentCache(path).put(key, "AI is ...", np.array([0.6, 0.8], dtype=np.float32))
+
+    cache = HypotheticalDocumentCache(path)
+    same_key = HypotheticalDocumentCache.make_key("  What is  AI", "gpt2", "template", 512)
+    assert cache.get(HypotheticalDocumentCache.make_key("what is ai", "gpt2", "template", 512)) is None, \
+        "Büyük-küçük harf farkı aynı anahtara düştü!"
+    document, embedding = cache.get(same_key)
+    assert document == "AI is ...", "Hipotetik belge hatalı!"
+    assert np.allclose(embedding, [0.6, 0.8]), "Embedding hatalı!"
+    assert cache.get(HypotheticalDocumentCache.make_key("What is AI?", "gpt2", "template", 256)) is None, "Farklı ayar için kayıt döndü!"
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2, "İsabet sayıları hatalı!"
+
+def test_hyde_cache_evicts_oldest(tmp_path):
+    # Boyut sınırı aşılınca en eski kaydın silindiğini test et
+    cache = HypotheticalDocumentCache(str(tmp_path / "hyde.sqlite3"), max_entries=2)
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.put(key, f"doc {i}", np.zeros(2, dtype=np.float32))
+    assert cache.get("a") is None, "En eski kayıt silinmedi!"
+    assert cache.get("c") is not None, "Yeni kayıt bulunamadı!"
+    assert cache.stats()["size"] == 2, "Önbellek boyutu hatalı!"
+
+def test_hyde_cache_key_includes_hypothesis_count():
+    # Çoklu hipotez ayarının ayrı anahtar ürettiğini test et
+    single = HypotheticalDocumentCache.make_key("What is AI?", "gpt2", "template", 512)
+    assert single == HypotheticalDocumentCache.make_key("What is AI?", "gpt2", "template", 512, num_hypotheses=1), "Varsayılan anahtar değişti!"
+    assert single != HypotheticalDocumentCache.make_key("What is AI?", "gpt2", "template", 512, num_hypotheses=4), "Hipotez sayısı anahtara eklenmedi!"
\ No newline at end of file
@@ -1,4 +1,6 @@
 from model.hyde_retriever import HyDERetriever
+from model.query_cache import QueryEmbeddingCache
+import numpy as np
 import os
 
 def test_hyde_retriever_initialization():
@@ -36,4 +38,91 @@ def test_hyde_retriever_retrieve():
     )
     results, hypothetical_doc = retriever.retrieve("What is AI?", k=2)
     assert len(results) == 2, "HyDE retriever sonuç sayısı hatalı!"
-    assert isinstance(hypothetical_doc, str), "Hipotetik belge string değil!"
\ No newline at end of file
+    assert isinstance(hypothetical_doc, str), "Hipotetik belge string değil!"
+
+def test_hyde_retriever_multiple_hypotheses():
+    # Birden fazla hipotetik belgenin tek çağrıda üretilip ortalandığını test et
+    retriever = HyDERetriever(
+        files_path="data/pdfs",
+        chunk_size=64,
+        chunk_overlap=16,
+        language_model_name="gpt2-medium",
+        embedding_model_name="sentence-transformers/all-mpnet-base-v2",
+        num_hypotheses=3
+    )
+    documents = retriever.generate_hypothetical_documents("What is AI?", 3, max_new_tokens=16)
+    assert len(documents) == 3, "Hipotetik belge sayısı hatalı!"
+    results, hypothetical_doc = retriever.retrieve("What is AI?", k=2)
+    assert len(results) == 2, "HyDE retriever sonuç sayısı hatalı!"
+
+class OneHotEmbeddings:
+    # Model indirmeden test için her metni kendi eksenine yerleştiren sahte embedding
+    def encode(self, texts):
+        return np.array([np.eye(8, dtype=np.float32)[int(t.split()[-1])] + 0.1 for t in texts])
+
+    encode_queries = encode
+
+def _bare_retriever(index_type):
+    # Dil ve embedding modeli yüklemeden yalnızca indeks katmanını kur
+    retriever = HyDERetriever.__new__(HyDERetriever)
+    retriever.embeddings = OneHotEmbeddings()
+    retriever.index_type, retriever.index_params, retriever.index_version = index_type, {}, 0
+    retriever.reset()
+    return retriever
+
+def test_hyde_retriever_remove_ids_on_hnsw():
+    # Silmeyi desteklemeyen HNSW indeksinde silinen parçaların dönmediğini test et
+    retriever = _bare_retriever("hnsw")
+    retriever.add_documents([f"parça {i}" for i in range(8)])
+    retriever.optimize_index()
+    retriever.remove_ids([3])
+    query = retriever.embeddings.encode(["soru 3"])
+    results = retriever._search(query, 3)[0]
+    assert len(results) == 3 and all(text != "parça 3" for text, _ in results), "Silinen parça döndü!"
+    retriever.remove_ids([0, 1])
+    assert retriever.index.ntotal == 5 and retriever.dangling == 0, "HNSW indeksi sıkıştırılmadı!"
+
+def test_hyde_retriever_deadline_falls_back_on_generation_error():
+    # Hipotetik belge üretimi hata verdiğinde doğrudan sonuçların döndüğünü test et
+    retriever = _bare_retriever("flat")
+    retriever.query_cache = QueryEmbeddingCache(0)
+    retriever._executor = None
+    retriever.deadline_grace = 0.25
+    retriever.add_documents([f"parça {i}" for i in range(8)])
+
+    def failing_generation(*args):
+        raise RuntimeError("üretim hatası")
+
+    retriever._hypothetical_embeddings = failing_generation
+    results, hypothetical_doc = retriever.retrieve_with_deadline("soru 3", k=2, time_budget=1.0)
+    assert results[0][0] == "parça 3" and hypothetical_doc == "", "Hata durumunda doğrudan sonuçlar dönmedi!"
+
+class BatchLanguageModel:
+    # Sorudaki sayıyı taşıyan hipotetik belge üreten ve çağrıları kaydeden sahte dil modeli
+    model_name = "sahte"
+
+    def __init__(self):
+        self.batches = []
+
+    def generate_batch(self, prompts, max_new_tokens=50, batch_size=8, max_time=None):
+        self.batches.append(list(prompts))
+        return [f"hipotez {prompt.split()[-1]}" for prompt in prompts]
+
+class NumberPrompt:
+    # Soruyu olduğu gibi prompt yapan sahte şablon
+    template = "{query}"
+
+    def format(self, query, chunk_size):
+        return query
+
+def test_hyde_retriever_batch_generates_in_one_call():
+    # Toplu getirmede hipotetik belgelerin tek generate_batch çağrısıyla üretildiğini test et
+    retriever = _bare_retriever("flat")
+    retriever.query_cache = QueryEmbeddingCache(16)
+    retriever.llm, retriever.hyde_prompt, retriever.hyde_cache = BatchLanguageModel(), NumberPrompt(), None
+    retriever.chunk_size, retriever.num_hypotheses = 32, 1
+    retriever.add_documents([f"parça {i}" for i in range(8)])
+    results = retriever.retrieve_batch(["soru 2", "soru 5", "soru 6"], k=1)
+    assert retriever.llm.batches == [["soru 2", "soru 5", "soru 6"]], "Üretim toplu yapılmadı!"
+    assert [docs[0][0] for docs, _ in results] == ["parça 2", "parça 5", "parça 6"], "Sonuçlar hatalı!"
+    assert retriever.query_cache.stats()["size"] == 0, "Hipotetik belgeler sorgu önbelleğine yazıldı!"
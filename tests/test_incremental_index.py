@@ -0,0 +1,96 @@
+import shutil
+import numpy as np
+from data_loader.pdf_loader import PDFLoader
+from model.incremental_index import open_index
+from model.retriever import Retriever
+
+class HashingEmbeddingModel:
+    # Model indirmeden test için deterministik embedding
+    def __init__(self):
+        self.encoded = 0
+
+    def encode(self, texts):
+        self.encoded += len(texts)
+        return np.array([[hash(t) % 97, len(t), t.count("e")] for t in texts], dtype=np.float32)
+
+    def encode_queries(self, texts):
+        return np.array([[hash(t) % 97, len(t), t.count("e")] for t in texts], dtype=np.float32)
+
+def test_incremental_index_only_embeds_changed_files(tmp_path):
+    # Yalnızca eklenen dosyaların işlendiğini ve silinen dosyaların parçalarının kaldırıldığını test et
+    pdf_dir = tmp_path / "pdfs"
+    pdf_dir.mkdir()
+    shutil.copy("data/pdfs/2411.19865v1.pdf", pdf_dir / "a.pdf")
+    index_dir = str(tmp_path / "index")
+
+    model = HashingEmbeddingModel()
+    first = open_index(Retriever(model), PDFLoader(str(pdf_dir)), index_dir, "test", 500, 100)
+    assert first["added"] == 1 and first["new_chunks"] > 0, "İlk indeks oluşturulamadı!"
+
+    unchanged = open_index(Retriever(model), PDFLoader(str(pdf_dir)), index_dir, "test", 500, 100)
+    assert unchanged["new_chunks"] == 0, "Değişmeyen dosyalar yeniden işlendi!"
+
+    shutil.copy("data/pdfs/2412.08905v1.pdf", pdf_dir / "b.pdf")
+    (pdf_dir / "a.pdf").unlink()
+    retriever = Retriever(model)
+    stats = open_index(retriever, PDFLoader(str(pdf_dir)), index_dir, "test", 500, 100)
+    assert stats["added"] == 1 and stats["removed"] == 1, "Dosya değişiklikleri algılanmadı!"
+    assert stats["removed_chunks"] == first["new_chunks"], "Silinen dosyanın parçaları kaldırılmadı!"
+    assert retriever.index.ntotal == stats["new_chunks"], "İndeksteki parça sayısı hatalı!"
+
+def _sync_twice(tmp_path, index_type):
+    pdf_dir = tmp_path / "pdfs"
+    pdf_dir.mkdir()
+    shutil.copy("data/pdfs/2411.19865v1.pdf", pdf_dir / "a.pdf")
+    index_dir = str(tmp_path / "index")
+    model = HashingEmbeddingModel()
+    open_index(Retriever(model, index_type), PDFLoader(str(pdf_dir)), index_dir, "test", 500, 100)
+
+    shutil.copy("data/pdfs/2412.08905v1.pdf", pdf_dir / "b.pdf")
+    (pdf_dir / "a.pdf").unlink()
+    retriever = Retriever(model, index_type)
+    stats = open_index(retriever, PDFLoader(str(pdf_dir)), index_dir, "test", 500, 100)
+    return retriever, stats
+
+def test_incremental_index_updates_saved_ivf_index(tmp_path):
+    # Kaydedilip yüklenen IVF indeksine parça eklenip silinebildiğini test et
+    retriever, stats = _sync_twice(tmp_path, "ivf_flat")
+    assert stats["added"] == 1 and stats["removed"] == 1, "Dosya değişiklikleri uygulanmadı!"
+    assert retriever.index.ntotal == stats["new_chunks"], "Silinen parçalar IVF indeksinde kaldı!"
+    assert retriever.dangling == 0, "IVF indeksinden silme yapılamadı!"
+
+def test_incremental_index_compacts_hnsw_after_removals(tmp_path):
+    # HNSW'de silinen parçalar çoğalınca indeksin yeniden kurulduğunu test et
+    retriever, stats = _sync_twice(tmp_path, "hnsw")
+    assert retriever.index.ntotal == stats["new_chunks"], "Silinen parçalar HNSW indeksinde kaldı!"
+    assert retriever.dangling == 0, "HNSW indeksi sıkıştırılmadı!"
+    assert all(doc is not None for doc, _ in retriever.retrieve("deep learning", top_k=5)), "Silinmiş parça döndü!"
+
+def test_incremental_index_compacts_removed_ids(tmp_path, monkeypatch):
+    # Değişen dosyaların eski kimliklerinin birikmediğini ve dosyaların bir kez hash'lendiğini test et
+    import data_loader.pdf_loader as pdf_loader_module
+    hashed = []
+    monkeypatch.setattr(pdf_loader_module, "file_sha256", lambda path: hashed.append(path) or "x")
+    pdf_dir = tmp_path / "pdfs"
+    pdf_dir.mkdir()
+    shutil.copy("data/pdfs/2411.19865v1.pdf", pdf_dir / "a.pdf")
+    shutil.copy("data/pdfs/2412.08905v1.pdf", pdf_dir / "b.pdf")
+    index_dir = str(tmp_path / "index")
+    text_cache = str(tmp_path / "text_cache")
+    model = HashingEmbeddingModel()
+    open_index(Retriever(model), PDFLoader(str(pdf_dir), text_cache_dir=text_cache), index_dir, "test", 500, 100)
+
+    for source in ("data/pdfs/2412.08905v1.pdf", "data/pdfs/2411.19865v1.pdf"):
+        shutil.copy(source, pdf_dir / "a.pdf")
+        retriever = Retriever(model)
+        stats = open_index(retriever, PDFLoader(str(pdf_dir), text_cache_dir=text_cache), index_dir, "test", 500, 100)
+        assert stats["changed"] == 1 and stats["compacted"], "Silinen kimlikler sıkıştırılmadı!"
+        assert None not in retriever.documents, "Silinen parçalar belge deposunda kaldı!"
+        assert len(retriever.documents) == retriever.index.ntotal, "Kimlik alanı büyümeye devam ediyor!"
+
+    manifest = retriever.load(index_dir)
+    ids = sorted(i for state in manifest["files"].values() for i in state["chunk_ids"])
+    assert ids == list(range(len(retriever.documents))), "Dosyaların parça kimlikleri yeniden numaralandırılmadı!"
+    doc, _ = retriever.retrieve(retriever.documents[5], top_k=1)[0]
+    assert doc == retriever.documents[5], "Yeniden numaralandırılan indeks yanlış parça döndürdü!"
+    assert hashed == [], "Dosyalar manifest taramasından sonra tekrar hash'lendi!"
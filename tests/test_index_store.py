@@ -0,0 +1,66 @@
+import faiss
+import numpy as np
+from model import ann_index, index_store
+
+def test_index_store_save_and_load(tmp_path):
+    # Kaydedilen indeksin ve parçaların geri yüklenmesini test et
+    index = faiss.IndexFlatL2(4)
+    index.add(np.eye(4, dtype=np.float32))
+    chunks = ["bir", "iki", "üç", "dört"]
+    manifest = {"embedding_model": "test", "chunk_size": 10, "chunk_overlap": 2, "files": {}}
+    index_store.save_snapshot(str(tmp_path), index, chunks, manifest)
+
+    loaded_index, loaded_chunks, loaded_manifest = index_store.load_snapshot(str(tmp_path))
+    assert loaded_index.ntotal == 4, "İndeks boyutu hatalı!"
+    assert loaded_chunks == chunks, "Parçalar hatalı yüklendi!"
+    _, indices = loaded_index.search(np.eye(4, dtype=np.float32)[2:3], 1)
+    assert indices[0][0] == 2, "Yüklenen indeks arama yapamıyor!"
+
+def test_index_store_reads_index_once(tmp_path, monkeypatch):
+    # İndeks dosyasının tek kez okunduğunu, yalnızca flat ve nicemlenmiş indekslerin bellek eşlemeli açıldığını test et
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((600, 16)).astype(np.float32)
+    flags = []
+    read_index = faiss.read_index
+    monkeypatch.setattr(faiss, "read_index", lambda path, *args: flags.append(args) or read_index(path, *args))
+    manifest = {"embedding_model": "test", "chunk_size": 10, "chunk_overlap": 2, "files": {}}
+    for index_type, metric, mapped in (("flat", faiss.METRIC_L2, True), ("flat", faiss.METRIC_INNER_PRODUCT, True),
+                                       ("sq8", faiss.METRIC_L2, True), ("binary", faiss.METRIC_L2, True),
+                                       ("hnsw", faiss.METRIC_L2, False), ("ivf_flat", faiss.METRIC_L2, False)):
+        flat = faiss.IndexIDMap2(faiss.IndexFlat(16, metric))
+        flat.add_with_ids(vectors, np.arange(len(vectors), dtype=np.int64))
+        index = ann_index.rebuild_index(flat, index_type, {"nlist": 8}, metric) if index_type != "flat" else flat
+        index_store.save_snapshot(str(tmp_path), index, ["x"] * len(vectors), manifest)
+        flags.clear()
+        loaded, _, _ = index_store.load_snapshot(str(tmp_path))
+        assert flags == [(faiss.IO_FLAG_MMAP,) if mapped else ()], f"{index_type} indeksi yanlış okundu!"
+        assert ann_index.index_type_of(loaded) == index_type and loaded.ntotal == len(vectors), "Yüklenen indeks hatalı!"
+
+def test_index_store_manifest_mismatch(tmp_path):
+    # Parçalama ayarı değişince kaydın geçersiz sayılmasını test et
+    pdf_dir = tmp_path / "pdfs"
+    pdf_dir.mkdir()
+    (pdf_dir / "a.pdf").write_bytes(b"%PDF-1.4 test")
+    manifest = index_store.build_manifest("test", 500, 100, str(pdf_dir))
+    index = faiss.IndexFlatL2(2)
+    index_store.save_snapshot(str(tmp_path / "index"), index, [], manifest)
+
+    assert index_store.manifest_matches(str(tmp_path / "index"), manifest), "Geçerli kayıt tanınmadı!"
+    changed = index_store.build_manifest("test", 400, 100, str(pdf_dir))
+    assert not index_store.manifest_matches(str(tmp_path / "index"), changed), "Değişen ayar fark edilmedi!"
+    (pdf_dir / "a.pdf").write_bytes(b"%PDF-1.4 changed")
+    changed = index_store.build_manifest("test", 500, 100, str(pdf_dir))
+    assert not index_store.manifest_matches(str(tmp_path / "index"), changed), "Değişen dosya fark edilmedi!"
+
+def test_float_vectors_memory_mapped(tmp_path):
+    # Float vektörlerin diske yazılıp bellek eşlemeli okunduğunu ve eklemelerin korunduğunu test et
+    vectors = index_store.FloatVectors(3)
+    vectors.append(np.arange(6, dtype=np.float32).reshape(2, 3))
+    vectors.save(str(tmp_path / index_store.VECTORS_FILE))
+    vectors.append(np.full((1, 3), 9, dtype=np.float32))
+    assert len(vectors) == 3, "Vektör sayısı hatalı!"
+    assert np.array_equal(vectors.get(np.array([2, 0])), [[9, 9, 9], [0, 1, 2]]), "Vektörler hatalı okundu!"
+
+    loaded = index_store.load_vectors(str(tmp_path), 3)
+    assert isinstance(loaded.mapped, np.memmap), "Vektörler bellek eşlemeli açılmadı!"
+    assert len(loaded) == 2, "Kaydedilen vektör sayısı hatalı!"
\ No newline at end of file
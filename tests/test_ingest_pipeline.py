@@ -0,0 +1,28 @@
+import numpy as np
+from data_loader.pdf_loader import PDFLoader
+from model.ingest_pipeline import stream_index
+from model.retriever import Retriever
+
+class BatchRecordingEmbeddingModel:
+    # Her encode çağrısının boyutunu kaydeden sahte model
+    def __init__(self):
+        self.batch_sizes = []
+
+    def encode(self, texts):
+        self.batch_sizes.append(len(texts))
+        return np.array([[len(t), t.count("a"), t.count("e")] for t in texts], dtype=np.float32)
+
+def test_stream_index_encodes_fixed_size_batches():
+    # Akışlı indekslemenin sabit boyutlu gruplarla tüm parçaları eklediğini test et
+    pdf_loader = PDFLoader("data/pdfs")
+    filenames = pdf_loader.pdf_files()[:2]
+    model = BatchRecordingEmbeddingModel()
+    retriever = Retriever(model)
+    retriever.reset()
+    chunk_ids, failed, stats = stream_index(retriever, pdf_loader, filenames, 500, 100, batch_size=32)
+
+    expected = pdf_loader.chunk_text(pdf_loader.load_pdfs()[:2], 500, 100)
+    assert failed == [], "Hatalı dosya bildirildi!"
+    assert retriever.documents == expected, "Akışlı indeksleme farklı parçalar üretti!"
+    assert max(model.batch_sizes) <= 32, "Grup boyutu aşıldı!"
+    assert stats["chunks"] == retriever.index.ntotal == sum(len(ids) for ids in chunk_ids.values()), "Parça sayısı hatalı!"
@@ -0,0 +1,58 @@
+import torch
+from transformers import GPT2Config, GPT2LMHeadModel
+from model.kv_cache import PrefixKVCache, cache_nbytes
+
+def _tiny_model():
+    return GPT2LMHeadModel(GPT2Config(vocab_size=32, n_layer=1, n_head=2, n_embd=8)).eval()
+
+def _prefill(model, token_ids):
+    with torch.no_grad():
+        return model(input_ids=torch.tensor([token_ids]), use_cache=True).past_key_values
+
+def test_prefix_kv_cache_returns_longest_prefix():
+    # Parça sınırında biten en uzun önekin döndüğünü test et
+    model = _tiny_model()
+    cache = PrefixKVCache(max_bytes=10 ** 7)
+    cache.put([1, 2, 3], _prefill(model, [1, 2, 3]))
+    cache.put([1, 2, 3, 4, 5], _prefill(model, [1, 2, 3, 4, 5]))
+
+    length, past_key_values = cache.lookup([1, 2, 3, 4, 5, 6], boundaries=[3, 5])
+    assert length == 5, "En uzun önek bulunamadı!"
+    assert past_key_values.get_seq_length() == 5, "KV durumu uzunluğu hatalı!"
+    assert cache.lookup([1, 2, 9, 4, 5, 6], boundaries=[3, 5]) == (0, None), "Farklı önek eşleşti!"
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1, "İsabet sayıları hatalı!"
+
+def test_prefix_kv_cache_respects_memory_budget():
+    # Bellek sınırı aşılınca en eski kaydın silindiğini test et
+    model = _tiny_model()
+    entry_size = cache_nbytes(_prefill(model, [1, 2]))
+    cache = PrefixKVCache(max_bytes=2 * entry_size)
+    for prefix in ([1, 2], [3, 4], [5, 6]):
+        cache.put(prefix, _prefill(model, prefix))
+    assert cache.lookup([1, 2, 7], boundaries=[2])[0] == 0, "En eski kayıt silinmedi!"
+    assert cache.lookup([5, 6, 7], boundaries=[2])[0] == 2, "Yeni kayıt bulunamadı!"
+    assert cache.stats()["bytes"] <= 2 * entry_size, "Bellek sınırı aşıldı!"
+
+def test_prefix_kv_cache_returns_private_copy():
+    # Dönen KV durumunun değiştirilmesinin önbelleği bozmadığını test et
+    model = _tiny_model()
+    cache = PrefixKVCache(max_bytes=10 ** 7)
+    cache.put([1, 2], _prefill(model, [1, 2]))
+    _, past_key_values = cache.lookup([1, 2, 3], boundaries=[2])
+    with torch.no_grad():
+        model(input_ids=torch.tensor([[3]]), past_key_values=past_key_values, use_cache=True)
+    assert cache.lookup([1, 2, 3], boundaries=[2])[1].get_seq_length() == 2, "Önbellekteki KV durumu değişti!"
+
+def test_prefix_kv_cache_keeps_pinned_header():
+    # Farklı sorgular bütçeyi doldursa da sabitlenen başlığın silinmediğini test et
+    model = _tiny_model()
+    header = [1, 2]
+    entry_size = cache_nbytes(_prefill(model, header + [3, 4]))
+    cache = PrefixKVCache(max_bytes=cache_nbytes(_prefill(model, header)) + entry_size)
+    cache.put(header, _prefill(model, header), pinned=True)
+    for query in range(5):
+        prefix = header + [10 + query, 20 + query]
+        cache.put(prefix, _prefill(model, prefix))
+    assert cache.lookup(header + [7], boundaries=[2])[0] == 2, "Başlık önbellekten silindi!"
+    assert cache.lookup(header + [14, 24, 7], boundaries=[2, 4])[0] == 4, "Son sorgunun öneki bulunamadı!"
+    assert cache.stats()["entries"] == 2 and cache.stats()["pinned"] == 1, "Kayıt sayıları hatalı!"
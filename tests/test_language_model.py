@@ -11,4 +11,43 @@ def test_language_model_generate():
     prompt = "What is the capital of France?"
     response = model.generate(prompt, max_new_tokens=10)
     assert isinstance(response, str), "Model çıktısı string değil!"
-    assert len(response) > 0, "Model çıktısı boş!"
\ No newline at end of file
+    assert len(response) > 0, "Model çıktısı boş!"
+
+def test_language_model_generate_many():
+    # Tek çağrıda birden fazla cevap üretilmesini test et
+    model = LanguageModel("gpt2")
+    responses = model.generate_many("What is the capital of France?", 3, max_new_tokens=10)
+    assert len(responses) == 3, "Cevap sayısı hatalı!"
+    assert all(isinstance(response, str) for response in responses), "Model çıktısı string değil!"
+
+def test_language_model_generate_batch():
+    # Toplu üretimin girdi sırasını koruduğunu test et
+    model = LanguageModel("gpt2")
+    prompts = ["What is the capital of France?", "Hi", "Tell me about the history of the Roman Empire."]
+    responses = model.generate_batch(prompts, max_new_tokens=5, batch_size=2)
+    assert len(responses) == 3, "Cevap sayısı hatalı!"
+    assert responses == model.generate_batch(prompts, max_new_tokens=5, batch_size=1), "Gruplama cevapları değiştirdi!"
+    assert model.generate_batch(prompts, max_new_tokens=5, batch_size=1) == \
+        [model.generate(prompt, max_new_tokens=5) for prompt in prompts], "Cevap sırası hatalı!"
+    assert model.tokenizer.pad_token_id is not None, "Pad token ayarlanmadı!"
+
+def test_language_model_stream_matches_generate():
+    # Akışla üretilen cevabın generate ile aynı olduğunu (prompt'suz) test et
+    model = LanguageModel("gpt2")
+    prompt = "What is the capital of France?"
+    answer = model.generate(prompt, max_new_tokens=10)
+    assert "".join(model.generate_stream(prompt, max_new_tokens=10)) == answer, "Akış ve generate farklı!"
+    assert not answer.startswith(prompt), "Cevap prompt'u tekrar ediyor!"
+
+def test_language_model_kv_cache_matches_batch():
+    # KV önbellekli parçalı üretimin toplu üretimle aynı token'ları ve cevabı verdiğini test et
+    model = LanguageModel("gpt2", kv_cache_bytes=64 * 1024 * 1024)
+    header = "Documents:\n"
+    documents = ["[Document 1]\nParis is in France.\n", "[Document 2]\nRome is in Italy.\n"]
+    for question in ["\nQuestion: Where is Paris?\nAnswer:", "\nQuestion: Where is Rome?\nAnswer:"]:
+        segments = [header] + documents + [question]
+        answer = model.generate(segments, max_new_tokens=5)
+        assert answer == model.generate_batch(["".join(segments)], max_new_tokens=5)[0], "Önbellekli cevap farklı!"
+    stats = model.kv_cache.stats()
+    assert stats["hits"] == 1 and stats["pinned"] == 1, "Önekler tekrar kullanılmadı!"
+    assert stats["entries"] == 3, "Her belge sınırı için önek saklanmadı!"
@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+from config import Config
+from model.micro_batcher import MicroBatcher
+from serve import RAGServer
+
+def test_micro_batcher_groups_concurrent_requests():
+    # Eşzamanlı isteklerin tek batch'te işlendiğini test et
+    batches = []
+
+    def process(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    async def run():
+        batcher = MicroBatcher(process, max_batch_size=4, max_wait=0.05)
+        await batcher.start()
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(6)))
+        await batcher.stop()
+        return results, batcher.stats()
+
+    results, stats = asyncio.run(run())
+    assert results == [0, 2, 4, 6, 8, 10], "Sonuçlar isteklerle eşleşmiyor!"
+    assert [len(batch) for batch in batches] == [4, 2], "İstekler batch'lere toplanmadı!"
+    assert stats["requests"] == 6 and stats["batches"] == 2, "İstatistikler hatalı!"
+
+def test_micro_batcher_propagates_errors():
+    # Batch fonksiyonundaki hatanın her isteğe iletildiğini test et
+    def process(items):
+        raise ValueError("bozuk batch")
+
+    async def run():
+        batcher = MicroBatcher(process, max_wait=0.01)
+        await batcher.start()
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results), "Hata isteklere iletilmedi!"
+
+class EchoRAGSystem:
+    # Soruyu cevap olarak döndüren ve çağrıları kaydeden sahte RAG sistemi
+    def __init__(self):
+        self.calls = []
+        self.last_timings = {}
+
+    def answer_batch_with_sources(self, queries, top_k=2, batch_size=8, raise_errors=False):
+        if "bozuk" in queries:
+            raise RuntimeError("model hatası")
+        self.calls.append((list(queries), top_k))
+        return [(f"cevap: {query}", [("kaynak", 0.5)] * top_k) for query in queries]
+
+async def _request(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, data = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(data)
+
+def test_server_batches_ask_requests():
+    # /ready ve /ask uç noktalarını ve isteklerin batch'lendiğini test et
+    config = Config()
+    config.SERVER_MAX_WAIT_MS = 50
+
+    async def run():
+        server = RAGServer(config)
+        http = await server.start("127.0.0.1", 0)
+        port = http.sockets[0].getsockname()[1]
+        not_ready = await _request(port, "GET", "/ready")
+        server.rag_system = EchoRAGSystem()
+        answers = await asyncio.gather(
+            _request(port, "POST", "/ask", {"question": "bir", "top_k": 1}),
+            _request(port, "POST", "/ask", {"question": "iki", "top_k": 1}),
+            _request(port, "POST", "/ask", {"question": "üç", "top_k": 2}),
+        )
+        bad = await _request(port, "POST", "/ask", {"top_k": 1})
+        bad_top_k = [await _request(port, "POST", "/ask", {"question": "bir", "top_k": top_k})
+                     for top_k in (0, -1, config.SERVER_MAX_TOP_K + 1)]
+        failed = await _request(port, "POST", "/ask", {"question": "bozuk", "top_k": 1})
+        stats = await _request(port, "GET", "/stats")
+        health = await _request(port, "GET", "/health")
+        http.close()
+        await http.wait_closed()
+        await server.batcher.stop()
+        return not_ready, answers, bad, bad_top_k, failed, stats, health, server.rag_system.calls
+
+    not_ready, answers, bad, bad_top_k, failed, stats, health, calls = asyncio.run(run())
+    assert not_ready[0] == 503, "Modeller yüklenmeden hazır döndü!"
+    assert [status for status, _ in answers] == [200, 200, 200], "Sorular cevaplanmadı!"
+    assert [payload["answer"] for _, payload in answers] == ["cevap: bir", "cevap: iki", "cevap: üç"], "Cevaplar sorularla eşleşmiyor!"
+    assert len(answers[2][1]["sources"]) == 2, "top_k uygulanmadı!"
+    assert sorted(calls) == [(["bir", "iki"], 1), (["üç"], 2)], "İstekler top_k'ya göre batch'lenmedi!"
+    assert bad[0] == 400, "Geçersiz istek reddedilmedi!"
+    assert [status for status, _ in bad_top_k] == [400, 400, 400], "Sınır dışı top_k reddedilmedi!"
+    assert failed[0] == 500 and "answer" not in failed[1], "Model hatası cevap gibi döndü!"
+    assert stats[1]["batcher"]["failed_requests"] == 1, "Başarısız istek istatistiğe yansımadı!"
+    assert health == (200, {"status": "ok"}), "Sağlık kontrolü hatalı!"
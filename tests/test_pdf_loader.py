@@ -19,4 +19,63 @@ def test_pdf_loader_chunk_text():
     texts = ["This is a long text that needs to be chunked." * 100]
     chunks = pdf_loader.chunk_text(texts, chunk_size=500, chunk_overlap=100)
     assert isinstance(chunks, list), "Parçalar listeye dönüştürülemedi!"
-    assert len(chunks) > 1, "Metinler parçalara ayrılamadı!"
\ No newline at end of file
+    assert len(chunks) > 1, "Metinler parçalara ayrılamadı!"
+
+def test_pdf_loader_parallel_matches_serial():
+    # Paralel çıkarmanın seri çıkarmayla aynı metinleri aynı sırada döndürdüğünü test et
+    serial = PDFLoader("data/pdfs").load_pdfs()
+    parallel = PDFLoader("data/pdfs", workers=2, pages_per_task=4).load_pdfs()
+    assert parallel == serial, "Paralel çıkarma farklı metinler döndürdü!"
+
+def test_pdf_loader_iter_documents_reuses_pool(monkeypatch):
+    # Paralel akışta tüm dosya grupları için tek bir süreç havuzu kullanıldığını test et
+    import multiprocessing
+    pools = []
+    original_pool = multiprocessing.Pool
+
+    def counting_pool(*args, **kwargs):
+        pools.append(args)
+        return original_pool(*args, **kwargs)
+
+    monkeypatch.setattr(multiprocessing, "Pool", counting_pool)
+    pdf_loader = PDFLoader("data/pdfs", workers=2, pages_per_task=4)
+    documents = [(filename, list(pages)) for filename, pages in pdf_loader.iter_documents(pdf_loader.pdf_files())]
+    assert len(documents) == len(pdf_loader.pdf_files()) > 2, "Belgeler eksik döndü!"
+    assert len(pools) == 1, "Her dosya grubu için yeni süreç havuzu açıldı!"
+
+def test_pdf_loader_file_deadline_starts_at_submission(monkeypatch):
+    # Bir dosyanın sayfa sayma ve çıkarma işlerinin, iş havuza verildiği andan başlayan tek bir süreyle beklendiğini test et
+    import time
+    pdf_loader = PDFLoader("data/pdfs", workers=2, pages_per_task=4, file_timeout=100)
+    waits = []
+    original_wait = pdf_loader._wait
+
+    def recording_wait(filename, jobs, deadline, pool):
+        waits.append((filename, deadline))
+        return original_wait(filename, jobs, deadline, pool)
+
+    monkeypatch.setattr(pdf_loader, "_wait", recording_wait)
+    submitted = time.monotonic()
+    pdf_loader.extract_pages_many(pdf_loader.pdf_files())
+    deadlines = {}
+    for filename, deadline in waits:
+        assert deadlines.setdefault(filename, deadline) == deadline, "Çıkarma için süre yeniden başlatıldı!"
+    assert len(deadlines) == len(pdf_loader.pdf_files()), "Dosyalar beklenmedi!"
+    assert all(deadline - submitted < 100 + 5 for deadline in deadlines.values()), "Süre çok geç başladı!"
+
+def test_pdf_loader_iter_chunks_matches_chunk_text():
+    # Akışlı parçalamanın chunk_text ile aynı parçaları ürettiğini test et
+    pdf_loader = PDFLoader("data/pdfs")
+    filename = pdf_loader.pdf_files()[0]
+    pages = list(pdf_loader.iter_pages(filename))
+    expected = pdf_loader.chunk_text([" ".join(pages)], chunk_size=500, chunk_overlap=100)
+    streamed = list(pdf_loader.iter_chunks(iter(pages), chunk_size=500, chunk_overlap=100))
+    assert streamed == expected, "Akışlı parçalama farklı sonuç verdi!"
+
+def test_pdf_loader_text_cache(tmp_path):
+    # Önbellekten okunan metnin pypdf çıktısıyla aynı olduğunu test et
+    expected = PDFLoader("data/pdfs").load_pdfs()
+    PDFLoader("data/pdfs", text_cache_dir=str(tmp_path)).load_pdfs()
+    pdf_loader = PDFLoader("data/pdfs", text_cache_dir=str(tmp_path))
+    assert pdf_loader.load_pdfs() == expected, "Önbellekteki metinler hatalı!"
+    assert pdf_loader.text_cache.hits == len(expected), "Metin önbelleği kullanılmadı!"
\ No newline at end of file
@@ -0,0 +1,33 @@
+import numpy as np
+from model.query_cache import QueryEmbeddingCache, normalize_query
+
+def fake_encode(queries):
+    return np.array([[len(q), q.count("a")] for q in queries], dtype=np.float32)
+
+def test_query_cache_normalizes_and_counts_hits():
+    # Aynı sorgunun boşluk ve noktalama farklarının önbellekten döndüğünü, büyük-küçük harf farkının ayrı tutulduğunu test et
+    calls = []
+    def encode(queries):
+        calls.append(list(queries))
+        return fake_encode(queries)
+
+    cache = QueryEmbeddingCache(capacity=8)
+    cache.encode(["What is RAG?"], encode)
+    result = cache.encode(["  What is   RAG", "What is HyDE?", "what is rag"], encode)
+    assert normalize_query("  What IS rag? ") == "What IS rag", "Sorgu normalizasyonu hatalı!"
+    assert calls == [["What is RAG?"], ["What is HyDE?", "what is rag"]], "Tekrar eden sorgu encode edildi!"
+    assert result.shape == (3, 2), "Embedding boyutu hatalı!"
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 3, "İsabet sayıları hatalı!"
+
+def test_query_cache_evicts_least_recently_used():
+    # Kapasite aşıldığında en eski sorgunun atıldığını test et
+    cache = QueryEmbeddingCache(capacity=2)
+    cache.encode(["a", "b"], fake_encode)
+    cache.encode(["a"], fake_encode)
+    cache.encode(["c"], fake_encode)
+    misses = cache.stats()["misses"]
+    cache.encode(["a"], fake_encode)
+    assert cache.stats()["misses"] == misses, "Son kullanılan sorgu atıldı!"
+    cache.encode(["b"], fake_encode)
+    assert cache.stats()["misses"] == misses + 1, "En eski sorgu atılmadı!"
+    assert cache.stats()["size"] == 2, "Önbellek kapasitesi aşıldı!"
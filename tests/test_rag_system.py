@@ -21,4 +21,27 @@ def test_rag_system_answer_question():
     rag_system = RAGSystem(embedding_model, retriever, language_model)
     answer = rag_system.answer_question("What is the capital of France?")
     assert isinstance(answer, str), "Cevap string değil!"
-    assert len(answer) > 0, "Cevap boş!"
\ No newline at end of file
+    assert len(answer) > 0, "Cevap boş!"
+
+def test_rag_system_answer_question_stream():
+    # Cevabın parça parça üretildiğini test et
+    embedding_model = EmbeddingModel("sentence-transformers/all-MiniLM-L6-v2")
+    retriever = Retriever(embedding_model)
+    retriever.build_index(["Paris is the capital of France.", "London is the capital of the UK."])
+    language_model = LanguageModel("gpt2")
+    rag_system = RAGSystem(embedding_model, retriever, language_model)
+    parts = list(rag_system.answer_question_stream("What is the capital of France?"))
+    assert len(parts) > 0, "Akışta hiç parça yok!"
+    assert all(isinstance(part, str) for part in parts), "Akış parçası string değil!"
+
+def test_rag_system_answer_batch():
+    # Birden fazla soruya toplu cevap üretilmesini test et
+    embedding_model = EmbeddingModel("sentence-transformers/all-MiniLM-L6-v2")
+    retriever = Retriever(embedding_model)
+    retriever.build_index(["Paris is the capital of France.", "London is the capital of the UK."])
+    language_model = LanguageModel("gpt2")
+    rag_system = RAGSystem(embedding_model, retriever, language_model)
+    answers = rag_system.answer_batch(["What is the capital of France?", "What is the capital of the UK?"])
+    assert len(answers) == 2, "Cevap sayısı hatalı!"
+    assert all(isinstance(answer, str) and answer for answer in answers), "Cevaplar hatalı!"
+    assert rag_system.last_timings["queries"] == 2, "Süre bilgisi kaydedilmedi!"
\ No newline at end of file
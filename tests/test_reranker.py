@@ -0,0 +1,76 @@
+import time
+from model.reranker import CrossEncoderReranker, RerankingRetriever
+
+class OverlapCrossEncoder:
+    # Soru ile parça arasındaki ortak kelime sayısını skor olarak veren sahte model
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, pairs, batch_size=32):
+        self.calls.append(len(pairs))
+        return [len(set(q.lower().split()) & set(t.lower().split())) for q, t in pairs]
+
+class ClockedCrossEncoder(OverlapCrossEncoder):
+    # Sahte saati aday başına sabit süre ilerleten model
+    def __init__(self):
+        super().__init__()
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+    def predict(self, pairs, batch_size=32):
+        self.now += 0.02 * len(pairs)
+        return super().predict(pairs, batch_size)
+
+class ListRetriever:
+    index_version = 7
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    def retrieve(self, query, top_k=2):
+        return [(doc, float(i)) for i, doc in enumerate(self.documents[:top_k])]
+
+def test_reranker_orders_by_cross_encoder_and_caches():
+    # Adayların tek toplu çağrıda puanlandığını ve skorların önbelleğe alındığını test et
+    model = OverlapCrossEncoder()
+    reranker = CrossEncoderReranker(model=model, max_candidates=3)
+    candidates = [("cats sleep", 0.1), ("dogs bark loudly", 0.2), ("what do dogs do", 0.3), ("dogs", 0.4)]
+    results = reranker.rerank("what do dogs do", candidates, top_k=2)
+    assert [text for text, _ in results] == ["what do dogs do", "dogs bark loudly"], "Yeniden sıralama hatalı!"
+    assert model.calls == [3], "Adaylar tek çağrıda ve sınırla puanlanmadı!"
+
+    reranker.rerank(" what do  dogs do?", candidates, top_k=2)
+    assert model.calls == [3], "Önbellekteki skorlar yeniden hesaplandı!"
+    assert reranker.stats()["hits"] == 3, "İsabet sayısı hatalı!"
+
+def test_reranker_time_budget_keeps_retrieval_order():
+    # Süre aşılınca puanlanmayan adayların getirme sırasıyla kaldığını test et
+    model = OverlapCrossEncoder()
+    reranker = CrossEncoderReranker(model=model, time_budget=0.0)
+    candidates = [("a", 0.1), ("b", 0.2)]
+    assert reranker.rerank("b", candidates, top_k=2) == candidates, "Süre sınırı uygulanmadı!"
+    assert reranker.stats()["timeouts"] == 1, "Zaman aşımı sayılmadı!"
+
+def test_reranking_retriever_overfetches():
+    # Sarmalayıcının fazladan aday getirip top_k döndürdüğünü test et
+    retriever = RerankingRetriever(ListRetriever(["x y", "y z", "query words here"]), CrossEncoderReranker(model=OverlapCrossEncoder()), candidates=3)
+    results = retriever.retrieve("query words", top_k=1)
+    assert results[0][0] == "query words here", "Aday fazladan getirilmedi!"
+    assert retriever.index_version == 7, "Özellikler sarmalanan retriever'a iletilmedi!"
+
+def test_reranker_time_budget_with_default_batch_size(monkeypatch):
+    # Varsayılan ayarlarda (tüm adaylar tek batch'e sığarken) süre sınırının uygulandığını test et
+    model = ClockedCrossEncoder()
+    monkeypatch.setattr(time, "perf_counter", model.perf_counter)
+    reranker = CrossEncoderReranker(model=model, time_budget=0.2)
+    candidates = [(f"aday {i}", float(100 + i)) for i in range(20)]
+    results = reranker.rerank("aday 5", candidates, top_k=20)
+    assert model.calls == [4, 6], "Süre sınırında adaylar ölçülen süreye göre puanlanmadı!"
+    assert reranker.stats()["timeouts"] == 1, "Zaman aşımı sayılmadı!"
+    assert len(results) == 20, "Puanlanmayan adaylar kayboldu!"
+    assert [text for text, _ in results[10:]] == [text for text, _ in candidates[10:]], "Puanlanmayanların sırası bozuldu!"
+    scores = [score for _, score in results]
+    assert scores == sorted(scores, reverse=True) and max(scores[10:]) < min(scores[:10]), \
+        "Puanlanmayan adaylar puanlananların önüne geçebilir!"
@@ -3,8 +3,22 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from model.retriever import Retriever
+from model.hybrid_retriever import HybridRetriever
 from model.langchain_retriever import LangChainRetriever
 from model.embedding_model import EmbeddingModel
+import numpy as np
+
+class CharCountEmbeddingModel:
+    # Model indirmeden test için karakter sayımına dayalı embedding
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, texts):
+        self.calls += 1
+        return np.array([[len(t), t.count("a"), t.count("b")] for t in texts], dtype=np.float32)
+
+    def encode_queries(self, texts):
+        return self.encode(texts)
 
 def test_langchain_retriever():
     # Model adını ve belgeleri tanımla
@@ -19,4 +33,45 @@ def test_langchain_retriever():
     
     # Sorgu yap ve sonuçları kontrol et
     results = retriever.get_relevant_documents("test")
-    assert len(results) <= 2, "Sonuç sayısı beklenenden fazla!"
\ No newline at end of file
+    assert len(results) <= 2, "Sonuç sayısı beklenenden fazla!"
+
+def test_retriever_retrieve_batch():
+    # Toplu sorgunun tek encode çağrısıyla tekli sorgularla aynı sonucu verdiğini test et
+    model = CharCountEmbeddingModel()
+    retriever = Retriever(model, query_cache_size=0)
+    retriever.build_index(["a", "aa", "bbb", "abab"])
+    single = [retriever.retrieve(q, top_k=2) for q in ["aa", "bbbb"]]
+    calls = model.calls
+    batch = retriever.retrieve_batch(["aa", "bbbb"], top_k=2)
+    assert batch == single, "Toplu sorgu sonuçları farklı!"
+    assert model.calls == calls + 1, "Sorgular tek çağrıda encode edilmedi!"
+
+def test_hybrid_retriever_finds_exact_terms():
+    # Yoğun aramanın kaçırdığı tam terimin BM25 ile bulunduğunu test et
+    retriever = HybridRetriever(CharCountEmbeddingModel(), query_cache_size=0, dense_top_k=1, sparse_top_k=2)
+    documents = ["aaaa aaaa", "bb", "zz 2411.19865v1"]
+    retriever.build_index(documents)
+    results = retriever.retrieve("aaaa 2411.19865v1", top_k=2)
+    texts = [text for text, _ in results]
+    assert "zz 2411.19865v1" in texts, "BM25 sonucu birleştirilmedi!"
+    assert "aaaa aaaa" in texts, "Yoğun arama sonucu kayboldu!"
+
+    retriever.remove_ids([2])
+    texts = [text for text, _ in retriever.retrieve("2411.19865v1", top_k=2)]
+    assert "zz 2411.19865v1" not in texts, "Silinen belge BM25 ile döndü!"
+
+def test_retriever_quantized_rescoring(tmp_path):
+    # Nicemlenmiş indeksin float vektörlerle yeniden puanlanıp flat ile aynı sonucu verdiğini test et
+    documents = ["a" * i + "b" * (i % 7) for i in range(1, 200)]
+    flat = Retriever(CharCountEmbeddingModel(), query_cache_size=0)
+    flat.build_index(documents)
+    quantized = Retriever(CharCountEmbeddingModel(), index_type="sq8", query_cache_size=0)
+    quantized.build_index(documents)
+    assert quantized.vectors is not None and len(quantized.vectors) == len(documents), "Float vektörler saklanmadı!"
+    queries = ["aaaab", "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaabbb"]
+    assert quantized.retrieve_batch(queries, top_k=3) == flat.retrieve_batch(queries, top_k=3), "Yeniden puanlanmış sonuçlar farklı!"
+
+    quantized.save(str(tmp_path), {"files": {}})
+    loaded = Retriever(CharCountEmbeddingModel(), index_type="sq8", query_cache_size=0)
+    loaded.load(str(tmp_path))
+    assert loaded.retrieve_batch(queries, top_k=3) == flat.retrieve_batch(queries, top_k=3), "Yüklenen indeks farklı sonuç verdi!"
\ No newline at end of file